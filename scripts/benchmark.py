@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+パフォーマンス計測スクリプト
+
+使用方法:
+    python scripts/benchmark.py pattern-matcher [--entries 2000]
+    python scripts/benchmark.py timestamp [--entries 2000]
+    python scripts/benchmark.py log-processor [--entries 2000]
+    python scripts/benchmark.py noise-filter [--entries 2000]
+    python scripts/benchmark.py level-prefilter [--entries 2000]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from github_actions_ai_analyzer.core.log_processor import (  # noqa: E402
+    LogProcessor,
+)
+from github_actions_ai_analyzer.core.pattern_matcher import (  # noqa: E402
+    PatternMatcher,
+)
+from github_actions_ai_analyzer.core.timestamp import (  # noqa: E402
+    split_timestamp,
+)
+from github_actions_ai_analyzer.types import (  # noqa: E402
+    ErrorPattern,
+    LogEntry,
+    LogLevel,
+    LogRecord,
+    LogSource,
+)
+
+SAMPLE_MESSAGES = [
+    "Run actions/checkout@v4",
+    "Collecting requests>=2.28.0",
+    "ModuleNotFoundError: No module named 'requests'",
+    "npm ERR! code ERESOLVE while resolving install",
+    "Permission denied: /usr/local/bin/tool",
+    "tests/test_app.py::test_login PASSED",
+    "Process completed with exit code 1",
+    "Downloading https://files.pythonhosted.org/packages/foo.whl",
+]
+
+
+def _build_entries(count: int) -> List[LogEntry]:
+    """計測用のログエントリを作成"""
+    now = datetime.now()
+    return [
+        LogEntry(
+            timestamp=now,
+            level=LogLevel.ERROR,
+            source=LogSource.USER,
+            message=SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)],
+            metadata={"line_number": i + 1},
+        )
+        for i in range(count)
+    ]
+
+
+def _per_entry_us(func: Callable[[], object], count: int) -> float:
+    """1エントリあたりの処理時間（マイクロ秒）を計測"""
+    runs = timeit.repeat(func, number=1, repeat=5)
+    return min(runs) / count * 1_000_000
+
+
+class _UncachedPatternMatcher(PatternMatcher):
+    """キャッシュ導入前と同じく、エントリごとに正規表現をコンパイル"""
+
+    def _get_compiled(self, pattern: ErrorPattern) -> re.Pattern[str]:
+        return re.compile(pattern.regex_pattern, re.IGNORECASE)
+
+
+def bench_pattern_matcher(args: argparse.Namespace) -> Dict[str, float]:
+    """PatternMatcherのエントリあたりコストを計測"""
+    entries = _build_entries(args.entries)
+    uncached = _UncachedPatternMatcher(use_prefilter=False)
+    compiled = PatternMatcher(use_prefilter=False)
+    prefiltered = PatternMatcher()
+    combined = PatternMatcher(engine="combined")
+
+    results = {
+        "re.compile per entry (before)": _per_entry_us(
+            lambda: uncached.match_patterns(entries), len(entries)
+        ),
+        "precompiled cache (after)": _per_entry_us(
+            lambda: compiled.match_patterns(entries), len(entries)
+        ),
+        "precompiled + literal prefilter": _per_entry_us(
+            lambda: prefiltered.match_patterns(entries), len(entries)
+        ),
+        "combined engine + literal prefilter": _per_entry_us(
+            lambda: combined.match_patterns(entries), len(entries)
+        ),
+    }
+    return results
+
+
+def _build_lines(count: int) -> List[str]:
+    """計測用のログ行を作成（GitHub Actionsの7桁形式と3桁形式）"""
+    lines = []
+    for i in range(count):
+        fraction = "1234567" if i % 2 else "123"
+        lines.append(
+            f"2024-01-01T12:{i // 60 % 60:02d}:{i % 60:02d}.{fraction}Z "
+            f"{SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)]}"
+        )
+    return lines
+
+
+# 導入前の処理と同じ構成で、小数部の桁数だけ7桁に対応させた正規表現
+_REGEX_TIMESTAMP_SEARCH = re.compile(
+    r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d{1,9})Z"
+)
+_REGEX_TIMESTAMP_PREFIX = re.compile(
+    r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{1,9}Z\s*"
+)
+
+
+def _split_timestamp_regex(line: str) -> object:
+    """正規表現で検索・解析してから、別の正規表現で除去"""
+    match = _REGEX_TIMESTAMP_SEARCH.search(line)
+    timestamp = None
+    if match:
+        try:
+            timestamp = datetime.fromisoformat(
+                match.group(1) + match.group(2)[:7] + "+00:00"
+            ).timestamp()
+        except ValueError:
+            pass
+    return timestamp, _REGEX_TIMESTAMP_PREFIX.sub("", line)
+
+
+def bench_timestamp(args: argparse.Namespace) -> Dict[str, float]:
+    """タイムスタンプの解析と除去の行あたりコストを計測"""
+    lines = _build_lines(args.entries)
+    untimed = [line.split(" ", 1)[1] for line in lines]
+
+    return {
+        "regex search + fromisoformat + sub (before)": _per_entry_us(
+            lambda: [_split_timestamp_regex(line) for line in lines],
+            len(lines),
+        ),
+        "fixed-offset split_timestamp (after)": _per_entry_us(
+            lambda: [split_timestamp(line) for line in lines], len(lines)
+        ),
+        "split_timestamp, no timestamp (fallback)": _per_entry_us(
+            lambda: [split_timestamp(line) for line in untimed], len(untimed)
+        ),
+    }
+
+
+class _MultiPassLogProcessor(LogProcessor):
+    """単一走査の判定を導入する前と同じく、項目ごとに行を走査"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.level_regex = {
+            level: re.compile("|".join(patterns))
+            for level, patterns in self.level_patterns.items()
+        }
+
+    def _create_log_record(self, line: str, line_num: int) -> LogRecord:
+        epoch, body = split_timestamp(line)
+        return LogRecord(
+            line_number=line_num,
+            timestamp=epoch,
+            level=self._determine_log_level(line),
+            source=self._determine_source(line),
+            message=self._clean_body(body),
+            step_name=self._extract_step_name(line),
+            action_name=self._extract_action_name(line),
+        )
+
+    def _determine_log_level(self, line: str) -> LogLevel:
+        for level, patterns in self.level_regex.items():
+            if patterns.search(line):
+                return level
+        return LogLevel.INFO
+
+    def _determine_source(self, line: str) -> LogSource:
+        if "::debug::" in line or "::notice::" in line:
+            return LogSource.SYSTEM
+        elif "::command::" in line:
+            return LogSource.STEP
+        elif "action" in line.lower():
+            return LogSource.ACTION
+        elif "workflow" in line.lower():
+            return LogSource.WORKFLOW
+        return LogSource.USER
+
+    def _extract_step_name(self, line: str) -> Optional[str]:
+        match = re.search(r"Step (\d+): (.+)", line)
+        return match.group(2) if match else None
+
+    def _extract_action_name(self, line: str) -> Optional[str]:
+        match = re.search(r"uses: (.+)", line)
+        return match.group(1) if match else None
+
+
+def bench_log_processor(args: argparse.Namespace) -> Dict[str, float]:
+    """LogProcessorの行あたりの前処理コストを計測"""
+    lines = _build_lines(args.entries)
+    numbered = list(enumerate(lines, 1))
+    multi_pass = _MultiPassLogProcessor()
+    single_pass = LogProcessor()
+
+    return {
+        "per-field scans (before)": _per_entry_us(
+            lambda: list(multi_pass.process_numbered_records(numbered)),
+            len(lines),
+        ),
+        "single-pass classifier (after)": _per_entry_us(
+            lambda: list(single_pass.process_numbered_records(numbered)),
+            len(lines),
+        ),
+    }
+
+
+def bench_noise_filter(args: argparse.Namespace) -> Dict[str, float]:
+    """ノイズ行の判定の行あたりコストを計測"""
+    noise = ["::debug::cache miss", "  ##[command]/usr/bin/git", "::notice::ok"]
+    lines = [
+        noise[i % len(noise)] if i % 4 == 0 else SAMPLE_MESSAGES[i % 8]
+        for i in range(args.entries)
+    ]
+    numbered = list(enumerate(lines, 1))
+    processor = LogProcessor()
+    unfiltered = LogProcessor(filter_noise=False)
+    # 接頭辞による判定を導入する前のノイズパターン
+    noise_regex = re.compile(
+        "|".join(
+            "^" + re.escape(prefix)
+            for prefix in processor.noise_prefixes.values()
+        )
+    )
+    prefixes = tuple(processor.noise_prefixes.values())
+
+    return {
+        "strip + regex match (before)": _per_entry_us(
+            lambda: [bool(noise_regex.match(line.strip())) for line in lines],
+            len(lines),
+        ),
+        "lstrip + startswith(tuple) (after)": _per_entry_us(
+            lambda: [line.lstrip().startswith(prefixes) for line in lines],
+            len(lines),
+        ),
+        "records, filter_noise=True": _per_entry_us(
+            lambda: list(processor.process_numbered_records(numbered)),
+            len(lines),
+        ),
+        "records, filter_noise=False": _per_entry_us(
+            lambda: list(unfiltered.process_numbered_records(numbered)),
+            len(lines),
+        ),
+    }
+
+
+def bench_level_prefilter(args: argparse.Namespace) -> Dict[str, float]:
+    """最小レベル未満の行を読み飛ばす前処理の行あたりコストを計測"""
+    lines = _build_lines(args.entries)
+    numbered = list(enumerate(lines, 1))
+    processor = LogProcessor()
+    level = LogLevel.WARNING
+
+    return {
+        "records, then iter_by_level (before)": _per_entry_us(
+            lambda: list(
+                processor.iter_by_level(
+                    processor.process_numbered_records(numbered), level
+                )
+            ),
+            len(lines),
+        ),
+        "min_level pushed down (after)": _per_entry_us(
+            lambda: list(
+                processor.process_numbered_records(
+                    numbered, min_level=level
+                )
+            ),
+            len(lines),
+        ),
+    }
+
+
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], Dict[str, float]]] = {
+    "pattern-matcher": bench_pattern_matcher,
+    "timestamp": bench_timestamp,
+    "log-processor": bench_log_processor,
+    "noise-filter": bench_noise_filter,
+    "level-prefilter": bench_level_prefilter,
+}
+
+
+def main() -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="パフォーマンス計測")
+    parser.add_argument("target", choices=sorted(BENCHMARKS))
+    parser.add_argument(
+        "--entries", type=int, default=2000, help="計測に使うエントリ数"
+    )
+    args = parser.parse_args()
+
+    print(f"📊 {args.target} ({args.entries} entries)")
+    for label, per_entry in BENCHMARKS[args.target](args).items():
+        print(f"  {label:<40} {per_entry:10.2f} µs/entry")
+
+
+if __name__ == "__main__":
+    main()
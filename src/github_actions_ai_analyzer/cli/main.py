@@ -4,6 +4,10 @@ CLI メインエントリーポイント
 GitHub Actions AI Analyzerのコマンドラインインターフェースのメイン関数です。
 """
 
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
 import click
 import yaml
 from rich.console import Console
@@ -12,6 +16,8 @@ from rich.table import Table
 from rich.text import Text
 
 from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.log_watcher import LogWatcher
+from github_actions_ai_analyzer.core.result_cache import ResultCache
 from github_actions_ai_analyzer.types import AnalysisResult, LogLevel
 
 console = Console()
@@ -49,8 +55,51 @@ def main() -> None:
     default="text",
     help="出力形式",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="ログ処理に使うプロセス数",
+)
+@click.option(
+    "--no-contexts",
+    is_flag=True,
+    help="リポジトリ・ワークフロー・環境のコンテキストを収集しない",
+)
+@click.option(
+    "--no-cache", is_flag=True, help="解析結果のキャッシュを使用しない"
+)
+@click.option(
+    "--no-noise-filter",
+    is_flag=True,
+    help="ノイズ行（::debug:: など）を除去しない（前処理済みのログ向け）",
+)
+@click.option(
+    "--context-lines",
+    "-C",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="マッチした行の前後に付与する行数",
+)
+@click.option(
+    "--no-collapse",
+    is_flag=True,
+    help="同じエラーの繰り返しを1つにまとめずにすべて出力する",
+)
 def analyze(
-    log_file: str, workflow: str, repository: str, min_level: str, output: str
+    log_file: str,
+    workflow: str,
+    repository: str,
+    min_level: str,
+    output: str,
+    jobs: int,
+    no_contexts: bool,
+    no_cache: bool,
+    no_noise_filter: bool,
+    context_lines: int,
+    no_collapse: bool,
 ) -> None:
     """ログファイルを解析してエラー分析を実行"""
     try:
@@ -65,7 +114,12 @@ def analyze(
             log_level = LogLevel.WARNING
 
         # アナライザーを作成
-        analyzer = GitHubActionsAnalyzer()
+        analyzer = GitHubActionsAnalyzer(
+            result_cache=None if no_cache else ResultCache(),
+            filter_noise=not no_noise_filter,
+            context_lines=(context_lines, context_lines),
+            collapse_repeated=not no_collapse,
+        )
 
         # 解析実行
         with console.status("[bold green]解析中..."):
@@ -74,6 +128,8 @@ def analyze(
                 workflow_file_path=workflow,
                 repository_path=repository,
                 min_log_level=log_level,
+                jobs=jobs,
+                contexts=() if no_contexts else None,
             )
 
         # 結果を表示
@@ -84,6 +140,154 @@ def analyze(
         raise click.Abort()
 
 
+def _expand_log_paths(paths: tuple[str, ...], pattern: str) -> list[str]:
+    """ディレクトリ指定をログファイルの一覧に展開"""
+    log_files: List[str] = []
+    for path in paths:
+        if Path(path).is_dir():
+            log_files.extend(
+                str(p)
+                for p in sorted(Path(path).rglob(pattern))
+                if p.is_file()
+            )
+        else:
+            log_files.append(path)
+    return log_files
+
+
+@main.command("analyze-batch")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--pattern",
+    "-p",
+    default="*.log",
+    show_default=True,
+    help="ディレクトリ指定時に解析するファイル名のパターン",
+)
+@click.option(
+    "--workflow",
+    "-w",
+    type=click.Path(exists=True),
+    help="ワークフローファイルのパス",
+)
+@click.option(
+    "--repository", "-r", type=click.Path(exists=True), help="リポジトリのパス"
+)
+@click.option(
+    "--min-level",
+    "-l",
+    type=click.Choice(["debug", "info", "warning", "error", "fatal"]),
+    default="warning",
+    help="最小ログレベル",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="出力形式（jsonは1ファイル1行のJSON Lines）",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="同時に処理するプロセス数（省略時はCPU数）",
+)
+@click.option(
+    "--no-cache", is_flag=True, help="解析結果のキャッシュを使用しない"
+)
+@click.option(
+    "--no-noise-filter",
+    is_flag=True,
+    help="ノイズ行（::debug:: など）を除去しない（前処理済みのログ向け）",
+)
+@click.option(
+    "--context-lines",
+    "-C",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="マッチした行の前後に付与する行数",
+)
+@click.option(
+    "--no-collapse",
+    is_flag=True,
+    help="同じエラーの繰り返しを1つにまとめずにすべて出力する",
+)
+def analyze_batch(
+    paths: tuple[str, ...],
+    pattern: str,
+    workflow: str,
+    repository: str,
+    min_level: str,
+    output: str,
+    jobs: Optional[int],
+    no_cache: bool,
+    no_noise_filter: bool,
+    context_lines: int,
+    no_collapse: bool,
+) -> None:
+    """複数のログファイルをまとめて解析し、完了した順に結果を出力"""
+    log_files = _expand_log_paths(paths, pattern)
+    if not log_files:
+        console.print("[yellow]解析対象のログファイルがありません[/yellow]")
+        return
+
+    analyzer = GitHubActionsAnalyzer(
+        result_cache=None if no_cache else ResultCache(),
+        filter_noise=not no_noise_filter,
+        context_lines=(context_lines, context_lines),
+        collapse_repeated=not no_collapse,
+    )
+    failed = 0
+
+    for log_file, outcome in analyzer.analyze_many(
+        log_files,
+        workflow_file_path=workflow,
+        repository_path=repository,
+        min_log_level=LogLevel(min_level),
+        jobs=jobs,
+    ):
+        if isinstance(outcome, Exception):
+            failed += 1
+        _display_batch_entry(log_file, outcome, output)
+
+    if output == "text":
+        console.print(
+            f"[bold]{len(log_files)}個のログファイルを解析しました"
+            f"（失敗: {failed}個）[/bold]"
+        )
+    if failed:
+        raise SystemExit(1)
+
+
+def _display_batch_entry(
+    log_file: str, outcome: AnalysisResult | Exception, output_format: str
+) -> None:
+    """バッチ解析の1ファイル分の結果を表示"""
+    if output_format == "json":
+        record: Dict[str, Any]
+        if isinstance(outcome, Exception):
+            record = {"log_file": log_file, "error": str(outcome)}
+        else:
+            record = {
+                "log_file": log_file,
+                "analysis_id": outcome.analysis_id,
+                "error_count": len(outcome.error_analyses),
+                "summary": outcome.summary,
+                "error_ids": [a.error_id for a in outcome.error_analyses],
+            }
+        # richの整形を通さず1行で出力する
+        click.echo(json.dumps(record, ensure_ascii=False))
+    elif isinstance(outcome, Exception):
+        console.print(f"[bold red]❌ {log_file}: {outcome}[/bold red]")
+    elif outcome.error_analyses:
+        console.print(f"[yellow]⚠️ {log_file}: {outcome.summary}[/yellow]")
+    else:
+        console.print(f"[green]✅ {log_file}: {outcome.summary}[/green]")
+
+
 def _check_timeout_settings(jobs: dict) -> list[str]:
     """タイムアウト設定をチェック"""
     issues = []
@@ -335,16 +539,69 @@ def validate(workflow_file: str) -> None:
 
 
 @main.command()
-@click.argument("directory", type=click.Path(exists=True))
-@click.option("--interval", "-i", type=int, default=30, help="監視間隔（秒）")
-def watch(directory: str, interval: int) -> None:
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--interval",
+    "-i",
+    type=click.FloatRange(min=0.01),
+    default=1.0,
+    show_default=True,
+    help="変更通知が使えない環境での監視間隔（秒）",
+)
+@click.option(
+    "--pattern",
+    "-p",
+    default="*.log",
+    show_default=True,
+    help="監視するファイル名のパターン",
+)
+@click.option(
+    "--min-level",
+    "-l",
+    type=click.Choice(["debug", "info", "warning", "error", "fatal"]),
+    default="warning",
+    help="最小ログレベル",
+)
+@click.option(
+    "--skip-existing",
+    is_flag=True,
+    help="既存の内容は解析せず、これから追記される行のみを解析",
+)
+def watch(
+    directory: str,
+    interval: float,
+    pattern: str,
+    min_level: str,
+    skip_existing: bool,
+) -> None:
     """ディレクトリを監視してログファイルの変更を自動解析"""
     console.print("[bold blue]ログファイル監視[/bold blue]")
     console.print(f"ディレクトリ: {directory}")
     console.print(f"監視間隔: {interval}秒")
 
-    # TODO: ファイル監視機能を実装
-    console.print("[yellow]ファイル監視機能は未実装です[/yellow]")
+    analyzer = GitHubActionsAnalyzer()
+    watcher = LogWatcher(
+        analyzer.log_processor,
+        analyzer.pattern_matcher,
+        directory,
+        pattern=pattern,
+        min_log_level=LogLevel(min_level),
+    )
+    if skip_existing:
+        watcher.skip_existing()
+
+    detected = 0
+    try:
+        for log_file, matches in watcher.watch(interval):
+            for match in matches:
+                detected += 1
+                line_number = match.context["log_entry"].line_number
+                console.print(
+                    f"[bold red]{log_file}:{line_number}[/bold red] "
+                    f"{match.pattern.name}: {match.matched_text}"
+                )
+    except KeyboardInterrupt:
+        console.print(f"[bold]監視を終了しました（検出: {detected}件）[/bold]")
 
 
 def _display_analysis_result(
@@ -376,9 +633,13 @@ def _display_text_result(result: AnalysisResult) -> None:
         error_table.add_column("根本原因", style="red")
         error_table.add_column("重要度", style="yellow")
         error_table.add_column("影響ステップ", style="blue")
+        # gh run view --log 形式のログはジョブ名も表示
+        show_job = any(a.job_name for a in result.error_analyses)
+        if show_job:
+            error_table.add_column("ジョブ", style="magenta")
 
         for analysis in result.error_analyses:
-            error_table.add_row(
+            row = [
                 analysis.error_id,
                 analysis.root_cause,
                 analysis.severity,
@@ -387,7 +648,10 @@ def _display_text_result(result: AnalysisResult) -> None:
                     if analysis.affected_steps
                     else "なし"
                 ),
-            )
+            ]
+            if show_job:
+                row.append(analysis.job_name or "")
+            error_table.add_row(*row)
 
         console.print(error_table)
 
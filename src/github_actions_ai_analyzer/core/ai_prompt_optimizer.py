@@ -6,7 +6,13 @@ AI プロンプト最適化器
 
 from typing import Any, Dict, List
 
-from ..types import AnalysisResult, ErrorAnalysis, SolutionProposal
+from ..types import (
+    AnalysisResult,
+    ErrorAnalysis,
+    PatternMatch,
+    SolutionProposal,
+)
+from .context_capture import CONTEXT_AFTER_KEY, CONTEXT_BEFORE_KEY
 
 
 class AIPromptOptimizer:
@@ -32,8 +38,12 @@ class AIPromptOptimizer:
         return template.format(
             error_summary=error_summary,
             context_info=context_info,
-            repository_name=analysis_result.repository_context.name,
-            workflow_name=analysis_result.workflow_context.name,
+            repository_name=self._repository_name(analysis_result),
+            workflow_name=(
+                analysis_result.workflow_context.name
+                if analysis_result.workflow_context
+                else "unknown"
+            ),
         )
 
     def generate_solution_prompt(self, analysis_result: AnalysisResult) -> str:
@@ -51,7 +61,10 @@ class AIPromptOptimizer:
         return template.format(
             error_details=error_details,
             existing_solutions=existing_solutions,
-            repository_language=analysis_result.repository_context.language
+            repository_language=(
+                analysis_result.repository_context
+                and analysis_result.repository_context.language
+            )
             or "unknown",
         )
 
@@ -70,9 +83,14 @@ class AIPromptOptimizer:
         return template.format(
             current_setup=current_setup,
             error_patterns=error_patterns,
-            repository_name=analysis_result.repository_context.name,
+            repository_name=self._repository_name(analysis_result),
         )
 
+    def _repository_name(self, analysis_result: AnalysisResult) -> str:
+        """リポジトリ名（コンテキストを収集しなかった場合は unknown）"""
+        repo = analysis_result.repository_context
+        return repo.name if repo else "unknown"
+
     def _format_error_summary(
         self, error_analyses: List[ErrorAnalysis]
     ) -> str:
@@ -97,23 +115,33 @@ class AIPromptOptimizer:
         return "\n".join(summary_parts)
 
     def _format_context_info(self, analysis_result: AnalysisResult) -> str:
-        """コンテキスト情報をフォーマット"""
+        """コンテキスト情報をフォーマット（収集しなかったものは省略）"""
         repo = analysis_result.repository_context
         workflow = analysis_result.workflow_context
         env = analysis_result.environment_context
 
-        context_parts = [
-            f"リポジトリ: {repo.name}",
-            f"主要言語: {repo.language or 'unknown'}",
-            (
-                f"フレームワーク: "
-                f"{', '.join(repo.frameworks) if repo.frameworks else 'none'}"
-            ),
-            f"パッケージマネージャー: {', '.join(repo.package_managers)}",
-            f"ワークフロー: {workflow.name}",
-            f"トリガー: {workflow.trigger}",
-            f"OS: {env.os}",
-        ]
+        context_parts = []
+        if repo:
+            frameworks = (
+                ", ".join(repo.frameworks) if repo.frameworks else "none"
+            )
+            context_parts.extend(
+                [
+                    f"リポジトリ: {repo.name}",
+                    f"主要言語: {repo.language or 'unknown'}",
+                    f"フレームワーク: {frameworks}",
+                    f"パッケージマネージャー: {', '.join(repo.package_managers)}",
+                ]
+            )
+        if workflow:
+            context_parts.extend(
+                [
+                    f"ワークフロー: {workflow.name}",
+                    f"トリガー: {workflow.trigger}",
+                ]
+            )
+        if env:
+            context_parts.append(f"OS: {env.os}")
 
         return "\n".join(context_parts)
 
@@ -137,14 +165,35 @@ class AIPromptOptimizer:
             if analysis.pattern_matches:
                 details_parts.append("検出されたパターン:")
                 for match in analysis.pattern_matches:
+                    occurrences = ""
+                    if match.occurrences > 1:
+                        occurrences = (
+                            f" ({match.occurrences}回、"
+                            f"{match.first_line}〜{match.last_line}行目)"
+                        )
                     details_parts.append(
                         f"- {match.pattern.name}: {match.matched_text}"
+                        f"{occurrences}"
                     )
+                    details_parts.extend(self._format_match_context(match))
 
             details_parts.append("")  # 空行
 
         return "\n".join(details_parts)
 
+    def _format_match_context(self, match: PatternMatch) -> List[str]:
+        """マッチした行の前後の行をフォーマット（取得していない場合は空）"""
+        if CONTEXT_BEFORE_KEY not in match.context:
+            return []
+        entry = match.context.get("log_entry")
+        lines = ["  ```"]
+        lines.extend(f"  {line}" for line in match.context[CONTEXT_BEFORE_KEY])
+        if entry is not None:
+            lines.append(f"> {entry.message}")
+        lines.extend(f"  {line}" for line in match.context[CONTEXT_AFTER_KEY])
+        lines.append("  ```")
+        return lines
+
     def _format_existing_solutions(
         self, solutions: List[SolutionProposal]
     ) -> str:
@@ -168,21 +217,30 @@ class AIPromptOptimizer:
         return "\n".join(solution_parts)
 
     def _format_current_setup(self, analysis_result: AnalysisResult) -> str:
-        """現在の設定をフォーマット"""
+        """現在の設定をフォーマット（収集しなかったものは省略）"""
         repo = analysis_result.repository_context
         workflow = analysis_result.workflow_context
 
-        setup_parts = [
-            f"リポジトリ名: {repo.name}",
-            f"主要言語: {repo.language or 'unknown'}",
-            (
-                f"使用フレームワーク: "
-                f"{', '.join(repo.frameworks) if repo.frameworks else 'none'}"
-            ),
-            f"パッケージマネージャー: {', '.join(repo.package_managers)}",
-            f"ワークフロー名: {workflow.name}",
-            f"トリガー条件: {workflow.trigger}",
-        ]
+        setup_parts = []
+        if repo:
+            frameworks = (
+                ", ".join(repo.frameworks) if repo.frameworks else "none"
+            )
+            setup_parts.extend(
+                [
+                    f"リポジトリ名: {repo.name}",
+                    f"主要言語: {repo.language or 'unknown'}",
+                    f"使用フレームワーク: {frameworks}",
+                    f"パッケージマネージャー: {', '.join(repo.package_managers)}",
+                ]
+            )
+        if workflow:
+            setup_parts.extend(
+                [
+                    f"ワークフロー名: {workflow.name}",
+                    f"トリガー条件: {workflow.trigger}",
+                ]
+            )
 
         return "\n".join(setup_parts)
 
@@ -199,7 +257,7 @@ class AIPromptOptimizer:
                 category = match.pattern.category.value
                 if category not in patterns:
                     patterns[category] = 0
-                patterns[category] += 1
+                patterns[category] += match.occurrences
 
         pattern_parts = []
         for category, count in patterns.items():
@@ -4,32 +4,81 @@ GitHub Actions Analyzer
 メインの解析エンジン。他のコンポーネントを統合してGitHub Actionsのログを解析します。
 """
 
+import functools
+import os
 import uuid
-from typing import Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from ..types import (
     AnalysisResult,
+    AnalysisState,
     ErrorAnalysis,
     ErrorPattern,
     LogEntry,
     LogLevel,
+    LogRecord,
     PatternMatch,
     SolutionProposal,
+    StepIndex,
+    StepSpan,
 )
 from .ai_prompt_optimizer import AIPromptOptimizer
+from .compression import detect_compression
+from .context_capture import ContextCapture
 from .context_collector import ContextCollector
+from .fingerprint import collapse_duplicates
+from .incremental import advance_state
+from .log_archive import is_log_archive
 from .log_processor import LogProcessor
+from .parallel import (
+    MatchResult,
+    collect_match_stats,
+    finish_step_spans,
+    match_archive,
+    match_compressed_log,
+    match_log_file_parallel,
+    match_log_files,
+)
 from .pattern_matcher import PatternMatcher
+from .result_cache import ResultCache
+from .step_segmenter import StepSegmenter
+
+# contexts 引数で指定できるコンテキスト名
+CONTEXT_NAMES = ("repository", "workflow", "environment")
 
 
 class GitHubActionsAnalyzer:
     """GitHub Actionsのログ解析を行うメインクラス"""
 
-    def __init__(self) -> None:
-        self.log_processor = LogProcessor()
+    def __init__(
+        self,
+        result_cache: Optional[ResultCache] = None,
+        filter_noise: bool = True,
+        context_lines: Tuple[int, int] = (0, 0),
+        collapse_repeated: bool = True,
+    ) -> None:
+        # 前処理済みのログでは filter_noise=False でノイズ行の判定を省く
+        # context_lines は各マッチに付与する (前の行数, 後の行数)
+        self.log_processor = LogProcessor(
+            filter_noise=filter_noise, context_lines=context_lines
+        )
+        # メッセージのフィンガープリントが同じマッチを1つにまとめるかどうか
+        self.collapse_repeated = collapse_repeated
         self.pattern_matcher = PatternMatcher()
         self.context_collector = ContextCollector()
         self.ai_prompt_optimizer = AIPromptOptimizer()
+        # 指定された場合、同じログの解析結果を再利用する
+        self.result_cache = result_cache
 
     def analyze_log_file(
         self,
@@ -37,39 +86,208 @@ class GitHubActionsAnalyzer:
         workflow_file_path: Optional[str] = None,
         repository_path: Optional[str] = None,
         min_log_level: LogLevel = LogLevel.WARNING,
+        jobs: int = 1,
+        contexts: Optional[Iterable[str]] = None,
+        state: Optional[AnalysisState] = None,
     ) -> AnalysisResult:
-        """ログファイルを解析して結果を返す"""
-
-        # ログファイルを読み込み
-        log_content = self._read_log_file(log_file_path)
-
-        # ログを前処理
-        log_entries = self.log_processor.process_log_file(log_content)
-
-        # ログレベルでフィルタリング
-        filtered_entries = self.log_processor.filter_by_level(
-            log_entries, min_log_level
+        """ログファイルを解析して結果を返す
+
+        jobs に2以上を指定すると、ログを行単位で分割して
+        複数プロセスで前処理とパターンマッチングを行います。
+        ログのZIPアーカイブは展開せずに、メンバーごとに処理します。
+        gzip / xz / zstd で圧縮されたログは伸長しながら処理します。
+        コンテキスト情報は結果の該当フィールドに初めてアクセスした時に
+        収集します。contexts に収集するコンテキスト名（CONTEXT_NAMES）を
+        指定すると、それ以外のコンテキストは収集せず None になります。
+
+        state を渡すと前回の解析位置から追記された部分のみを解析し、
+        検出済みのマッチと合わせた結果を返します。更新した state は
+        結果の state フィールドから次回の呼び出しに渡せます。
+
+        result_cache が設定されている場合、同じ内容のログを同じ条件で
+        解析した結果があればそれを返します（増分解析時は使用しません）。
+        """
+        context_loaders = self._context_loaders(
+            workflow_file_path, repository_path, contexts
         )
 
-        # パターンマッチング
-        pattern_matches = self.pattern_matcher.match_patterns(filtered_entries)
+        # ログの前処理とパターンマッチング
+        if state is not None:
+            pattern_matches, match_stats, step_spans = self._match_incremental(
+                log_file_path, min_log_level, state
+            )
+            result = self._build_analysis_result(
+                pattern_matches, match_stats, step_spans, context_loaders
+            )
+            result.state = state
+            return result
 
-        # コンテキスト情報を収集
-        repository_context = self.context_collector.collect_repository_context(
-            repository_path
-        )
-        workflow_context = self.context_collector.collect_workflow_context(
-            workflow_file_path
+        cache_key = self._cache_key(log_file_path, min_log_level)
+        cached = self._get_cached_result(cache_key, context_loaders)
+        if cached is not None:
+            return cached
+
+        pattern_matches, match_stats, step_spans = self._match_log_file(
+            log_file_path, min_log_level, jobs
         )
-        environment_context = (
-            self.context_collector.collect_environment_context()
+        result = self._build_analysis_result(
+            pattern_matches, match_stats, step_spans, context_loaders
         )
+        self._put_cached_result(cache_key, result)
+        return result
 
-        # エラー解析
-        error_analyses = self._analyze_errors(
-            filtered_entries, pattern_matches
+    def analyze_many(
+        self,
+        log_file_paths: Iterable[str],
+        workflow_file_path: Optional[str] = None,
+        repository_path: Optional[str] = None,
+        min_log_level: LogLevel = LogLevel.WARNING,
+        jobs: Optional[int] = None,
+        contexts: Optional[Iterable[str]] = None,
+    ) -> Iterator[Tuple[str, Union[AnalysisResult, Exception]]]:
+        """複数のログファイルを解析し、完了した順に (パス, 結果) を返す
+
+        コンテキスト情報は最初にアクセスされた時に一度だけ収集して
+        全ファイルで共有し、ログの処理は jobs 個（省略時はCPU数）の
+        ワーカープロセスで行います。
+        解析に失敗したファイルは結果の代わりに例外を返します。
+        """
+        context_loaders = self._context_loaders(
+            workflow_file_path, repository_path, contexts
         )
 
+        # キャッシュにあるファイルは先に返し、残りのみをワーカーで処理する
+        cache_keys: Dict[str, Optional[str]] = {}
+        for log_file_path in log_file_paths:
+            cache_key = self._cache_key(log_file_path, min_log_level)
+            cached = self._get_cached_result(cache_key, context_loaders)
+            if cached is not None:
+                yield log_file_path, cached
+            else:
+                cache_keys[log_file_path] = cache_key
+
+        for log_file_path, outcome in match_log_files(
+            self.log_processor,
+            self.pattern_matcher,
+            list(cache_keys),
+            min_log_level,
+            jobs or os.cpu_count() or 1,
+        ):
+            if isinstance(outcome, Exception):
+                yield log_file_path, outcome
+                continue
+
+            pattern_matches, match_stats, step_spans = outcome
+            result = self._build_analysis_result(
+                pattern_matches, match_stats, step_spans, context_loaders
+            )
+            self._put_cached_result(cache_keys[log_file_path], result)
+            yield log_file_path, result
+
+    def _cache_key(
+        self, log_file_path: str, min_log_level: LogLevel
+    ) -> Optional[str]:
+        """解析結果キャッシュのキー（キャッシュを使わない場合は None）"""
+        if self.result_cache is None:
+            return None
+        try:
+            return self.result_cache.make_key(
+                log_file_path,
+                self.pattern_matcher.pattern_set_version(),
+                {
+                    "min_log_level": LogLevel(min_log_level).value,
+                    "filter_noise": self.log_processor.filter_noise,
+                    "context_lines": list(self.log_processor.context_lines),
+                    "collapse_repeated": self.collapse_repeated,
+                },
+            )
+        except OSError:
+            # ファイルを読めない場合は通常の解析でエラーを報告する
+            return None
+
+    def _get_cached_result(
+        self,
+        cache_key: Optional[str],
+        context_loaders: Dict[str, Callable[[], Any]],
+    ) -> Optional[AnalysisResult]:
+        """キャッシュされた解析結果を取得し、コンテキストを付け直す"""
+        if self.result_cache is None or cache_key is None:
+            return None
+        result = self.result_cache.get(cache_key)
+        if result is None:
+            return None
+
+        result.analysis_id = str(uuid.uuid4())
+        result.metadata["cache_hit"] = True
+        for field_name, loader in context_loaders.items():
+            result.defer_context(field_name, loader)
+        return result
+
+    def _put_cached_result(
+        self, cache_key: Optional[str], result: AnalysisResult
+    ) -> None:
+        """解析結果をキャッシュに保存"""
+        if self.result_cache is not None and cache_key is not None:
+            self.result_cache.put(cache_key, result)
+
+    def _context_loaders(
+        self,
+        workflow_file_path: Optional[str],
+        repository_path: Optional[str],
+        contexts: Optional[Iterable[str]],
+    ) -> Dict[str, Callable[[], Any]]:
+        """収集するコンテキストのフィールド名と収集関数を返す
+
+        収集関数は初回の呼び出し結果を保持するため、
+        同じ収集関数を共有する解析結果間でコンテキストを一度だけ収集します。
+        """
+        names = CONTEXT_NAMES if contexts is None else tuple(contexts)
+        unknown = [name for name in names if name not in CONTEXT_NAMES]
+        if unknown:
+            raise ValueError(
+                f"不明なコンテキストです: {', '.join(unknown)} "
+                f"(指定可能: {', '.join(CONTEXT_NAMES)})"
+            )
+
+        collectors: Dict[str, Callable[[], Any]] = {
+            "repository": lambda: (
+                self.context_collector.collect_repository_context(
+                    repository_path
+                )
+            ),
+            "workflow": lambda: (
+                self.context_collector.collect_workflow_context(
+                    workflow_file_path
+                )
+            ),
+            "environment": self.context_collector.collect_environment_context,
+        }
+        return {
+            f"{name}_context": functools.lru_cache(maxsize=None)(
+                collectors[name]
+            )
+            for name in CONTEXT_NAMES
+            if name in names
+        }
+
+    def _build_analysis_result(
+        self,
+        pattern_matches: List[PatternMatch],
+        match_stats: Dict[str, int],
+        step_spans: List[StepSpan],
+        context_loaders: Dict[str, Callable[[], Any]],
+    ) -> AnalysisResult:
+        """パターンマッチの結果から解析結果を作成"""
+        # 行からステップを求めるインデックス（解析結果にも付与する）
+        step_index = StepIndex(step_spans)
+
+        # 同じエラーの繰り返しを1つのマッチにまとめる
+        if self.collapse_repeated:
+            pattern_matches = collapse_duplicates(pattern_matches)
+
+        # エラー解析（関連エントリはマッチのコンテキストから取得する）
+        error_analyses = self._analyze_errors([], pattern_matches, step_index)
+
         # 解決策提案
         solution_proposals = self._generate_solutions(error_analyses)
 
@@ -79,22 +297,135 @@ class GitHubActionsAnalyzer:
         # 推奨事項
         recommendations = self._generate_recommendations(error_analyses)
 
-        return AnalysisResult(
+        result = AnalysisResult(
             analysis_id=str(uuid.uuid4()),
-            repository_context=repository_context,
-            workflow_context=workflow_context,
-            environment_context=environment_context,
             error_analyses=error_analyses,
             solution_proposals=solution_proposals,
             summary=summary,
             recommendations=recommendations,
+            step_spans=step_spans,
+            metadata={"match_stats": match_stats},
+        )
+        result.step_index = step_index
+
+        # コンテキストは参照された時に収集する
+        for field_name, loader in context_loaders.items():
+            result.defer_context(field_name, loader)
+
+        return result
+
+    def _match_log_file(
+        self, log_file_path: str, min_log_level: LogLevel, jobs: int
+    ) -> MatchResult:
+        """ログファイルを読み込みながらパターンマッチングを実行"""
+        if is_log_archive(log_file_path):
+            return match_archive(
+                self.log_processor,
+                self.pattern_matcher,
+                log_file_path,
+                min_log_level,
+                jobs,
+            )
+        if detect_compression(log_file_path) is not None:
+            return match_compressed_log(
+                self.log_processor,
+                self.pattern_matcher,
+                log_file_path,
+                min_log_level,
+            )
+
+        if jobs > 1:
+            try:
+                return match_log_file_parallel(
+                    self.log_processor,
+                    self.pattern_matcher,
+                    log_file_path,
+                    min_log_level,
+                    jobs,
+                )
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    f"ログファイルが見つかりません: {log_file_path}"
+                )
+
+        # ログファイルをメモリマップで走査しながら前処理
+        # (ログ全体をメモリに保持しないようジェネレータで連結する)
+        # (##[group] のマーカー行でステップを追跡しながら読み込む)
+        # (マッチした行の前後の行は読み込みながらリングバッファで取得する)
+        segmenter = StepSegmenter()
+        self.log_processor.reset_noise_stats()
+        capture = self.log_processor.new_context_capture()
+        log_entries = self._iter_log_entries(
+            log_file_path, min_log_level, segmenter, capture
+        )
+
+        # ログレベルでフィルタリング
+        filtered_entries = self.log_processor.iter_by_level(
+            log_entries, min_log_level
+        )
+
+        # パターンマッチング
+        pattern_matches = self.pattern_matcher.match_patterns(
+            filtered_entries, capture
+        )
+        return (
+            pattern_matches,
+            collect_match_stats(self.log_processor, self.pattern_matcher),
+            finish_step_spans(segmenter, log_file_path),
         )
 
-    def _read_log_file(self, log_file_path: str) -> str:
-        """ログファイルを読み込み"""
+    def _match_incremental(
+        self,
+        log_file_path: str,
+        min_log_level: LogLevel,
+        state: AnalysisState,
+    ) -> MatchResult:
+        """state の位置から追記された部分を解析し、検出済みのマッチに加える"""
+        if is_log_archive(log_file_path):
+            raise ValueError(
+                f"ZIPアーカイブは増分解析に対応していません: {log_file_path}"
+            )
+        if detect_compression(log_file_path) is not None:
+            raise ValueError(
+                f"圧縮されたログは増分解析に対応していません: {log_file_path}"
+            )
         try:
-            with open(log_file_path, encoding="utf-8") as f:
-                return f.read()
+            new_matches = advance_state(
+                self.log_processor,
+                self.pattern_matcher,
+                log_file_path,
+                min_log_level,
+                state,
+            )
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"ログファイルが見つかりません: {log_file_path}"
+            )
+
+        # 状態をシリアライズできるよう、ログレコードはLogEntryにして保持する
+        # (まとめられて解析結果に含まれないマッチも状態には残る)
+        _materialize_log_entries(new_matches)
+        for match in new_matches:
+            stored = state.pattern_matches.setdefault(match.pattern.id, [])
+            stored.append(match)
+        step_spans = StepSegmenter(state.step_spans).finish(state.line_count)
+        return state.all_matches(), dict(state.match_stats), step_spans
+
+    def _iter_log_entries(
+        self,
+        log_file_path: str,
+        min_log_level: LogLevel,
+        segmenter: Optional[StepSegmenter] = None,
+        capture: Optional[ContextCapture] = None,
+    ) -> Iterator[LogRecord]:
+        """ログファイルを読み込みながら軽量なログレコードを返す"""
+        try:
+            yield from self.log_processor.iter_mapped_records(
+                log_file_path,
+                min_log_level,
+                segmenter=segmenter,
+                capture=capture,
+            )
         except FileNotFoundError:
             raise FileNotFoundError(
                 f"ログファイルが見つかりません: {log_file_path}"
@@ -103,26 +434,42 @@ class GitHubActionsAnalyzer:
             raise Exception(f"ログファイルの読み込みに失敗しました: {e}")
 
     def _analyze_errors(
-        self, log_entries: List[LogEntry], pattern_matches: List[PatternMatch]
+        self,
+        log_entries: List[LogEntry],
+        pattern_matches: List[PatternMatch],
+        step_index: Optional[StepIndex] = None,
     ) -> List[ErrorAnalysis]:
         """エラーを解析"""
         error_analyses: List[ErrorAnalysis] = []
 
-        # パターンマッチをグループ化
-        matches_by_pattern: Dict[str, List[PatternMatch]] = {}
+        # パターンマッチを (ジョブ名, パターンID) でグループ化
+        # (gh run view --log 形式でないログのジョブ名は None)
+        matches_by_pattern: Dict[
+            Tuple[Optional[str], str], List[PatternMatch]
+        ] = {}
         for match in pattern_matches:
-            pattern_id = match.pattern.id
-            if pattern_id not in matches_by_pattern:
-                matches_by_pattern[pattern_id] = []
-            matches_by_pattern[pattern_id].append(match)
+            key = (_job_name_of(match), match.pattern.id)
+            if key not in matches_by_pattern:
+                matches_by_pattern[key] = []
+            matches_by_pattern[key].append(match)
+
+        # 解析結果に含める行のみLogEntryに変換する
+        # (同じ行に複数のパターンがマッチした場合は変換結果を共有する)
+        materialized: Dict[LogRecord, LogEntry] = {}
 
         # 各パターンについてエラー解析を作成
-        for pattern_id, matches in matches_by_pattern.items():
+        for (job_name, pattern_id), matches in matches_by_pattern.items():
             # 関連するログエントリを収集
             related_entries = []
             for match in matches:
                 if "log_entry" in match.context:
-                    related_entries.append(match.context["log_entry"])
+                    entry = match.context["log_entry"]
+                    if isinstance(entry, LogRecord):
+                        if entry not in materialized:
+                            materialized[entry] = entry.to_log_entry()
+                        entry = materialized[entry]
+                        match.context["log_entry"] = entry
+                    related_entries.append(entry)
 
             # 重複を除去
             unique_entries = list(
@@ -138,19 +485,28 @@ class GitHubActionsAnalyzer:
             severity = self._determine_severity(matches)
 
             # 影響を受けるステップを特定
-            affected_steps = self._identify_affected_steps(unique_entries)
+            affected_steps = self._identify_affected_steps(
+                unique_entries, step_index
+            )
 
             # 関連ファイルを特定
             related_files = self._identify_related_files(unique_entries)
 
+            error_id = f"error_{pattern_id}_{len(error_analyses)}"
+            if job_name is not None:
+                error_id = (
+                    f"error_{job_name}_{pattern_id}_{len(error_analyses)}"
+                )
+
             error_analysis = ErrorAnalysis(
-                error_id=f"error_{pattern_id}_{len(error_analyses)}",
+                error_id=error_id,
                 log_entries=unique_entries,
                 pattern_matches=matches,
                 root_cause=root_cause,
                 severity=severity,
                 affected_steps=affected_steps,
                 related_files=related_files,
+                job_name=job_name,
             )
 
             error_analyses.append(error_analysis)
@@ -186,13 +542,30 @@ class GitHubActionsAnalyzer:
             return "info"
 
     def _identify_affected_steps(
-        self, log_entries: List[LogEntry]
+        self,
+        log_entries: List[LogEntry],
+        step_index: Optional[StepIndex] = None,
     ) -> List[str]:
-        """影響を受けるステップを特定"""
-        steps = set()
+        """影響を受けるステップを特定（最初に現れた順）
+
+        step_index がある場合は行番号から二分探索でステップを求め、
+        範囲外の行と gh run view --log 形式の行はエントリのステップ名を
+        使用します。
+        """
+        steps: Dict[str, None] = {}
         for entry in log_entries:
-            if entry.step_name:
-                steps.add(entry.step_name)
+            step_name = entry.step_name
+            line_number = entry.metadata.get("line_number")
+            if (
+                step_index
+                and line_number is not None
+                and "job_name" not in entry.metadata
+            ):
+                step = step_index.step_at(line_number)
+                if step is not None:
+                    step_name = step.name
+            if step_name:
+                steps[step_name] = None
         return list(steps)
 
     def _identify_related_files(
@@ -271,7 +644,9 @@ class GitHubActionsAnalyzer:
         for analysis in error_analyses:
             for match in analysis.pattern_matches:
                 category = match.pattern.category
-                categories[category] = categories.get(category, 0) + 1
+                categories[category] = (
+                    categories.get(category, 0) + match.occurrences
+                )
 
         if categories:
             summary += " エラーの種類: " + ", ".join(
@@ -314,3 +689,27 @@ class GitHubActionsAnalyzer:
             )
 
         return recommendations
+
+
+def _job_name_of(match: PatternMatch) -> Optional[str]:
+    """マッチした行のジョブ名（gh run view --log 形式でなければ None）"""
+    entry = match.context.get("log_entry")
+    if isinstance(entry, LogRecord):
+        return entry.job_name
+    if isinstance(entry, LogEntry):
+        return entry.metadata.get("job_name")
+    return None
+
+
+def _materialize_log_entries(matches: List[PatternMatch]) -> None:
+    """マッチのログレコードをLogEntryに変換する
+
+    同じ行に複数のパターンがマッチした場合は変換結果を共有します。
+    """
+    materialized: Dict[int, LogEntry] = {}
+    for match in matches:
+        entry = match.context.get("log_entry")
+        if isinstance(entry, LogRecord):
+            if id(entry) not in materialized:
+                materialized[id(entry)] = entry.to_log_entry()
+            match.context["log_entry"] = materialized[id(entry)]
@@ -0,0 +1,24 @@
+"""
+キャッシュディレクトリ
+
+解析結果やツール情報をディスクにキャッシュする際の保存先を決定します。
+"""
+
+import os
+from pathlib import Path
+
+CACHE_DIR_NAME = "github-actions-ai-analyzer"
+
+
+def get_cache_dir() -> Path:
+    """キャッシュディレクトリのパスを返す
+
+    環境変数 ``GH_ACTIONS_ANALYZER_CACHE_DIR`` が設定されていればそれを、
+    なければ ``XDG_CACHE_HOME``（未設定時は ``~/.cache``）配下を使用します。
+    """
+    override = os.environ.get("GH_ACTIONS_ANALYZER_CACHE_DIR")
+    if override:
+        return Path(override)
+
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / CACHE_DIR_NAME
@@ -0,0 +1,69 @@
+"""
+圧縮ログの読み込み
+
+先頭のマジックバイトから gzip / xz / zstd の圧縮を判定し、
+一定の大きさずつ伸長しながら読み込みます。zstd の伸長には
+オプションの依存パッケージ zstandard を使用します。
+"""
+
+import gzip
+import io
+import lzma
+from typing import Any, BinaryIO, Optional
+
+# 圧縮形式 -> マジックバイト
+MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+# 伸長したデータを読み込む単位（使用するメモリはおよそこの大きさに比例する）
+DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+
+_MAGIC_LENGTH = max(len(magic) for magic in MAGIC_BYTES.values())
+
+
+def detect_compression(log_file_path: str) -> Optional[str]:
+    """ログファイルの圧縮形式（圧縮されていない場合は None）"""
+    with open(log_file_path, "rb") as f:
+        head = f.read(_MAGIC_LENGTH)
+    for compression, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_log_binary(log_file_path: str) -> BinaryIO:
+    """ログファイルをバイナリモードで開く（圧縮されていれば伸長しながら読む）"""
+    compression = detect_compression(log_file_path)
+    if compression is None:
+        return open(log_file_path, "rb")
+
+    raw: Any
+    if compression == "gzip":
+        raw = gzip.open(log_file_path, "rb")
+    elif compression == "xz":
+        raw = lzma.open(log_file_path, "rb")
+    else:
+        raw = _open_zstd(log_file_path)
+    return io.BufferedReader(raw, buffer_size=DECOMPRESS_CHUNK_SIZE)
+
+
+def open_log_text(
+    log_file_path: str, encoding: str = "utf-8"
+) -> io.TextIOWrapper:
+    """ログファイルをテキストモードで開く（圧縮されていれば伸長しながら読む）"""
+    return io.TextIOWrapper(open_log_binary(log_file_path), encoding=encoding)
+
+
+def _open_zstd(log_file_path: str) -> Any:
+    """zstd 圧縮のログを開く"""
+    try:
+        import zstandard
+    except ImportError as err:
+        raise ImportError(
+            "zstd 圧縮のログを読み込むには zstandard が必要です "
+            "(pip install 'github-actions-ai-analyzer[zstd]')"
+        ) from err
+    return zstandard.open(log_file_path, "rb")
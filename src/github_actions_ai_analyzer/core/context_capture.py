@@ -0,0 +1,90 @@
+"""
+前後の行の取得
+
+ログを読み込みながら直近の行をリングバッファに保持し、パターンに
+マッチした行の前後の行をマッチのコンテキストに付与します。
+ログ全体を保持せず、使用するメモリは取得する行数に比例します。
+"""
+
+from collections import deque
+from typing import Deque, Iterable, List, Tuple
+
+from ..types import PatternMatch
+
+# コンテキストに付与するキー
+CONTEXT_BEFORE_KEY = "context_before"
+CONTEXT_AFTER_KEY = "context_after"
+
+
+class ContextCapture:
+    """マッチした行の前後の行を取得するクラス
+
+    読み込んだすべての行（読み飛ばす行を含む）を push() に、
+    マッチを capture() に行番号順に渡します。マッチした行は
+    capture() より前に push() されている必要があります。
+    前の行は capture() の時点で、後の行は以降の push() で揃います。
+    """
+
+    def __init__(
+        self, before: int, after: int, encoding: str = "utf-8"
+    ) -> None:
+        """初期化"""
+        self.before = before
+        self.after = after
+        self.encoding = encoding
+        # 直近の行（マッチした行自体を含むため1行多く保持する）
+        self._recent: Deque[Tuple[int, bytes]] = deque(maxlen=before + 1)
+        # 後の行が揃っていない (後の行のリスト, マッチした行の行番号)
+        self._pending: List[Tuple[List[str], int]] = []
+
+    @property
+    def pending(self) -> bool:
+        """後の行が揃っていないマッチがあるかどうか"""
+        return bool(self._pending)
+
+    def push(self, line_number: int, raw: bytes) -> None:
+        """読み込んだ行を渡す"""
+        if self._pending:
+            text = raw.decode(self.encoding, errors="replace")
+            for lines, match_line in self._pending:
+                if line_number > match_line:
+                    lines.append(text)
+            self._pending = [
+                item for item in self._pending if len(item[0]) < self.after
+            ]
+        if self.before:
+            self._recent.append((line_number, raw))
+
+    def prime(self, numbered_lines: Iterable[Tuple[int, str]]) -> None:
+        """範囲の直前の (行番号, 行) を前の行として渡す"""
+        for line_number, line in numbered_lines:
+            self.push(line_number, line.encode(self.encoding))
+
+    def fill(self, numbered_lines: Iterable[Tuple[int, str]]) -> None:
+        """範囲の直後の (行番号, 行) で後の行を補う（揃った時点で終了）"""
+        for line_number, line in numbered_lines:
+            if not self._pending:
+                return
+            self.push(line_number, line.encode(self.encoding))
+
+    def capture(
+        self, line_number: int, matches: Iterable[PatternMatch]
+    ) -> None:
+        """マッチした行の前後の行をマッチのコンテキストに付与
+
+        同じ行のマッチは前後の行のリストを共有します。
+        """
+        before = [
+            raw.decode(self.encoding, errors="replace")
+            for number, raw in self._recent
+            if number < line_number
+        ]
+        excess = len(before) - self.before
+        if excess > 0:
+            before = before[excess:]
+        after: List[str] = []
+        for match in matches:
+            match.context[CONTEXT_BEFORE_KEY] = before
+            match.context[CONTEXT_AFTER_KEY] = after
+        if self.after:
+            self._pending.append((after, line_number))
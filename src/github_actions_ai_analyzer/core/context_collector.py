@@ -4,22 +4,40 @@
 リポジトリ、ワークフロー、環境のコンテキスト情報を収集します。
 """
 
+import hashlib
 import json
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import yaml
 
 from ..types import EnvironmentContext, RepositoryContext, WorkflowContext
+from .cache_dir import get_cache_dir
+
+# 検出対象のツール
+BASIC_TOOLS = ("git", "python", "node", "npm", "java", "mvn", "gradle")
+
+# バージョン情報のキャッシュファイル名
+TOOL_VERSIONS_CACHE_FILE = "tool_versions.json"
 
 
 class ContextCollector:
     """コンテキスト情報を収集するクラス"""
 
-    def __init__(self) -> None:
-        """初期化"""
-        pass
+    def __init__(
+        self, probe_versions: bool = False, cache_dir: Optional[str] = None
+    ) -> None:
+        """初期化
+
+        ツールの検出は PATH の探索のみで行います。probe_versions を有効に
+        すると各ツールの ``--version`` を並行して実行し、結果を PATH と
+        実行ファイルの更新時刻をキーにディスクへキャッシュします。
+        """
+        self.probe_versions = probe_versions
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir()
 
     def collect_repository_context(
         self, repository_path: Optional[str] = None
@@ -85,6 +103,11 @@ class ContextCollector:
 
         # 利用可能なツールを検出
         available_tools = self._detect_available_tools()
+        tool_versions = (
+            self._probe_tool_versions(available_tools)
+            if self.probe_versions
+            else {}
+        )
 
         # 環境変数
         env_vars = dict(os.environ)
@@ -96,6 +119,7 @@ class ContextCollector:
             os=os_type,
             runner_version="unknown",  # GitHub Actions環境で取得
             available_tools=available_tools,
+            tool_versions=tool_versions,
             environment_variables=env_vars,
             working_directory=working_directory,
         )
@@ -298,31 +322,67 @@ class ContextCollector:
         )
 
     def _detect_available_tools(self) -> List[str]:
-        """利用可能なツールを検出"""
-        tools = []
+        """利用可能なツールを検出（PATHの探索のみでサブプロセスは起動しない）"""
+        return [tool for tool in BASIC_TOOLS if shutil.which(tool)]
+
+    def _probe_tool_versions(self, tools: List[str]) -> Dict[str, str]:
+        """ツールのバージョンを並行して取得（ディスクキャッシュ付き）"""
+        cache_key = self._tool_cache_key(tools)
+        cache_file = self.cache_dir / TOOL_VERSIONS_CACHE_FILE
+
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("key") == cache_key:
+                return dict(cached["versions"])
+        except (OSError, ValueError, KeyError, AttributeError):
+            # キャッシュがない、または壊れている場合は取得し直す
+            pass
+
+        versions: Dict[str, str] = {}
+        if tools:
+            with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+                for tool, version in zip(
+                    tools, executor.map(self._get_tool_version, tools)
+                ):
+                    if version is not None:
+                        versions[tool] = version
 
-        # 基本的なツール
-        basic_tools = ["git", "python", "node", "npm", "java", "mvn", "gradle"]
-        for tool in basic_tools:
-            if self._is_tool_available(tool):
-                tools.append(tool)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, "w", encoding="utf-8") as f:
+                json.dump({"key": cache_key, "versions": versions}, f)
+        except OSError:
+            # キャッシュの保存に失敗しても結果はそのまま返す
+            pass
+
+        return versions
+
+    def _tool_cache_key(self, tools: List[str]) -> str:
+        """PATHの内容と実行ファイルの更新時刻からキャッシュキーを作成"""
+        fingerprint: Dict[str, Any] = {"PATH": os.environ.get("PATH", "")}
+        for tool in tools:
+            tool_path = shutil.which(tool)
+            if tool_path is None:
+                continue
+            try:
+                mtime = os.stat(tool_path).st_mtime_ns
+            except OSError:
+                mtime = None
+            fingerprint[tool] = [tool_path, mtime]
 
-        return tools
+        encoded = json.dumps(fingerprint, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
 
     def _is_tool_available(self, tool: str) -> bool:
         """ツールが利用可能かどうかを確認"""
+        return self._get_tool_version(tool) is not None
+
+    def _get_tool_version(self, tool: str) -> Optional[str]:
+        """ツールの ``--version`` 出力の1行目を取得（利用不可ならNone）"""
         # セキュリティ: 許可されたツールのみをチェック
-        allowed_tools = {
-            "git",
-            "python",
-            "node",
-            "npm",
-            "java",
-            "mvn",
-            "gradle",
-        }
-        if tool not in allowed_tools:
-            return False
+        if tool not in BASIC_TOOLS:
+            return None
 
         try:
             import subprocess  # nosec B404
@@ -330,6 +390,11 @@ class ContextCollector:
             result = subprocess.run(  # nosec B603
                 [tool, "--version"], capture_output=True, text=True
             )
-            return result.returncode == 0
         except (FileNotFoundError, subprocess.SubprocessError):
-            return False
+            return None
+
+        if result.returncode != 0:
+            return None
+        # javaなどはバージョンを標準エラー出力に書き出す
+        output = f"{result.stdout or ''}\n{result.stderr or ''}".strip()
+        return output.splitlines()[0] if output else ""
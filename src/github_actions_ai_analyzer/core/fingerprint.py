@@ -0,0 +1,106 @@
+"""
+エラーメッセージのフィンガープリント
+
+タイムスタンプ・16進数のID・パス・数値を正規化したメッセージを
+フィンガープリントとし、同じエラーの繰り返し（リトライやテストの
+ループなど）を発生回数と最初・最後の行番号を持つ1つのマッチにまとめます。
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..types import PatternMatch
+
+# 正規化の規則（名前 -> 正規表現、前にある規則を優先する）
+NORMALIZE_RULES = {
+    "timestamp": (
+        r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?"
+        r"(?:Z|[+-]\d{2}:?\d{2})?"
+    ),
+    "hex": (
+        r"\b[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}\b"
+        r"|\b0x[0-9a-fA-F]+\b"
+        r"|\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{7,}\b"
+    ),
+    "path": (
+        r"(?<![\w./~-])(?:~|\.{1,2})?/[^\s'\"`:,;()\[\]<>]+"
+        r"|\b[A-Za-z]:\\[^\s'\"`:,;()\[\]<>]+"
+    ),
+    "number": r"\d+(?:\.\d+)*",
+}
+
+_NORMALIZE_REGEX = re.compile(
+    "|".join(f"(?P<{name}>{regex})" for name, regex in NORMALIZE_RULES.items())
+)
+
+# 正規化したメッセージを保持する件数（繰り返し現れる行は正規化を省く）
+FINGERPRINT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def message_fingerprint(message: str) -> str:
+    """メッセージのフィンガープリント（可変部分を <規則名> に置き換えたもの）"""
+    return _NORMALIZE_REGEX.sub(_placeholder, message.strip())
+
+
+def _placeholder(match: "re.Match[str]") -> str:
+    """正規化した部分の置き換え文字列"""
+    return f"<{match.lastgroup}>"
+
+
+def collapse_duplicates(matches: List[PatternMatch]) -> List[PatternMatch]:
+    """ジョブ・パターン・フィンガープリントが同じマッチを1つにまとめる
+
+    まとめたマッチは最初のマッチのコピーで、occurrences に発生回数、
+    first_line / last_line に最初と最後の行番号を設定します。
+    まとめ済みのマッチを渡した場合は発生回数を合算します。
+    順序は最初の発生順で、元のマッチは変更しません。
+    """
+    collapsed: Dict[Tuple[Optional[str], str, str], PatternMatch] = {}
+    for match in matches:
+        metadata = _entry_metadata(match)
+        line_number = metadata.get("line_number")
+        first_line = (
+            match.first_line if match.first_line is not None else line_number
+        )
+        last_line = (
+            match.last_line if match.last_line is not None else line_number
+        )
+        key = (
+            metadata.get("job_name"),
+            match.pattern.id,
+            message_fingerprint(
+                match.context.get("full_message", match.matched_text)
+            ),
+        )
+
+        current = collapsed.get(key)
+        if current is None:
+            collapsed[key] = match.model_copy(
+                update={"first_line": first_line, "last_line": last_line}
+            )
+            continue
+        current.occurrences += match.occurrences
+        current.first_line = _bound(min, current.first_line, first_line)
+        current.last_line = _bound(max, current.last_line, last_line)
+    return list(collapsed.values())
+
+
+def _entry_metadata(match: PatternMatch) -> Dict[str, Any]:
+    """マッチした行のメタデータ（行番号・ジョブ名）"""
+    entry = match.context.get("log_entry")
+    return entry.metadata if entry is not None else {}
+
+
+def _bound(
+    choose: Callable[[int, int], int],
+    current: Optional[int],
+    line_number: Optional[int],
+) -> Optional[int]:
+    """行番号の最小値・最大値（行番号がない場合は他方）"""
+    if current is None:
+        return line_number
+    if line_number is None:
+        return current
+    return choose(current, line_number)
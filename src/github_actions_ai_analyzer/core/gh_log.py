@@ -0,0 +1,109 @@
+"""
+gh run view --log 形式
+
+``gh run view --log`` の出力は、各行の先頭に
+``ジョブ名<TAB>ステップ名<TAB>`` が付いたタイムスタンプ付きのログです。
+行の分解と、ジョブごとのバイト範囲への分割を正規表現を使わずに行います。
+"""
+
+import mmap
+import os
+from typing import List, NamedTuple, Optional, Tuple
+
+from .timestamp import parse_timestamp_at
+
+# ステップごとのログの先頭に付くBOM
+_BOM = "﻿"
+
+# 形式を判定する際に読み飛ばす、先頭のコメント行・空行の最大数
+_MAX_PREAMBLE_LINES = 64
+
+
+class JobRange(NamedTuple):
+    """1つのジョブのログのバイト範囲"""
+
+    name: str
+    start: int
+    end: int
+
+
+def split_gh_prefix(line: str) -> Optional[Tuple[str, str, str]]:
+    """行を (ジョブ名, ステップ名, 残り) に分解（形式が異なる場合は None）"""
+    job_name, sep, rest = line.partition("\t")
+    if not sep:
+        return None
+    step_name, sep, rest = rest.partition("\t")
+    if not sep:
+        return None
+    if rest.startswith(_BOM):
+        rest = rest[1:]
+    if parse_timestamp_at(rest, 0)[1] == 0:
+        return None
+    return job_name, step_name, rest
+
+
+def job_ranges(log_file_path: str) -> List[JobRange]:
+    """gh run view --log 形式のログをジョブごとのバイト範囲に分割
+
+    同じジョブの行は連続して出力されるため、ジョブ名の接頭辞が最後に
+    現れる行を後方から探して範囲の終わりとします。先頭のコメント行
+    （gh_log_collector が付けるヘッダー）と空行は範囲に含めません。
+    形式が異なるログの場合は空のリストを返します。
+    """
+    with open(log_file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = _skip_preamble(mapped, size)
+            if start is None:
+                return []
+
+            ranges: List[JobRange] = []
+            while start < size:
+                line_end = mapped.find(b"\n", start)
+                if line_end == -1:
+                    line_end = size
+                tab = mapped.find(b"\t", start, line_end)
+                if tab == -1:
+                    # 末尾の空行など、ジョブに属さない行で終了
+                    break
+
+                prefix_end = tab + 1
+                prefix = mapped[start:prefix_end]
+                last = mapped.rfind(b"\n" + prefix, start, size)
+                last_start = start if last == -1 else last + 1
+                end = mapped.find(b"\n", last_start)
+                end = size if end == -1 else end + 1
+
+                ranges.append(
+                    JobRange(
+                        prefix[:-1].decode("utf-8", errors="replace"),
+                        start,
+                        end,
+                    )
+                )
+                start = end
+    return ranges
+
+
+def _skip_preamble(mapped: mmap.mmap, size: int) -> Optional[int]:
+    """先頭のコメント行・空行を読み飛ばした最初の行の位置
+
+    最初の行が gh run view --log 形式でない場合は None を返します。
+    """
+    start = 0
+    for _ in range(_MAX_PREAMBLE_LINES):
+        if start >= size:
+            break
+        line_end = mapped.find(b"\n", start)
+        if line_end == -1:
+            line_end = size
+        line = mapped[start:line_end].rstrip(b"\r")
+        if line.strip() and not line.startswith(b"#"):
+            text = line.decode("utf-8", errors="replace")
+            if split_gh_prefix(text) is None:
+                return None
+            return start
+        start = line_end + 1
+    return None
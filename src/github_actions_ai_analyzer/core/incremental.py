@@ -0,0 +1,161 @@
+"""
+増分解析
+
+AnalysisState に記録した位置から、ログファイルに追記された部分だけを
+前処理・パターンマッチングします。
+"""
+
+import hashlib
+import mmap
+import os
+from itertools import chain
+from typing import Iterable, List
+
+from ..types import AnalysisState, LogLevel, LogRecord, PatternMatch
+from .log_processor import LogProcessor
+from .log_reader import complete_lines_end, count_lines, iter_mmap_lines
+from .parallel import collect_match_stats, prime_context
+from .pattern_matcher import PatternMatcher
+from .step_segmenter import STEP_MARKER_BYTES_REGEX, StepSegmenter
+
+# ファイルが置き換えられていないか確認するために比較する先頭のバイト数
+HEAD_CHECK_SIZE = 4096
+
+
+def advance_state(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_path: str,
+    min_log_level: LogLevel,
+    state: AnalysisState,
+) -> List[PatternMatch]:
+    """state の位置から追記された行を解析し、新しいマッチを返す
+
+    state の位置・行数・書き込み途中の行・ステップの範囲を更新します（マッチの蓄積は
+    呼び出し側で行います）。ファイルが短くなった場合、先頭の内容が
+    変わった場合、最小ログレベルが異なる場合は最初から解析し直します。
+    """
+    size = os.path.getsize(log_file_path)
+    if (
+        state.min_log_level != LogLevel(min_log_level)
+        or size < state.offset
+        or not _same_head(log_file_path, state)
+    ):
+        state.reset()
+        state.min_log_level = LogLevel(min_log_level)
+
+    start = state.offset
+    if start == size:
+        return []
+
+    with (
+        open(log_file_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        end = complete_lines_end(log_file_path, start, size)
+        tail = mapped[end:size]
+        if end == start:
+            # 改行が追記されていない（書き込み途中の行の続き）
+            _advance_head(mapped, state, size)
+            state.partial_line += tail
+            state.offset = size
+            return []
+
+        lines_before = state.line_count
+        range_start = start
+        segmenter = StepSegmenter(state.step_spans)
+        log_processor.reset_noise_stats()
+        head_records: Iterable[LogRecord] = ()
+        if state.partial_line:
+            # 前回の書き込み途中の行を今回追記された部分と連結して1行にする
+            # (UTF-8として不正なバイトは置き換え、再開を止めない)
+            newline = mapped.find(b"\n", start, end)
+            line = (state.partial_line + mapped[start:newline]).decode(
+                "utf-8", errors="replace"
+            )
+            lines_before += 1
+            head_records = log_processor.process_numbered_records(
+                [(lines_before, line.rstrip("\r"))], segmenter, min_log_level
+            )
+            range_start = newline + 1
+
+        _advance_head(mapped, state, size)
+
+    # 前の行は前回までの行から補う（後の行は今回追記された行まで）
+    capture = log_processor.new_context_capture()
+    if capture is not None:
+        prime_context(capture, log_file_path, range_start, lines_before + 1)
+    body_records = log_processor.iter_mapped_records(
+        log_file_path,
+        min_log_level,
+        start=range_start,
+        end=end,
+        segmenter=segmenter,
+        first_line=lines_before + 1,
+        capture=capture,
+    )
+    matches = pattern_matcher.match_patterns(
+        log_processor.iter_by_level(
+            chain(head_records, body_records), min_log_level
+        ),
+        capture,
+    )
+
+    state.line_count = lines_before + count_lines(
+        log_file_path, range_start, end
+    )
+    state.partial_line = tail
+    state.offset = size
+    state.step_spans = segmenter.spans
+    for key, value in collect_match_stats(
+        log_processor, pattern_matcher
+    ).items():
+        state.match_stats[key] = state.match_stats.get(key, 0) + value
+    return matches
+
+
+def skip_to_end(
+    log_file_path: str, min_log_level: LogLevel, state: AnalysisState
+) -> None:
+    """ファイルの現在の内容を解析済みとして state を末尾まで進める
+
+    以降に追記される行のステップを求めるため、マーカー行のみを読み込みます。
+    """
+    size = os.path.getsize(log_file_path)
+    state.reset()
+    state.min_log_level = LogLevel(min_log_level)
+    if size == 0:
+        return
+    end = complete_lines_end(log_file_path, 0, size)
+    with (
+        open(log_file_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        _advance_head(mapped, state, size)
+        state.partial_line = mapped[end:size]
+    state.line_count = count_lines(log_file_path, 0, end)
+    state.offset = size
+
+    segmenter = StepSegmenter()
+    for line_number, line in iter_mmap_lines(
+        log_file_path, require_regex=STEP_MARKER_BYTES_REGEX, end=end
+    ):
+        segmenter.feed(line_number, line)
+    state.step_spans = segmenter.spans
+
+
+def _same_head(log_file_path: str, state: AnalysisState) -> bool:
+    """ファイルの先頭が前回の解析時と同じかどうか"""
+    if state.head_size == 0:
+        return True
+    with open(log_file_path, "rb") as f:
+        head = f.read(state.head_size)
+    return hashlib.sha256(head).hexdigest() == state.head_digest
+
+
+def _advance_head(mapped: mmap.mmap, state: AnalysisState, size: int) -> None:
+    """同一性の確認に使う先頭部分のハッシュを更新"""
+    head_size = min(size, HEAD_CHECK_SIZE)
+    if head_size > state.head_size:
+        state.head_size = head_size
+        state.head_digest = hashlib.sha256(mapped[:head_size]).hexdigest()
@@ -0,0 +1,205 @@
+"""
+リテラル索引
+
+エラーパターンの正規表現から「マッチするなら必ず含まれる」リテラル文字列を
+抽出し、行に含まれるリテラルから実行が必要なパターンを絞り込みます。
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..types import ErrorPattern
+
+# これより短いリテラルは絞り込み効果が薄いため使用しない
+MIN_LITERAL_LENGTH = 3
+
+# 直前の要素を任意化・反復する量指定子
+_QUANTIFIERS = "*?{"
+
+# 2文字で完結する英字のエスケープ（文字クラス・位置・制御文字）
+_SIMPLE_ESCAPES = "dDsSwWbBAZzntrfva"
+
+# verboseフラグ付きのパターンは空白の扱いが異なるため対象外
+_VERBOSE_FLAG = re.compile(r"\(\?[aiLmsu-]*x")
+
+
+def extract_required_literals(pattern: str) -> Optional[List[str]]:
+    """正規表現から必須リテラルを抽出
+
+    トップレベルの選択肢（``|``）ごとに最長の必須リテラルを1つ選び、
+    小文字化して返します。いずれかの選択肢から十分な長さのリテラルが
+    得られない場合は None を返します（常に実行が必要なパターン）。
+    """
+    if _VERBOSE_FLAG.search(pattern):
+        return None
+
+    literals = []
+    for branch in _split_top_level(pattern):
+        literal = _longest_literal(branch)
+        if (
+            literal is None
+            or len(literal) < MIN_LITERAL_LENGTH
+            or not literal.isascii()
+        ):
+            return None
+        literals.append(literal.lower())
+    return literals
+
+
+def _split_top_level(pattern: str) -> List[str]:
+    """トップレベルの ``|`` でパターンを分割"""
+    branches = []
+    start = 0
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """文字クラス ``[...]`` の直後の位置を返す"""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """グループ ``(...)`` の直後の位置を返す"""
+    depth = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _longest_literal(branch: str) -> Optional[str]:
+    """選択肢に必ず現れる連続リテラルのうち最長のものを返す
+
+    グループ・文字クラス・任意化された文字はリテラルの区切りとして扱い、
+    その中身は使用しません（安全側に倒す）。
+    長さを解析しないエスケープ（``\\x41``・``\\N{...}``・8進数や
+    後方参照の数字など）を含む場合は None を返します。
+    """
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    i = 0
+    while i < len(branch):
+        char = branch[i]
+        if char == "\\":
+            escaped = branch[i + 1] if i + 1 < len(branch) else ""
+            i += 2
+            if escaped.isalnum() and escaped not in _SIMPLE_ESCAPES:
+                # 後続の文字まで続くエスケープはリテラルと区別できない
+                return None
+            if not escaped or escaped.isalnum():
+                # \d, \b, \n などはリテラルではない
+                flush()
+                continue
+            char = escaped
+        elif char == "(":
+            flush()
+            i = _skip_group(branch, i)
+            continue
+        elif char == "[":
+            flush()
+            i = _skip_class(branch, i)
+            continue
+        elif char == "{":
+            # {m,n} の中身はリテラルではない
+            flush()
+            end = branch.find("}", i)
+            i = len(branch) if end == -1 else end + 1
+            continue
+        elif char in ".^$*+?)}":
+            flush()
+            i += 1
+            continue
+        else:
+            i += 1
+
+        following = branch[i] if i < len(branch) else ""
+        if following and following in _QUANTIFIERS:
+            # 直前の文字は出現しない可能性がある
+            flush()
+            continue
+        current.append(char)
+        if following == "+":
+            # 1回以上の反復なので、後続の文字とは連続しない
+            flush()
+    flush()
+
+    return max(runs, key=len) if runs else None
+
+
+class LiteralIndex:
+    """必須リテラルからパターンを絞り込む索引"""
+
+    def __init__(self, patterns: Iterable[ErrorPattern]) -> None:
+        """初期化"""
+        # リテラル -> そのリテラルを必須とするパターンID
+        self.literals: Dict[str, Set[str]] = {}
+        # リテラルを抽出できず常に実行するパターンID
+        self.always_run: Set[str] = set()
+
+        for pattern in patterns:
+            literals = extract_required_literals(pattern.regex_pattern)
+            if literals is None:
+                self.always_run.add(pattern.id)
+                continue
+            for literal in literals:
+                self.literals.setdefault(literal, set()).add(pattern.id)
+
+    def candidates(self, message: str) -> Optional[Set[str]]:
+        """行に対して実行が必要なパターンIDを返す
+
+        大文字小文字を無視したマッチは非ASCII文字で小文字化と一致しない
+        場合があるため、非ASCIIの行は None（全パターン実行）を返します。
+        """
+        if not message.isascii():
+            return None
+
+        lowered = message.lower()
+        pattern_ids = set(self.always_run)
+        for literal, literal_pattern_ids in self.literals.items():
+            if literal in lowered:
+                pattern_ids.update(literal_pattern_ids)
+        return pattern_ids
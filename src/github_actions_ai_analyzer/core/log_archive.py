@@ -0,0 +1,85 @@
+"""
+ログアーカイブ
+
+GitHubのREST APIやWeb UIからダウンロードしたログのZIPアーカイブを
+展開せずに読み込みます。アーカイブは次の構成です。
+
+- ``<ジョブ名>/<番号>_<ステップ名>.txt``: ステップごとのログ
+- ``<番号>_<ジョブ名>.txt``: ジョブ全体のログ
+
+ジョブ全体のログはステップごとのログと内容が重複するため、
+ステップごとのログがあるジョブでは使用しません。
+"""
+
+import re
+import zipfile
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# メンバー名の先頭の実行順の番号
+_ORDER_PREFIX_REGEX = re.compile(r"(\d+)_(.*)")
+
+_LOG_SUFFIX = ".txt"
+
+
+class ArchiveMember(NamedTuple):
+    """アーカイブ内の1つのログ"""
+
+    name: str
+    job_name: str
+    step_name: Optional[str]
+
+
+def is_log_archive(log_file_path: str) -> bool:
+    """ログのZIPアーカイブかどうか"""
+    return zipfile.is_zipfile(log_file_path)
+
+
+def archive_members(log_file_path: str) -> List[ArchiveMember]:
+    """アーカイブ内のログを実行順に返す
+
+    ジョブ名とステップ名はディレクトリ構成とファイル名から求めます。
+    """
+    with zipfile.ZipFile(log_file_path) as archive:
+        names = [
+            info.filename
+            for info in archive.infolist()
+            if not info.is_dir() and info.filename.endswith(_LOG_SUFFIX)
+        ]
+
+    step_logs: Dict[str, List[Tuple[int, ArchiveMember]]] = {}
+    job_logs: List[Tuple[int, ArchiveMember]] = []
+    for name in names:
+        directory, _, file_name = name.rpartition("/")
+        order, title = _split_order(file_name[: -len(_LOG_SUFFIX)])
+        if directory:
+            job_name = directory.rsplit("/", 1)[-1]
+            step_logs.setdefault(job_name, []).append(
+                (order, ArchiveMember(name, job_name, title))
+            )
+        else:
+            job_logs.append((order, ArchiveMember(name, title, None)))
+
+    # ジョブ全体のログの番号順にジョブを並べ、ステップごとのログで置き換える
+    members: List[ArchiveMember] = []
+    for _, job_log in sorted(job_logs, key=lambda item: item[0]):
+        steps = step_logs.pop(job_log.job_name, None)
+        if steps is None:
+            members.append(job_log)
+        else:
+            members.extend(_in_order(steps))
+    for job_name in sorted(step_logs):
+        members.extend(_in_order(step_logs[job_name]))
+    return members
+
+
+def _split_order(title: str) -> Tuple[int, str]:
+    """``<番号>_<名前>`` を (番号, 名前) に分解（番号がなければ0）"""
+    match = _ORDER_PREFIX_REGEX.fullmatch(title)
+    if match is None:
+        return 0, title
+    return int(match.group(1)), match.group(2)
+
+
+def _in_order(items: List[Tuple[int, ArchiveMember]]) -> List[ArchiveMember]:
+    """番号順に並べたメンバー"""
+    return [member for _, member in sorted(items, key=lambda item: item[0])]
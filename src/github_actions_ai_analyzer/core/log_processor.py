@@ -6,16 +6,60 @@ GitHub Actionsのログを前処理し、ノイズを除去して構造化しま
 
 import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
-from ..types import LogEntry, LogLevel, LogSource
+from ..types import LogEntry, LogLevel, LogRecord, LogSource
+from .compression import open_log_text
+from .context_capture import ContextCapture
+from .gh_log import split_gh_prefix
+from .log_reader import StreamLineReader, iter_mmap_lines
+from .log_table import LEVEL_CODES, LogTable
+from .step_segmenter import STEP_MARKER_BYTES_REGEX, StepSegmenter
+from .timestamp import split_timestamp, to_datetime
+
+# 行頭のワークフローコマンド（::debug:: など）
+_COMMAND_PREFIX_REGEX = re.compile(r"^::[^:]*::")
+
+# ログの発生源を判定するトークン（優先度の高い順）
+_SOURCE_TOKENS = (
+    (LogSource.SYSTEM, [r"::(?=(?:debug|notice)::)"]),
+    (LogSource.STEP, [r"::(?=command::)"]),
+    (LogSource.ACTION, [r"a(?i:ction)", r"A(?i:ction)"]),
+    (LogSource.WORKFLOW, [r"w(?i:orkflow)", r"W(?i:orkflow)"]),
+)
+
+# ステップ名・アクション名のトークン（名前は行末まで）
+_STEP_TOKEN = r"Step \d+: (?P<step_name>.+)"
+_USES_TOKEN = r"uses: (?P<action_name>.+)"
+
+# 判定用正規表現のトークンの種類
+_TOKEN_STEP = 0
+_TOKEN_USES = 1
+_TOKEN_LEVEL = 2
+_TOKEN_SOURCE = 3
+
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+_REGEX_QUANTIFIER_CHARS = frozenset("*+?{")
+
+# LogEntry と LogRecord のどちらにも使える処理の型
+EntryT = TypeVar("EntryT", LogEntry, LogRecord)
 
 
 class LogProcessor:
     """GitHub Actionsログの前処理を行うクラス"""
 
-    def __init__(self) -> None:
-        """初期化"""
+    def __init__(
+        self,
+        filter_noise: bool = True,
+        context_lines: Tuple[int, int] = (0, 0),
+    ) -> None:
+        """初期化
+
+        前処理済みのログなどでノイズ行の除去が不要な場合は
+        filter_noise に False を指定します。
+        context_lines に (前の行数, 後の行数) を指定すると、
+        new_context_capture() でマッチした行の前後の行を取得できます。
+        """
         self.log_levels = {
             "DEBUG": LogLevel.DEBUG,
             "INFO": LogLevel.INFO,
@@ -23,16 +67,36 @@ class LogProcessor:
             "ERROR": LogLevel.ERROR,
             "FATAL": LogLevel.FATAL,
         }
-        self.noise_patterns = [
-            r"^::debug::",  # デバッグメッセージ
-            r"^::notice::",  # 通知メッセージ
-            r"^::warning::",  # 警告メッセージ
-            r"^::error::",  # エラーメッセージ
-            r"^##\[group\]",  # グループ開始
-            r"^##\[endgroup\]",  # グループ終了
-            r"^##\[command\]",  # コマンド実行
-        ]
-        self.noise_regex = re.compile("|".join(self.noise_patterns))
+        # ノイズ行の接頭辞（規則名 -> 接頭辞）
+        self.noise_prefixes = {
+            "debug": "::debug::",  # デバッグメッセージ
+            "notice": "::notice::",  # 通知メッセージ
+            "warning": "::warning::",  # 警告メッセージ
+            "error": "::error::",  # エラーメッセージ
+            "group": "##[group]",  # グループ開始
+            "endgroup": "##[endgroup]",  # グループ終了
+            "command": "##[command]",  # コマンド実行
+        }
+        self.filter_noise = filter_noise
+        self.context_lines = context_lines
+        # 規則ごとの除去した行数（reset_noise_stats() で0に戻す）
+        self.noise_stats: Dict[str, int] = dict.fromkeys(
+            self.noise_prefixes, 0
+        )
+        # 行頭の空白を除いた行に str.startswith で一度に判定する接頭辞
+        self._noise_prefix_tuple = tuple(self.noise_prefixes.values())
+        # バイト列のまま判定するためのノイズパターン（行頭の空白を許容）
+        # (マッチしたグループ名が規則名になる)
+        self.noise_bytes_regex = re.compile(
+            rb"[ \t\r\n\f\v]*(?:"
+            + "|".join(
+                f"(?P<{rule}>{re.escape(prefix)})"
+                for rule, prefix in self.noise_prefixes.items()
+            ).encode()
+            + rb")"
+        )
+        # ステップ分割のマーカー行
+        self.step_marker_bytes_regex = STEP_MARKER_BYTES_REGEX
 
         # ログレベルを判定するパターン
         self.level_patterns = {
@@ -62,149 +126,410 @@ class LogProcessor:
             ],
         }
 
-        self.level_regex = {}
-        for level, patterns in self.level_patterns.items():
-            self.level_regex[level] = re.compile("|".join(patterns))
+        # 最小レベル -> そのレベル以上と判定される行を検出するパターン
+        self._level_regexes: Dict[LogLevel, Optional[re.Pattern[str]]] = {}
+
+        # レベル・発生源・ステップ名・アクション名を1回の走査で判定する
+        # 正規表現（トークンの種類はマッチしたグループ名で区別する）
+        self._levels = list(self.level_patterns)
+        self._sources = [source for source, _ in _SOURCE_TOKENS]
+        self._token_kinds: Dict[str, Tuple[int, int]] = {}
+        tokens: List[str] = []
+        for kind, rank, patterns in [
+            (_TOKEN_STEP, 0, [_STEP_TOKEN]),
+            (_TOKEN_USES, 0, [_USES_TOKEN]),
+            *(
+                (_TOKEN_LEVEL, rank, patterns)
+                for rank, patterns in enumerate(self.level_patterns.values())
+            ),
+            *(
+                (_TOKEN_SOURCE, rank, patterns)
+                for rank, (_, patterns) in enumerate(_SOURCE_TOKENS)
+            ),
+        ]:
+            for pattern in patterns:
+                name = f"t{len(tokens)}"
+                self._token_kinds[name] = (kind, rank)
+                tokens.append(_literal_first_token(name, pattern))
+        self.classifier_regex = re.compile("|".join(tokens))
 
     def process_log_file(self, log_content: str) -> List[LogEntry]:
         """ログファイルを処理して構造化されたログエントリのリストを返す"""
-        lines = log_content.split("\n")
-        processed_entries = []
+        return list(self.process_log_stream(log_content.split("\n")))
+
+    def process_log_stream(
+        self, lines: Iterable[str], min_level: Optional[LogLevel] = None
+    ) -> Iterator[LogEntry]:
+        """行のイテラブルを逐次処理してログエントリを1件ずつ返す
+
+        ログ全体をメモリに展開しないため、巨大なログでも
+        メモリ使用量は1行分に抑えられます。
+        各エントリには ``##[group]`` から求めたステップ名を付与します。
+        min_level を渡すと、そのレベル以上のエントリのみを作成します。
+        """
+        return self.process_numbered_lines(
+            enumerate(lines, 1), segmenter=StepSegmenter(), min_level=min_level
+        )
+
+    def process_numbered_lines(
+        self,
+        numbered_lines: Iterable[Tuple[int, str]],
+        segmenter: Optional[StepSegmenter] = None,
+        min_level: Optional[LogLevel] = None,
+    ) -> Iterator[LogEntry]:
+        """(行番号, 行) のイテラブルを逐次処理してログエントリを返す"""
+        for record in self.process_numbered_records(
+            numbered_lines, segmenter, min_level
+        ):
+            yield record.to_log_entry()
 
-        for line_num, line in enumerate(lines, 1):
-            if not line.strip():
+    def process_numbered_records(
+        self,
+        numbered_lines: Iterable[Tuple[int, str]],
+        segmenter: Optional[StepSegmenter] = None,
+        min_level: Optional[LogLevel] = None,
+    ) -> Iterator[LogRecord]:
+        """(行番号, 行) のイテラブルを逐次処理して軽量なログレコードを返す
+
+        segmenter を渡すとマーカー行でステップを追跡し、
+        各レコードに属するステップを付与します。
+        min_level を渡すと、そのレベルに届かない行はタイムスタンプの解析や
+        メッセージの整形を行う前に読み飛ばします。
+        gh run view --log 形式の行は先頭のジョブ名・ステップ名を除いて
+        処理し、レコードにそのジョブ名とステップ名を付与します。
+        """
+        noise_prefixes = self._noise_prefix_tuple if self.filter_noise else ()
+        level_regex = self._level_regex(min_level) if min_level else None
+        for line_num, line in numbered_lines:
+            line = line.rstrip("\n")
+            # 空行とノイズ行の判定は行頭の空白を除いた行で行う
+            body = line.lstrip()
+            if not body:
+                continue
+
+            gh_prefix = split_gh_prefix(line) if "\t" in line else None
+            if gh_prefix is not None:
+                line = gh_prefix[2]
+                body = line.lstrip()
+
+            # ステップの境界（マーカー行はレコードにしない）
+            if (
+                segmenter is not None
+                and "##[" in line
+                and segmenter.feed(line_num, line)
+            ):
+                # ノイズの規則に該当するマーカー行は除去した行として数える
+                if noise_prefixes and body.startswith(noise_prefixes):
+                    self._count_noise(body)
                 continue
 
             # ノイズ除去
-            if self._is_noise(line):
+            if noise_prefixes and body.startswith(noise_prefixes):
+                self._count_noise(body)
                 continue
 
-            # ログエントリを作成
-            entry = self._create_log_entry(line, line_num)
-            if entry:
-                processed_entries.append(entry)
+            # レベルの事前判定（閾値に届かない行はレコードを作らない）
+            if level_regex is not None and not level_regex.search(line):
+                continue
+
+            record = self._create_log_record(line, line_num)
+            if segmenter is not None:
+                segmenter.tag(record)
+            if gh_prefix is not None:
+                record.job_name = gh_prefix[0]
+                record.step_name = gh_prefix[1]
+            yield record
+
+    def iter_log_file(
+        self, log_file_path: str, min_level: Optional[LogLevel] = None
+    ) -> Iterator[LogEntry]:
+        """ログファイルを1行ずつ読み込みながらログエントリを返す
+
+        圧縮されたログは伸長しながら読み込みます。
+        """
+        with open_log_text(log_file_path) as f:
+            yield from self.process_log_stream(f, min_level)
+
+    def iter_mapped_file(
+        self,
+        log_file_path: str,
+        min_level: Optional[LogLevel] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Iterator[LogEntry]:
+        """ログファイルをメモリマップで読み込みながらログエントリを返す
+
+        ノイズ行と、min_level に届くレベルのキーワードを含まない行は
+        バイト列のまま判定してデコードせずに読み飛ばします。
+        start/end を指定すると行頭に揃ったバイト範囲のみを処理し、
+        行番号はその範囲の先頭を1行目として数えます。
+        """
+        for record in self.iter_mapped_records(
+            log_file_path, min_level, start=start, end=end
+        ):
+            yield record.to_log_entry()
+
+    def iter_mapped_records(
+        self,
+        log_file_path: str,
+        min_level: Optional[LogLevel] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+        segmenter: Optional[StepSegmenter] = None,
+        first_line: int = 1,
+        capture: Optional[ContextCapture] = None,
+    ) -> Iterator[LogRecord]:
+        """iter_mapped_file と同様に処理し、軽量なログレコードを返す
+
+        segmenter を渡すと、読み飛ばす対象のマーカー行も読み込んで
+        ステップを追跡します。行番号は start の位置を first_line 行目とします。
+        capture を渡すと、読み飛ばす行も含めて前後の行の取得に使います。
+        """
+        require_regex = (
+            self._level_bytes_regex(min_level) if min_level else None
+        )
+        # バイト列での判定は行全体で行うため、gh run view --log 形式の行は
+        # 接頭辞を除いた後で改めてレベルを判定する
+        yield from self.process_numbered_records(
+            iter_mmap_lines(
+                log_file_path,
+                skip_regex=self._noise_skip_regex(),
+                require_regex=require_regex,
+                start=start,
+                end=end,
+                keep_regex=(
+                    self.step_marker_bytes_regex if segmenter else None
+                ),
+                first_line=first_line,
+                skip_counts=self.noise_stats,
+                capture=capture,
+            ),
+            segmenter,
+            min_level,
+        )
+
+    def stream_line_reader(
+        self,
+        stream: Iterable[bytes],
+        min_level: Optional[LogLevel] = None,
+        segmenter: Optional[StepSegmenter] = None,
+        capture: Optional[ContextCapture] = None,
+    ) -> StreamLineReader:
+        """iter_mapped_records と同じ条件で行を読み飛ばすストリームの読み込み
+
+        返した読み込みを process_numbered_records に渡して処理します。
+        """
+        return StreamLineReader(
+            stream,
+            skip_regex=self._noise_skip_regex(),
+            require_regex=(
+                self._level_bytes_regex(min_level) if min_level else None
+            ),
+            keep_regex=self.step_marker_bytes_regex if segmenter else None,
+            skip_counts=self.noise_stats,
+            capture=capture,
+        )
+
+    def new_context_capture(self) -> Optional[ContextCapture]:
+        """context_lines に従って前後の行を取得する（取得しない場合は None）"""
+        before, after = self.context_lines
+        if before <= 0 and after <= 0:
+            return None
+        return ContextCapture(max(before, 0), max(after, 0))
 
-        return processed_entries
+    def iter_step_markers(
+        self, log_file_path: str
+    ) -> Iterator[Tuple[int, str]]:
+        """ステップ分割のマーカーを含む (行番号, 行) のみを返す"""
+        return iter_mmap_lines(
+            log_file_path, require_regex=self.step_marker_bytes_regex
+        )
+
+    def build_log_table(
+        self, log_file_path: str, min_level: Optional[LogLevel] = None
+    ) -> LogTable:
+        """ログファイルを処理して列指向のログテーブルを作成
+
+        レベルによる絞り込みやステップごとの集計を繰り返す場合は、
+        LogEntry のリストの代わりにこのテーブルを使用します。
+        """
+        return LogTable.from_records(
+            self.iter_by_level(
+                self.iter_mapped_records(
+                    log_file_path, min_level, segmenter=StepSegmenter()
+                ),
+                min_level or LogLevel.DEBUG,
+            )
+        )
+
+    def _level_regex(self, min_level: LogLevel) -> Optional[re.Pattern[str]]:
+        """min_level 以上と判定される行を検出するパターン
+
+        レベルは上位のレベルのキーワードから順に判定するため、
+        min_level 以上のいずれかのキーワードを含む行だけが閾値に届きます。
+        キーワードを含まない行は INFO と判定されるため、
+        INFO 以下が閾値の場合は絞り込まない（None を返す）。
+        """
+        min_level = LogLevel(min_level)
+        if min_level not in self._level_regexes:
+            level_order = list(LogLevel)
+            min_index = level_order.index(min_level)
+            regex: Optional[re.Pattern[str]] = None
+            if min_index > level_order.index(LogLevel.INFO):
+                keywords = [
+                    pattern
+                    for level, patterns in self.level_patterns.items()
+                    if level_order.index(level) >= min_index
+                    for pattern in patterns
+                ]
+                # 該当するレベルを判定するキーワードがない場合は全行を除外
+                regex = re.compile("|".join(keywords) if keywords else "(?!)")
+            self._level_regexes[min_level] = regex
+        return self._level_regexes[min_level]
+
+    def _level_bytes_regex(
+        self, min_level: LogLevel
+    ) -> Optional[re.Pattern[bytes]]:
+        """_level_regex と同じ行をバイト列のまま検出するパターン"""
+        regex = self._level_regex(min_level)
+        if regex is None:
+            return None
+        return re.compile(regex.pattern.encode())
+
+    def reset_noise_stats(self) -> None:
+        """規則ごとの除去した行数を0に戻す"""
+        for rule in self.noise_stats:
+            self.noise_stats[rule] = 0
 
     def _is_noise(self, line: str) -> bool:
         """行がノイズかどうかを判定"""
-        return bool(self.noise_regex.match(line.strip()))
+        return self.filter_noise and line.lstrip().startswith(
+            self._noise_prefix_tuple
+        )
+
+    def _count_noise(self, body: str) -> None:
+        """ノイズ行を除去した規則を数える"""
+        for rule, prefix in self.noise_prefixes.items():
+            if body.startswith(prefix):
+                self.noise_stats[rule] += 1
+                return
+
+    def _noise_skip_regex(self) -> Optional[re.Pattern[bytes]]:
+        """バイト列のまま読み飛ばすノイズ行のパターン（除去しない場合は None）"""
+        return self.noise_bytes_regex if self.filter_noise else None
 
     def _create_log_entry(
         self, line: str, line_num: int
     ) -> Optional[LogEntry]:
         """ログエントリを作成"""
-        # タイムスタンプを抽出
-        timestamp = self._extract_timestamp(line)
-        if not timestamp:
-            timestamp = datetime.now()
+        return self._create_log_record(line, line_num).to_log_entry()
 
-        # ログレベルを判定
-        level = self._determine_log_level(line)
+    def _create_log_record(self, line: str, line_num: int) -> LogRecord:
+        """ログレコードを作成"""
+        # タイムスタンプの抽出と除去を1回で行う（エポック秒で保持する）
+        epoch, body = split_timestamp(line)
 
-        # メッセージをクリーンアップ
-        message = self._clean_message(line)
+        # レベル・発生源・ステップ名・アクション名を1回の走査で判定
+        level, source, step_name, action_name = self._classify_line(body)
 
-        # ソースを判定
-        source = self._determine_source(line)
-
-        # ステップ名とアクション名を抽出
-        step_name = self._extract_step_name(line)
-        action_name = self._extract_action_name(line)
-
-        return LogEntry(
-            timestamp=timestamp,
+        return LogRecord(
+            line_number=line_num,
+            timestamp=epoch,
             level=level,
             source=source,
-            message=message,
+            message=self._clean_body(body),
             step_name=step_name,
             action_name=action_name,
-            metadata={"line_number": line_num},
         )
 
+    def _classify_line(
+        self, line: str
+    ) -> Tuple[LogLevel, LogSource, Optional[str], Optional[str]]:
+        """行を1回走査して (レベル, 発生源, ステップ名, アクション名) を判定
+
+        レベルと発生源は行中に複数のトークンがある場合、優先度の高い方を
+        採用します。ステップ名・アクション名は最初に現れたものを使用します。
+        """
+        level_rank = len(self._levels)
+        source_rank = len(self._sources)
+        step_name = None
+        action_name = None
+        token_kinds = self._token_kinds
+        for match in self.classifier_regex.finditer(line):
+            kind, rank = token_kinds[match.lastgroup]  # type: ignore[index]
+            if kind == _TOKEN_LEVEL:
+                if rank < level_rank:
+                    level_rank = rank
+            elif kind == _TOKEN_SOURCE:
+                if rank < source_rank:
+                    source_rank = rank
+            elif kind == _TOKEN_STEP:
+                if step_name is None:
+                    step_name = match.group("step_name")
+            elif action_name is None:
+                action_name = match.group("action_name")
+
+        level = (
+            self._levels[level_rank]
+            if level_rank < len(self._levels)
+            else LogLevel.INFO
+        )
+        source = (
+            self._sources[source_rank]
+            if source_rank < len(self._sources)
+            else LogSource.USER
+        )
+        return level, source, step_name, action_name
+
     def _extract_timestamp(self, line: str) -> Optional[datetime]:
         """タイムスタンプを抽出"""
-        # GitHub Actionsのタイムスタンプ形式を検出
-        timestamp_pattern = r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z)"
-        match = re.search(timestamp_pattern, line)
-        if match:
-            try:
-                return datetime.fromisoformat(
-                    match.group(1).replace("Z", "+00:00")
-                )
-            except ValueError:
-                pass
-        return None
+        epoch, _ = split_timestamp(line)
+        return to_datetime(epoch) if epoch is not None else None
 
     def _determine_log_level(self, line: str) -> LogLevel:
         """ログレベルを判定"""
-        for level, patterns in self.level_regex.items():
-            if patterns.search(line):
-                return level
-
-        # デフォルトはINFO
-        return LogLevel.INFO
+        return self._classify_line(line)[0]
 
     def _clean_message(self, line: str) -> str:
         """メッセージをクリーンアップ"""
         # タイムスタンプを除去
-        timestamp_pattern = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z\s*"
-        cleaned = re.sub(timestamp_pattern, "", line)
+        _, body = split_timestamp(line)
+        return self._clean_body(body)
+
+    def _clean_body(self, body: str) -> str:
+        """タイムスタンプを除いた行からメッセージを作成"""
         # GitHub Actionsの特殊記号を除去
-        cleaned = re.sub(r"^::[^:]*::", "", cleaned)
+        cleaned = _COMMAND_PREFIX_REGEX.sub("", body, count=1)
         # 先頭の空白を除去
         cleaned = cleaned.strip()
         return cleaned
 
     def _determine_source(self, line: str) -> LogSource:
         """ログの発生源を判定"""
-        if "::debug::" in line or "::notice::" in line:
-            return LogSource.SYSTEM
-        elif "::command::" in line:
-            return LogSource.STEP
-        elif "action" in line.lower():
-            return LogSource.ACTION
-        elif "workflow" in line.lower():
-            return LogSource.WORKFLOW
-        else:
-            return LogSource.USER
+        return self._classify_line(line)[1]
 
     def _extract_step_name(self, line: str) -> Optional[str]:
         """ステップ名を抽出"""
-        # ステップ名のパターンを検出
-        step_pattern = r"Step (\d+): (.+)"
-        match = re.search(step_pattern, line)
-        if match:
-            return match.group(2)
-        return None
+        return self._classify_line(line)[2]
 
     def _extract_action_name(self, line: str) -> Optional[str]:
         """アクション名を抽出"""
-        # アクション名のパターンを検出
-        action_pattern = r"uses: (.+)"
-        match = re.search(action_pattern, line)
-        if match:
-            return match.group(1)
-        return None
+        return self._classify_line(line)[3]
 
     def filter_by_level(
-        self, entries: List[LogEntry], min_level: LogLevel
+        self, entries: Iterable[LogEntry], min_level: LogLevel
     ) -> List[LogEntry]:
         """指定されたレベル以上のログエントリをフィルタリング"""
-        level_order = {
-            LogLevel.DEBUG: 0,
-            LogLevel.INFO: 1,
-            LogLevel.WARNING: 2,
-            LogLevel.ERROR: 3,
-            LogLevel.FATAL: 4,
-        }
+        return list(self.iter_by_level(entries, min_level))
 
-        min_level_value = level_order.get(min_level, 0)
-        return [
-            entry
-            for entry in entries
-            if level_order.get(entry.level, 0) >= min_level_value
-        ]
+    def iter_by_level(
+        self, entries: Iterable[EntryT], min_level: LogLevel
+    ) -> Iterator[EntryT]:
+        """指定されたレベル以上のログエントリを逐次返す"""
+        min_level_value = LEVEL_CODES.get(min_level, 0)
+        for entry in entries:
+            if LEVEL_CODES.get(entry.level, 0) >= min_level_value:
+                yield entry
 
     def group_by_step(
         self, entries: List[LogEntry]
@@ -217,3 +542,19 @@ class LogProcessor:
                 grouped[step_name] = []
             grouped[step_name].append(entry)
         return grouped
+
+
+def _literal_first_token(name: str, pattern: str) -> str:
+    """先頭の1文字だけを消費し、残りを先読みで照合するトークンを作成
+
+    全トークンが固定の文字で始まると、re は行中の候補位置を
+    文字集合で高速に探せます。先頭の1文字しか消費しないため、
+    重なり合うトークン（"Error::notice::" など）も検出できます。
+    """
+    if (
+        len(pattern) > 1
+        and pattern[0] not in _REGEX_SPECIAL_CHARS
+        and pattern[1] not in _REGEX_QUANTIFIER_CHARS
+    ):
+        return f"{re.escape(pattern[0])}(?=(?P<{name}>{pattern[1:]}))"
+    return f"(?=(?P<{name}>{pattern}))."
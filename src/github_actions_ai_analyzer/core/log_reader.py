@@ -0,0 +1,244 @@
+"""
+ログリーダー
+
+ログファイルをバイト列のまま走査し、必要な行だけをデコードして返します。
+"""
+
+import mmap
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .context_capture import ContextCapture
+
+# 行数を数える際に一度に読み込むバイト数
+_COUNT_BLOCK_SIZE = 1024 * 1024
+
+
+def iter_mmap_lines(
+    log_file_path: str,
+    skip_regex: Optional[re.Pattern[bytes]] = None,
+    require_regex: Optional[re.Pattern[bytes]] = None,
+    encoding: str = "utf-8",
+    start: int = 0,
+    end: Optional[int] = None,
+    keep_regex: Optional[re.Pattern[bytes]] = None,
+    first_line: int = 1,
+    skip_counts: Optional[Dict[str, int]] = None,
+    capture: Optional[ContextCapture] = None,
+) -> Iterator[Tuple[int, str]]:
+    """メモリマップしたログファイルから (行番号, 行) を返す
+
+    改行位置はバイト列上で探索し、``skip_regex`` に行頭でマッチする行と
+    ``require_regex`` を含まない行はデコードせずに読み飛ばします。
+    ただし ``keep_regex`` を含む行は読み飛ばしません。
+    ``skip_counts`` を渡すと、``skip_regex`` で読み飛ばした行数を
+    マッチしたグループ名ごとに加算します。
+    ``capture`` を渡すと、読み飛ばす行も含めたすべての行を返す前に渡します。
+    行番号は読み飛ばした行も含めて、``start`` の位置を ``first_line``
+    行目として数えます。``start`` と ``end`` には行頭に揃ったバイト位置を
+    指定します。
+    """
+    with open(log_file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if end is None or end > size:
+            end = size
+        if start >= end:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            line_start = start
+            line_number = first_line - 1
+            while line_start < end:
+                line_end = mapped.find(b"\n", line_start, end)
+                if line_end == -1:
+                    line_end = end
+                line_number += 1
+
+                # テキストモードの読み込みと同様にCRLFのCRを除く
+                content_end = line_end
+                if (
+                    content_end > line_start
+                    and mapped[content_end - 1] == 0x0D
+                ):
+                    content_end -= 1
+                if capture is not None:
+                    capture.push(line_number, mapped[line_start:content_end])
+
+                skipped = (
+                    skip_regex.match(mapped, line_start, content_end)
+                    if skip_regex is not None
+                    else None
+                )
+                if (
+                    skipped is None
+                    and (
+                        require_regex is None
+                        or require_regex.search(
+                            mapped, line_start, content_end
+                        )
+                    )
+                ) or (
+                    keep_regex is not None
+                    and keep_regex.search(mapped, line_start, content_end)
+                ):
+                    yield line_number, mapped[line_start:content_end].decode(
+                        encoding
+                    )
+                elif skipped is not None and skip_counts is not None:
+                    _count_skip(skip_counts, skipped)
+
+                line_start = line_end + 1
+
+
+class StreamLineReader:
+    """バイト列の行のストリームから (行番号, 行) を返すイテラブル
+
+    メモリマップできない入力（アーカイブのメンバーなど）を
+    iter_mmap_lines と同じ条件で読み飛ばしながら読み込みます。
+    反復を終えると line_count に読み飛ばした行も含めた行数が入ります。
+    """
+
+    def __init__(
+        self,
+        stream: Iterable[bytes],
+        skip_regex: Optional[re.Pattern[bytes]] = None,
+        require_regex: Optional[re.Pattern[bytes]] = None,
+        encoding: str = "utf-8",
+        keep_regex: Optional[re.Pattern[bytes]] = None,
+        first_line: int = 1,
+        skip_counts: Optional[Dict[str, int]] = None,
+        capture: Optional[ContextCapture] = None,
+    ) -> None:
+        """初期化"""
+        self.stream = stream
+        self.skip_regex = skip_regex
+        self.require_regex = require_regex
+        self.encoding = encoding
+        self.keep_regex = keep_regex
+        self.first_line = first_line
+        self.skip_counts = skip_counts
+        self.capture = capture
+        self.line_count = 0
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        skip_regex = self.skip_regex
+        require_regex = self.require_regex
+        keep_regex = self.keep_regex
+        skip_counts = self.skip_counts
+        capture = self.capture
+        line_number = self.first_line - 1
+        for raw in self.stream:
+            line_number += 1
+            # テキストモードの読み込みと同様にCRLFのCRを除く
+            if raw.endswith(b"\n"):
+                raw = raw[:-1]
+            if raw.endswith(b"\r"):
+                raw = raw[:-1]
+            if capture is not None:
+                capture.push(line_number, raw)
+
+            skipped = skip_regex.match(raw) if skip_regex is not None else None
+            if (
+                skipped is None
+                and (require_regex is None or require_regex.search(raw))
+            ) or (keep_regex is not None and keep_regex.search(raw)):
+                yield line_number, raw.decode(self.encoding)
+            elif skipped is not None and skip_counts is not None:
+                _count_skip(skip_counts, skipped)
+        self.line_count = line_number - self.first_line + 1
+
+
+def _count_skip(skip_counts: Dict[str, int], match: re.Match[bytes]) -> None:
+    """読み飛ばした行をマッチしたグループ名で数える"""
+    key = match.lastgroup or ""
+    skip_counts[key] = skip_counts.get(key, 0) + 1
+
+
+def preceding_lines_start(log_file_path: str, start: int, count: int) -> int:
+    """行頭の位置 start の直前の count 行の先頭の位置（ファイルの先頭まで）"""
+    if start <= 0 or count <= 0:
+        return start
+    with (
+        open(log_file_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        # start の直前のバイトは前の行の改行
+        position = start - 1
+        for _ in range(count):
+            newline = mapped.rfind(b"\n", 0, position)
+            if newline == -1:
+                return 0
+            position = newline
+    return position + 1
+
+
+def line_aligned_ranges(
+    log_file_path: str, parts: int
+) -> List[Tuple[int, int]]:
+    """ログファイルを行頭に揃えたおよそ等分のバイト範囲に分割"""
+    size = os.path.getsize(log_file_path)
+    if size == 0:
+        return []
+
+    boundaries = [0]
+    with (
+        open(log_file_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        for part in range(1, parts):
+            target = size * part // parts
+            if target <= boundaries[-1]:
+                continue
+            # 直前のバイトが改行ならtargetがそのまま行頭になる
+            newline = mapped.find(b"\n", target - 1)
+            if newline == -1 or newline + 1 >= size:
+                break
+            if newline + 1 > boundaries[-1]:
+                boundaries.append(newline + 1)
+    boundaries.append(size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def complete_lines_end(log_file_path: str, start: int, end: int) -> int:
+    """[start, end) のうち改行で終わる最後の行の直後の位置を返す
+
+    改行が1つもない（書き込み途中の行しかない）場合は start を返します。
+    """
+    if start >= end:
+        return start
+    with (
+        open(log_file_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        newline = mapped.rfind(b"\n", start, min(end, len(mapped)))
+    return start if newline == -1 else newline + 1
+
+
+def count_lines(
+    log_file_path: str, start: int = 0, end: Optional[int] = None
+) -> int:
+    """バイト範囲に含まれる行数を数える（末尾の改行なしの行も1行とする）"""
+    with open(log_file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if end is None or end > size:
+            end = size
+        if start >= end:
+            return 0
+
+        f.seek(start)
+        remaining = end - start
+        count = 0
+        last_byte = b""
+        while remaining > 0:
+            block = f.read(min(_COUNT_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            count += block.count(b"\n")
+            last_byte = block[-1:]
+            remaining -= len(block)
+
+    if last_byte != b"\n":
+        count += 1
+    return count
@@ -0,0 +1,221 @@
+"""
+ログテーブル
+
+ログレコードを列ごとの配列に格納し、レベルによる絞り込みやステップごとの
+集計、時間範囲の切り出しを行単位のPythonループなしで行います。
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress, groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from ..types import LogEntry, LogLevel, LogRecord, LogSource
+
+# レベルと発生源は列挙型の定義順を1バイトのコードとして格納する
+LEVELS = list(LogLevel)
+SOURCES = list(LogSource)
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+SOURCE_CODES = {source: code for code, source in enumerate(SOURCES)}
+
+# レベルコード -> そのレベル以上を1とする bytes.translate 用の変換表
+_LEVEL_MASK_TABLES = {
+    min_code: bytes(1 if code >= min_code else 0 for code in range(256))
+    for min_code in range(len(LEVELS))
+}
+
+# タイムスタンプがない行の値
+NO_TIMESTAMP = -(2**63)
+
+# ステップ名がない行の値
+NO_STEP = -1
+
+
+class LogTable:
+    """列指向のログテーブル
+
+    行番号・レベル・タイムスタンプ（エポックナノ秒）・ステップIDを
+    array に、メッセージとステップ名は重複を除いたプールに格納します。
+    """
+
+    def __init__(self) -> None:
+        """初期化"""
+        self.line_numbers = array("q")
+        self.levels = array("B")
+        self.sources = array("B")
+        self.timestamps = array("q")
+        self.step_ids = array("l")
+        self.message_ids = array("l")
+        # 文字列プール（同じ文字列は1つだけ保持する）
+        self.messages: List[str] = []
+        self.steps: List[str] = []
+        self.action_names: Dict[int, str] = {}
+        self._message_pool: Dict[str, int] = {}
+        self._step_pool: Dict[str, int] = {}
+        # タイムスタンプが昇順に並んでいるか（二分探索できるか）
+        self._timestamps_sorted = True
+        self._last_timestamp = NO_TIMESTAMP
+
+    @classmethod
+    def from_records(cls, records: Iterable[LogRecord]) -> "LogTable":
+        """ログレコードからテーブルを作成"""
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.line_numbers)
+
+    def append(self, record: LogRecord) -> None:
+        """ログレコードを1行追加"""
+        row = len(self.line_numbers)
+        self.line_numbers.append(record.line_number)
+        self.levels.append(LEVEL_CODES[record.level])
+        self.sources.append(SOURCE_CODES[record.source])
+
+        if record.timestamp is None:
+            timestamp = NO_TIMESTAMP
+        else:
+            # マイクロ秒単位に丸めてから変換し、浮動小数点の誤差を除く
+            timestamp = round(record.timestamp * 1_000_000) * 1000
+        if timestamp < self._last_timestamp:
+            self._timestamps_sorted = False
+        self._last_timestamp = timestamp
+        self.timestamps.append(timestamp)
+
+        self.step_ids.append(
+            self._intern(record.step_name, self.steps, self._step_pool)
+            if record.step_name is not None
+            else NO_STEP
+        )
+        self.message_ids.append(
+            self._intern(record.message, self.messages, self._message_pool)
+        )
+        if record.action_name is not None:
+            self.action_names[row] = record.action_name
+
+    @staticmethod
+    def _intern(value: str, pool: List[str], index: Dict[str, int]) -> int:
+        """文字列をプールに登録してIDを返す"""
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = len(pool)
+            pool.append(value)
+            index[value] = value_id
+        return value_id
+
+    def level_mask(self, min_level: LogLevel) -> bytes:
+        """min_level 以上の行を1、それ以外を0とするマスク"""
+        table = _LEVEL_MASK_TABLES[LEVEL_CODES[min_level]]
+        return self.levels.tobytes().translate(table)
+
+    def rows_at_level(self, min_level: LogLevel) -> List[int]:
+        """min_level 以上の行の行位置"""
+        return list(compress(range(len(self)), self.level_mask(min_level)))
+
+    def filter_by_level(self, min_level: LogLevel) -> "LogTable":
+        """min_level 以上の行からなるテーブル"""
+        return self.take(self.rows_at_level(min_level))
+
+    def count_by_level(self) -> Dict[LogLevel, int]:
+        """レベルごとの行数"""
+        level_bytes = self.levels.tobytes()
+        return {
+            level: level_bytes.count(code)
+            for level, code in LEVEL_CODES.items()
+        }
+
+    def group_by_step(self) -> Dict[str, List[int]]:
+        """ステップ名ごとの行位置（ステップ名がない行は unknown）"""
+        # ステップIDで安定ソートし、同じステップの行を元の順序で連続させる
+        step_of = self.step_ids.__getitem__
+        rows = sorted(range(len(self)), key=step_of)
+
+        grouped: Dict[str, List[int]] = {}
+        for step_id, step_rows in groupby(rows, key=step_of):
+            step_name = (
+                "unknown" if step_id == NO_STEP else self.steps[step_id]
+            )
+            grouped[step_name] = list(step_rows)
+        return grouped
+
+    def rows_between(self, start_ns: int, end_ns: int) -> List[int]:
+        """タイムスタンプが [start_ns, end_ns) の行の行位置"""
+        if self._timestamps_sorted:
+            first = bisect_left(
+                self.timestamps, max(start_ns, NO_TIMESTAMP + 1)
+            )
+            last = bisect_left(self.timestamps, end_ns, lo=first)
+            return list(range(first, last))
+        mask = [start_ns <= ts < end_ns for ts in self.timestamps]
+        return list(compress(range(len(self)), mask))
+
+    def slice_time(self, start_ns: int, end_ns: int) -> "LogTable":
+        """タイムスタンプが [start_ns, end_ns) の行からなるテーブル"""
+        return self.take(self.rows_between(start_ns, end_ns))
+
+    def row_at_line(self, line_number: int) -> Optional[int]:
+        """行番号に対応する行位置（行番号は昇順に格納される前提）"""
+        row = bisect_right(self.line_numbers, line_number) - 1
+        if row >= 0 and self.line_numbers[row] == line_number:
+            return row
+        return None
+
+    def take(self, rows: Sequence[int]) -> "LogTable":
+        """指定した行位置の行からなるテーブル（文字列プールは共有）"""
+        table = LogTable()
+        table.line_numbers = _take(self.line_numbers, rows)
+        table.levels = _take(self.levels, rows)
+        table.sources = _take(self.sources, rows)
+        table.timestamps = _take(self.timestamps, rows)
+        table.step_ids = _take(self.step_ids, rows)
+        table.message_ids = _take(self.message_ids, rows)
+        table.messages = self.messages
+        table.steps = self.steps
+        table._message_pool = self._message_pool
+        table._step_pool = self._step_pool
+        table.action_names = {
+            new_row: self.action_names[row]
+            for new_row, row in enumerate(rows)
+            if row in self.action_names
+        }
+        table._timestamps_sorted = self._timestamps_sorted and list(
+            rows
+        ) == sorted(rows)
+        if table.timestamps:
+            table._last_timestamp = table.timestamps[-1]
+        return table
+
+    def record(self, row: int) -> LogRecord:
+        """行位置の行をログレコードとして取得"""
+        timestamp = self.timestamps[row]
+        step_id = self.step_ids[row]
+        return LogRecord(
+            line_number=self.line_numbers[row],
+            timestamp=None if timestamp == NO_TIMESTAMP else timestamp / 1e9,
+            level=LEVELS[self.levels[row]],
+            source=SOURCES[self.sources[row]],
+            message=self.messages[self.message_ids[row]],
+            step_name=None if step_id == NO_STEP else self.steps[step_id],
+            action_name=self.action_names.get(row),
+        )
+
+    def iter_records(self) -> Iterator[LogRecord]:
+        """全行をログレコードとして返す"""
+        for row in range(len(self)):
+            yield self.record(row)
+
+    def to_log_entries(self) -> List[LogEntry]:
+        """全行をLogEntryに変換"""
+        return [record.to_log_entry() for record in self.iter_records()]
+
+
+def _take(column: array, rows: Sequence[int]) -> array:
+    """列から指定した行位置の値を取り出す"""
+    if not rows:
+        return array(column.typecode)
+    if len(rows) == 1:
+        return array(column.typecode, [column[rows[0]]])
+    return array(column.typecode, itemgetter(*rows)(column))
@@ -0,0 +1,165 @@
+"""
+ログウォッチャー
+
+ディレクトリ内のログファイルを監視し、追記された行だけを解析します。
+Linuxではinotifyで変更を検知し、それ以外の環境では一定間隔で
+ファイルサイズを確認します。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..types import AnalysisState, LogLevel, PatternMatch
+from .incremental import advance_state, skip_to_end
+from .log_processor import LogProcessor
+from .pattern_matcher import PatternMatcher
+
+# inotifyで監視するイベント（inotify.h）
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+
+class _Inotify:
+    """inotifyによるディレクトリの変更通知"""
+
+    def __init__(self, directories: Iterable[str]) -> None:
+        """初期化"""
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        for directory in directories:
+            watch = libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), _WATCH_MASK
+            )
+            if watch < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout: float) -> bool:
+        """変更があるまで最大 timeout 秒待ち、変更があれば True を返す"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        # 溜まったイベントを読み捨てる（変更内容はファイルサイズで判断する）
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        """監視を終了"""
+        os.close(self._fd)
+
+
+def _create_notifier(directory: str) -> Optional[_Inotify]:
+    """利用できる場合はinotifyの通知を作成（開始時点のサブディレクトリも監視）"""
+    if not sys.platform.startswith("linux"):
+        return None
+    directories = [directory] + [
+        str(p) for p in Path(directory).rglob("*") if p.is_dir()
+    ]
+    try:
+        return _Inotify(directories)
+    except (OSError, AttributeError):
+        # inotifyの上限に達した場合など
+        return None
+
+
+class LogWatcher:
+    """ログファイルの追記部分を逐次解析するクラス"""
+
+    def __init__(
+        self,
+        log_processor: LogProcessor,
+        pattern_matcher: PatternMatcher,
+        directory: str,
+        pattern: str = "*.log",
+        min_log_level: LogLevel = LogLevel.WARNING,
+    ) -> None:
+        """初期化"""
+        self.log_processor = log_processor
+        self.pattern_matcher = pattern_matcher
+        self.directory = directory
+        self.pattern = pattern
+        self.min_log_level = min_log_level
+        # ファイルごとの解析位置（検出済みのマッチは蓄積しない）
+        self._states: Dict[str, AnalysisState] = {}
+
+    def skip_existing(self) -> None:
+        """既存のログの内容は解析せず、現在の末尾から監視する"""
+        for path in self._log_files():
+            state = self._states.setdefault(path, AnalysisState())
+            skip_to_end(path, self.min_log_level, state)
+
+    def poll(self) -> List[Tuple[str, List[PatternMatch]]]:
+        """前回から追記された行を解析し、マッチがあったファイルの結果を返す
+
+        書き込み途中の最終行は改行が書かれるまで解析しません。
+        ファイルが置き換えられた場合は先頭から読み直します。
+        """
+        results = []
+        for path in self._log_files():
+            try:
+                matches = self._poll_file(path)
+            except FileNotFoundError:
+                # 走査中に削除された
+                self._states.pop(path, None)
+                continue
+            if matches:
+                results.append((path, matches))
+        return results
+
+    def watch(
+        self,
+        interval: float,
+        should_stop: Callable[[], bool] = lambda: False,
+    ) -> Iterator[Tuple[str, List[PatternMatch]]]:
+        """変更を待ちながら追記された行のマッチを返し続ける
+
+        inotifyが利用できる場合は変更を検知した時点で、
+        それ以外の場合は interval 秒ごとにファイルを確認します。
+        """
+        notifier = _create_notifier(self.directory)
+        try:
+            while not should_stop():
+                yield from self.poll()
+                if notifier is not None:
+                    notifier.wait(interval)
+                else:
+                    time.sleep(interval)
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def _log_files(self) -> List[str]:
+        """監視対象のログファイル"""
+        return [
+            str(p)
+            for p in sorted(Path(self.directory).rglob(self.pattern))
+            if p.is_file()
+        ]
+
+    def _poll_file(self, path: str) -> List[PatternMatch]:
+        """1つのファイルの追記部分を解析"""
+        return advance_state(
+            self.log_processor,
+            self.pattern_matcher,
+            path,
+            self.min_log_level,
+            self._states.setdefault(path, AnalysisState()),
+        )
@@ -0,0 +1,484 @@
+"""
+並列処理
+
+ログファイルを行頭に揃えたバイト範囲（ZIPアーカイブはメンバー）に分割し、
+前処理とパターンマッチングを複数のプロセスで実行して結果を元の順序で結合します。
+複数のログファイルをワーカープロセスで同時に処理する機能も提供します。
+"""
+
+import os
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from ..types import LogLevel, LogRecord, PatternMatch, StepIndex, StepSpan
+from .compression import detect_compression, open_log_binary
+from .context_capture import ContextCapture
+from .gh_log import job_ranges
+from .log_archive import ArchiveMember, archive_members, is_log_archive
+from .log_processor import LogProcessor
+from .log_reader import (
+    count_lines,
+    iter_mmap_lines,
+    line_aligned_ranges,
+    preceding_lines_start,
+)
+from .pattern_matcher import PatternMatcher
+from .step_segmenter import StepSegmenter
+
+# 処理時間のばらつきを均すため、ワーカー数より多めに分割する
+CHUNKS_PER_JOB = 4
+
+
+# ワーカープロセスごとに一度だけ受け取るプロセッサーとマッチャー
+_worker_state: Dict[str, Any] = {}
+
+# (マッチ, マッチ統計, ステップの範囲)
+MatchResult = Tuple[List[PatternMatch], Dict[str, int], List[StepSpan]]
+
+
+def match_log_file(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_path: str,
+    min_log_level: LogLevel,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> MatchResult:
+    """ログファイル（またはそのバイト範囲）を処理し、(マッチ, マッチ統計, ステップの範囲) を返す
+
+    範囲の先頭より前のグループは分からないため、ステップの範囲は
+    ファイル全体を処理する場合（start が0、end が None）のみ返します。
+    ログのZIPアーカイブと圧縮されたログは、それぞれ match_archive と
+    match_compressed_log で処理します。
+    """
+    if start == 0 and end is None:
+        if is_log_archive(log_file_path):
+            return match_archive(
+                log_processor, pattern_matcher, log_file_path, min_log_level, 1
+            )
+        if detect_compression(log_file_path) is not None:
+            return match_compressed_log(
+                log_processor, pattern_matcher, log_file_path, min_log_level
+            )
+    segmenter = StepSegmenter()
+    log_processor.reset_noise_stats()
+    capture = log_processor.new_context_capture()
+    if capture is not None:
+        prime_context(capture, log_file_path, start, 1)
+    log_entries = log_processor.iter_mapped_records(
+        log_file_path,
+        min_log_level,
+        start=start,
+        end=end,
+        segmenter=segmenter,
+        capture=capture,
+    )
+    filtered_entries = log_processor.iter_by_level(log_entries, min_log_level)
+    matches = pattern_matcher.match_patterns(filtered_entries, capture)
+    if capture is not None and end is not None:
+        # 範囲の末尾付近のマッチは後の行を次の範囲から補う
+        fill_context(
+            capture,
+            log_file_path,
+            end,
+            count_lines(log_file_path, start, end) + 1,
+        )
+    step_spans = (
+        finish_step_spans(segmenter, log_file_path)
+        if start == 0 and end is None
+        else []
+    )
+    return (
+        matches,
+        collect_match_stats(log_processor, pattern_matcher),
+        step_spans,
+    )
+
+
+def prime_context(
+    capture: ContextCapture, log_file_path: str, start: int, first_line: int
+) -> None:
+    """範囲の先頭（first_line 行目）より前の行を前の行として渡す
+
+    範囲の直前の行が範囲の外で処理された行（書き込み途中だった行）でも
+    前の行が揃うよう、1行多く渡します。
+    """
+    if start <= 0 or capture.before <= 0:
+        return
+    prime_start = preceding_lines_start(
+        log_file_path, start, capture.before + 1
+    )
+    capture.prime(
+        iter_mmap_lines(
+            log_file_path,
+            start=prime_start,
+            end=start,
+            first_line=first_line
+            - count_lines(log_file_path, prime_start, start),
+        )
+    )
+
+
+def fill_context(
+    capture: ContextCapture, log_file_path: str, end: int, first_line: int
+) -> None:
+    """範囲の直後（first_line 行目以降）の行で後の行を補う"""
+    if capture.pending:
+        capture.fill(
+            iter_mmap_lines(log_file_path, start=end, first_line=first_line)
+        )
+
+
+def collect_match_stats(
+    log_processor: LogProcessor, pattern_matcher: PatternMatcher
+) -> Dict[str, int]:
+    """マッチ統計に、ノイズの規則ごとに除去した行数（noise_<規則名>）を加える"""
+    match_stats = dict(pattern_matcher.match_stats)
+    for rule, count in log_processor.noise_stats.items():
+        match_stats[f"noise_{rule}"] = count
+    return match_stats
+
+
+def finish_step_spans(
+    segmenter: StepSegmenter, log_file_path: str
+) -> List[StepSpan]:
+    """ファイルの最終行で終了していない範囲を閉じたステップの範囲を返す"""
+    if not segmenter.spans:
+        return []
+    return segmenter.finish(count_lines(log_file_path))
+
+
+def _match_range(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_path: str,
+    start: int,
+    end: int,
+    min_log_level: LogLevel,
+) -> Tuple[int, List[PatternMatch], Dict[str, int]]:
+    """バイト範囲を処理し、(範囲の行数, マッチ, マッチ統計) を返す"""
+    matches, match_stats, _ = match_log_file(
+        log_processor,
+        pattern_matcher,
+        log_file_path,
+        min_log_level,
+        start=start,
+        end=end,
+    )
+    line_count = count_lines(log_file_path, start, end)
+    return line_count, matches, match_stats
+
+
+def match_log_file_parallel(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_path: str,
+    min_log_level: LogLevel,
+    jobs: int,
+) -> MatchResult:
+    """ログファイルを複数プロセスで処理し、(マッチ, マッチ統計, ステップの範囲) を返す
+
+    各範囲の行番号は範囲の先頭からの相対値で返るため、
+    先行する範囲の行数を加算して元のファイルの行番号に戻します。
+    範囲をまたぐグループを追跡できるよう、ステップは結合後に
+    マーカー行のみを読み直して求め、区間インデックスで各マッチに付与します。
+    gh run view --log 形式のログはジョブごとの範囲に分割します。
+    """
+    ranges = _work_ranges(log_file_path, jobs)
+    pattern_matches: List[PatternMatch] = []
+    match_stats: Dict[str, int] = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                _match_range,
+                log_processor,
+                pattern_matcher,
+                log_file_path,
+                start,
+                end,
+                min_log_level,
+            )
+            for start, end in ranges
+        ]
+
+        line_offset = 0
+        for future in futures:
+            line_count, matches, stats = future.result()
+            _shift_records(matches, line_offset)
+            pattern_matches.extend(matches)
+            for key, value in stats.items():
+                match_stats[key] = match_stats.get(key, 0) + value
+            line_offset += line_count
+
+    segmenter = StepSegmenter()
+    for line_number, line in log_processor.iter_step_markers(log_file_path):
+        segmenter.feed(line_number, line)
+    step_spans = segmenter.finish(line_offset) if segmenter.spans else []
+
+    step_index = StepIndex(step_spans)
+    for match in pattern_matches:
+        entry = match.context.get("log_entry")
+        if isinstance(entry, LogRecord):
+            step_index.tag(entry)
+    return pattern_matches, match_stats, step_spans
+
+
+def _shift_records(
+    matches: List[PatternMatch], line_offset: int, id_offset: int = 0
+) -> None:
+    """マッチした行のレコードの行番号とステップIDをずらす
+
+    同じ行に複数のパターンがマッチした場合はレコードを共有するため、
+    各レコードを1回だけずらします。
+    """
+    shifted: Set[int] = set()
+    for match in matches:
+        entry = match.context.get("log_entry")
+        if not isinstance(entry, LogRecord) or id(entry) in shifted:
+            continue
+        shifted.add(id(entry))
+        entry.line_number += line_offset
+        if entry.step_id is not None:
+            entry.step_id += id_offset
+
+
+def _work_ranges(log_file_path: str, jobs: int) -> List[Tuple[int, int]]:
+    """ワーカーに割り当てるバイト範囲
+
+    複数のジョブを含む gh run view --log 形式のログはジョブの境界で分割し、
+    ジョブに属さない先頭・末尾の行はそれぞれ1つの範囲とします。
+    それ以外のログはおよそ等分のバイト範囲に分割します。
+    """
+    ranges = [(job.start, job.end) for job in job_ranges(log_file_path)]
+    if len(ranges) < 2:
+        return line_aligned_ranges(log_file_path, jobs * CHUNKS_PER_JOB)
+
+    if ranges[0][0] > 0:
+        ranges.insert(0, (0, ranges[0][0]))
+    size = os.path.getsize(log_file_path)
+    if ranges[-1][1] < size:
+        ranges.append((ranges[-1][1], size))
+    return ranges
+
+
+def match_archive(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_path: str,
+    min_log_level: LogLevel,
+    jobs: int,
+) -> MatchResult:
+    """ログのZIPアーカイブを展開せずに処理し、(マッチ, マッチ統計, ステップの範囲) を返す
+
+    メンバーは jobs 個のプロセスで並行して処理し、実行順に連結した
+    1つのログとして行番号とステップの範囲を振り直します。
+    各レコードにはディレクトリ構成から求めたジョブ名とステップ名を付与します。
+    """
+    members = archive_members(log_file_path)
+    args = [
+        (log_processor, pattern_matcher, log_file_path, member, min_log_level)
+        for member in members
+    ]
+
+    pattern_matches: List[PatternMatch] = []
+    match_stats: Dict[str, int] = {}
+    step_spans: List[StepSpan] = []
+    line_offset = 0
+
+    for line_count, matches, stats, spans in _iter_member_results(args, jobs):
+        id_offset = len(step_spans)
+        _shift_records(matches, line_offset, id_offset)
+        pattern_matches.extend(matches)
+        for key, value in stats.items():
+            match_stats[key] = match_stats.get(key, 0) + value
+        step_spans.extend(
+            _shift_span(span, line_offset, id_offset) for span in spans
+        )
+        line_offset += line_count
+
+    return pattern_matches, match_stats, step_spans
+
+
+def _iter_member_results(
+    args: List[Tuple[Any, ...]], jobs: int
+) -> Iterator[Tuple[int, List[PatternMatch], Dict[str, int], List[StepSpan]]]:
+    """メンバーの処理結果をアーカイブ内の順序で返す"""
+    if jobs <= 1 or len(args) <= 1:
+        for arg in args:
+            yield _match_member(*arg)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_match_member, *zip(*args))
+
+
+def match_stream(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    stream: Iterable[bytes],
+    min_log_level: LogLevel,
+) -> Tuple[int, List[PatternMatch], Dict[str, int], List[StepSpan]]:
+    """バイト列の行のストリームを処理し、(行数, マッチ, マッチ統計, ステップの範囲) を返す
+
+    メモリマップできない入力（アーカイブのメンバーや圧縮されたログ）に使用します。
+    """
+    segmenter = StepSegmenter()
+    log_processor.reset_noise_stats()
+    capture = log_processor.new_context_capture()
+    lines = log_processor.stream_line_reader(
+        stream, min_log_level, segmenter, capture
+    )
+    log_entries = log_processor.process_numbered_records(
+        lines, segmenter, min_log_level
+    )
+    filtered_entries = log_processor.iter_by_level(log_entries, min_log_level)
+    matches = pattern_matcher.match_patterns(filtered_entries, capture)
+
+    step_spans = segmenter.finish(lines.line_count) if segmenter.spans else []
+    return (
+        lines.line_count,
+        matches,
+        collect_match_stats(log_processor, pattern_matcher),
+        step_spans,
+    )
+
+
+def match_compressed_log(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_path: str,
+    min_log_level: LogLevel,
+) -> MatchResult:
+    """圧縮されたログを伸長しながら処理し、(マッチ, マッチ統計, ステップの範囲) を返す
+
+    伸長したデータはディスクに書き出さず、一定の大きさずつ読み込みます。
+    任意の位置から伸長できないため、範囲に分割せずに1つのプロセスで処理します。
+    """
+    with open_log_binary(log_file_path) as stream:
+        _, matches, match_stats, step_spans = match_stream(
+            log_processor, pattern_matcher, stream, min_log_level
+        )
+    return matches, match_stats, step_spans
+
+
+def _match_member(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_path: str,
+    member: ArchiveMember,
+    min_log_level: LogLevel,
+) -> Tuple[int, List[PatternMatch], Dict[str, int], List[StepSpan]]:
+    """アーカイブの1つのメンバーを処理し、(行数, マッチ, マッチ統計, ステップの範囲) を返す"""
+    with (
+        zipfile.ZipFile(log_file_path) as archive,
+        archive.open(member.name) as stream,
+    ):
+        line_count, matches, match_stats, step_spans = match_stream(
+            log_processor, pattern_matcher, stream, min_log_level
+        )
+
+    for match in matches:
+        entry = match.context.get("log_entry")
+        if isinstance(entry, LogRecord):
+            entry.job_name = member.job_name
+            if member.step_name is not None:
+                entry.step_name = member.step_name
+    return line_count, matches, match_stats, step_spans
+
+
+def _shift_span(span: StepSpan, line_offset: int, id_offset: int) -> StepSpan:
+    """連結後の行番号とIDに振り直した範囲"""
+
+    def shift(line: Optional[int]) -> Optional[int]:
+        return None if line is None else line + line_offset
+
+    return span.model_copy(
+        update={
+            "step_id": span.step_id + id_offset,
+            "parent_id": (
+                None if span.parent_id is None else span.parent_id + id_offset
+            ),
+            "start_line": span.start_line + line_offset,
+            "end_line": shift(span.end_line),
+            "group_end_line": shift(span.group_end_line),
+        }
+    )
+
+
+def _init_worker(
+    log_processor: LogProcessor, pattern_matcher: PatternMatcher
+) -> None:
+    """ワーカープロセスの初期化"""
+    _worker_state["log_processor"] = log_processor
+    _worker_state["pattern_matcher"] = pattern_matcher
+
+
+def _match_file_in_worker(
+    log_file_path: str, min_log_level: LogLevel
+) -> MatchResult:
+    """ワーカープロセスで1つのログファイルを処理"""
+    return match_log_file(
+        _worker_state["log_processor"],
+        _worker_state["pattern_matcher"],
+        log_file_path,
+        min_log_level,
+    )
+
+
+def match_log_files(
+    log_processor: LogProcessor,
+    pattern_matcher: PatternMatcher,
+    log_file_paths: Iterable[str],
+    min_log_level: LogLevel,
+    jobs: int,
+) -> Iterator[Tuple[str, Union[MatchResult, Exception]]]:
+    """複数のログファイルを処理し、完了した順に (パス, 結果または例外) を返す
+
+    プロセッサーとマッチャーはワーカーの起動時に一度だけ渡します。
+    jobs が1の場合はワーカーを使わずに順番に処理します。
+    """
+    if jobs <= 1:
+        for log_file_path in log_file_paths:
+            try:
+                yield log_file_path, match_log_file(
+                    log_processor,
+                    pattern_matcher,
+                    log_file_path,
+                    min_log_level,
+                )
+            except Exception as e:
+                yield log_file_path, e
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(log_processor, pattern_matcher),
+    )
+    try:
+        futures: Dict[Future[MatchResult], str] = {
+            executor.submit(
+                _match_file_in_worker, log_file_path, min_log_level
+            ): log_file_path
+            for log_file_path in log_file_paths
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+    finally:
+        # 途中で打ち切られた場合は未着手のファイルを処理しない
+        executor.shutdown(wait=True, cancel_futures=True)
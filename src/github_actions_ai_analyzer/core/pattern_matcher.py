@@ -4,19 +4,61 @@
 エラーパターンとのマッチングを行い、構造化されたエラー情報を抽出します。
 """
 
+import hashlib
+import json
 import re
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Union
 
-from ..types import ErrorPattern, LogEntry, PatternCategory, PatternMatch
+import regex
+
+from ..types import (
+    ErrorPattern,
+    LogEntry,
+    LogRecord,
+    PatternCategory,
+    PatternMatch,
+)
+from .context_capture import ContextCapture
+from .literal_index import LiteralIndex
 
 
 class PatternMatcher:
     """エラーパターンマッチングを行うクラス"""
 
-    def __init__(self) -> None:
+    # 利用可能なマッチングエンジン
+    # - "compiled": パターンごとにコンパイル済み正規表現で検索
+    # - "combined": 全パターンを1つの正規表現に統合して1回で走査し、
+    #               ヒットした行のみパターンごとの検索で詳細を取得
+    ENGINES = ("compiled", "combined")
+
+    def __init__(
+        self, engine: str = "compiled", use_prefilter: bool = True
+    ) -> None:
         """初期化"""
+        if engine not in self.ENGINES:
+            raise ValueError(
+                f"未対応のマッチングエンジンです: {engine} "
+                f"(利用可能: {', '.join(self.ENGINES)})"
+            )
+        self.engine = engine
+        # 必須リテラルで実行するパターンを絞り込むかどうか
+        self.use_prefilter = use_prefilter
         self.patterns: List[ErrorPattern] = []
+        # パターンID -> コンパイル済み正規表現
+        self._compiled_patterns: Dict[str, re.Pattern[str]] = {}
+        # 統合正規表現（combinedエンジン用）とリテラル索引
+        # patternsの内容が変わった時点で作り直す
+        self._combined_regex: Optional[Any] = None
+        self._literal_index: Optional[LiteralIndex] = None
+        self._index_source: Optional[List[tuple[str, str]]] = None
+        # 直近のmatch_patterns呼び出しの統計
+        self.match_stats: Dict[str, int] = {
+            "lines": 0,
+            "lines_skipped_by_prefilter": 0,
+        }
         self._load_default_patterns()
+        for pattern in self.patterns:
+            self._compile_pattern(pattern)
 
     def _load_default_patterns(self) -> None:
         """デフォルトのエラーパターンを読み込み"""
@@ -335,33 +377,70 @@ class PatternMatcher:
         )
 
     def match_patterns(
-        self, log_entries: List[LogEntry]
+        self,
+        log_entries: Iterable[Union[LogEntry, LogRecord]],
+        context_capture: Optional[ContextCapture] = None,
     ) -> List[PatternMatch]:
-        """ログエントリに対してパターンマッチングを実行"""
+        """ログエントリに対してパターンマッチングを実行
+
+        context_capture を渡すと、マッチした行の前後の行を
+        マッチのコンテキストに付与します。
+        """
         matches = []
 
+        # patternsが直接変更されていれば索引を作り直す
+        self._refresh_indexes()
+        self.match_stats = {"lines": 0, "lines_skipped_by_prefilter": 0}
+
         for entry in log_entries:
             entry_matches = self._match_entry(entry)
+            if entry_matches and context_capture is not None:
+                context_capture.capture(_line_number_of(entry), entry_matches)
             matches.extend(entry_matches)
 
         return matches
 
-    def _match_entry(self, entry: LogEntry) -> List[PatternMatch]:
+    def _match_entry(
+        self, entry: Union[LogEntry, LogRecord]
+    ) -> List[PatternMatch]:
         """単一のログエントリに対してパターンマッチングを実行"""
-        matches = []
-
+        matches: List[PatternMatch] = []
+        if self._index_source is None:
+            self._refresh_indexes()
+        self.match_stats["lines"] += 1
+
+        # 必須リテラルが1つも含まれないパターンは実行しない
+        candidate_ids = None
+        if self.use_prefilter and self._literal_index is not None:
+            candidate_ids = self._literal_index.candidates(entry.message)
+            if candidate_ids is not None and not candidate_ids:
+                self.match_stats["lines_skipped_by_prefilter"] += 1
+                return matches
+
+        # 統合正規表現に1つもヒットしない行は個別検索を省略
+        if self.engine == "combined" and not self._combined_search(
+            entry.message
+        ):
+            return matches
+
+        # LogRecord のメタデータには言語が含まれず、参照のたびに辞書が
+        # 作られるため、言語フィルタは LogEntry の場合のみ参照する
+        metadata = entry.metadata if isinstance(entry, LogEntry) else None
         for pattern in self.patterns:
+            if candidate_ids is not None and pattern.id not in candidate_ids:
+                continue
+
             # 言語フィルタリング（メタデータに言語が設定されている場合のみ）
             if (
                 pattern.language
-                and "language" in entry.metadata
-                and entry.metadata.get("language") != pattern.language
+                and metadata is not None
+                and "language" in metadata
+                and metadata.get("language") != pattern.language
             ):
                 continue
 
             # 正規表現マッチング
-            regex = re.compile(pattern.regex_pattern, re.IGNORECASE)
-            match = regex.search(entry.message)
+            match = self._get_compiled(pattern).search(entry.message)
 
             if match:
                 confidence = self._calculate_confidence(pattern, entry, match)
@@ -382,8 +461,61 @@ class PatternMatcher:
 
         return matches
 
+    def _compile_pattern(self, pattern: ErrorPattern) -> re.Pattern[str]:
+        """パターンをコンパイルしてキャッシュに登録"""
+        compiled = re.compile(pattern.regex_pattern, re.IGNORECASE)
+        self._compiled_patterns[pattern.id] = compiled
+        return compiled
+
+    def _get_compiled(self, pattern: ErrorPattern) -> re.Pattern[str]:
+        """コンパイル済みの正規表現を取得"""
+        compiled = self._compiled_patterns.get(pattern.id)
+        # patternsが直接変更された場合に備えて内容も確認する
+        if compiled is None or compiled.pattern != pattern.regex_pattern:
+            compiled = self._compile_pattern(pattern)
+        return compiled
+
+    def _combined_search(self, message: str) -> bool:
+        """統合正規表現で行を1回だけ走査し、いずれかのパターンにヒットするか判定
+
+        交替（alternation）は同じ位置で先に書かれたパターンを優先するため、
+        ヒットした行ではグループや重複マッチを取りこぼさないよう
+        呼び出し側でパターンごとの検索を改めて行います。
+        """
+        if self._combined_regex is None:
+            # 統合できないパターンがある場合は常に個別検索へ
+            return True
+        return self._combined_regex.search(message) is not None
+
+    def _refresh_indexes(self) -> None:
+        """patternsの内容が変わっていれば統合正規表現とリテラル索引を構築"""
+        source = [
+            (pattern.id, pattern.regex_pattern) for pattern in self.patterns
+        ]
+        if source == self._index_source:
+            return
+        self._index_source = source
+
+        self._literal_index = LiteralIndex(self.patterns)
+
+        self._combined_regex = None
+        if self.engine == "combined":
+            alternatives = "|".join(
+                f"(?:{regex_pattern})" for _, regex_pattern in source
+            )
+            try:
+                self._combined_regex = regex.compile(
+                    alternatives, regex.IGNORECASE
+                )
+            except regex.error:
+                # 後方参照などで統合できない場合
+                self._combined_regex = None
+
     def _calculate_confidence(
-        self, pattern: ErrorPattern, entry: LogEntry, match: re.Match
+        self,
+        pattern: ErrorPattern,
+        entry: Union[LogEntry, LogRecord],
+        match: re.Match,
     ) -> float:
         """マッチングの信頼度を計算"""
         confidence = 0.5  # ベース信頼度
@@ -406,7 +538,21 @@ class PatternMatcher:
 
     def add_pattern(self, pattern: ErrorPattern) -> None:
         """新しいパターンを追加"""
+        self._compile_pattern(pattern)
         self.patterns.append(pattern)
+        self._index_source = None
+
+    def pattern_set_version(self) -> str:
+        """パターン定義の内容から求めたバージョン（ハッシュ）
+
+        パターンの追加・削除・変更で値が変わるため、
+        解析結果のキャッシュキーに使用します。
+        """
+        definitions = [
+            pattern.model_dump(mode="json") for pattern in self.patterns
+        ]
+        encoded = json.dumps(definitions, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
 
     def get_patterns_by_category(
         self, category: PatternCategory
@@ -423,5 +569,14 @@ class PatternMatcher:
         for i, pattern in enumerate(self.patterns):
             if pattern.id == pattern_id:
                 del self.patterns[i]
+                self._compiled_patterns.pop(pattern_id, None)
+                self._index_source = None
                 return True
         return False
+
+
+def _line_number_of(entry: Union[LogEntry, LogRecord]) -> int:
+    """エントリの行番号（LogRecord はメタデータを作らずに参照する）"""
+    if isinstance(entry, LogRecord):
+        return entry.line_number
+    return int(entry.metadata.get("line_number", 0))
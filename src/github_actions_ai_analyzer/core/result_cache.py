@@ -0,0 +1,170 @@
+"""
+解析結果キャッシュ
+
+ログの内容・パターン定義・解析オプションから求めたキーで解析結果を
+ディスクに保存し、同じログを再度解析する際に再利用します。
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .. import __version__
+from ..types import AnalysisResult
+from ..types.analysis_types import CONTEXT_FIELDS
+from .cache_dir import get_cache_dir
+
+# キャッシュの保存形式を変更した場合に上げる
+CACHE_FORMAT_VERSION = 3
+
+# キャッシュ全体の既定の上限サイズ
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# ファイルの内容ハッシュを覚えておく件数
+_DIGEST_INDEX_LIMIT = 1024
+_DIGEST_INDEX_FILE = "digests.json"
+
+
+class ResultCache:
+    """内容アドレス方式の解析結果キャッシュ
+
+    合計サイズが max_bytes を超えると、最後に使用された時刻が古い結果から
+    削除します（使用時刻はファイルの更新時刻で管理します）。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """初期化"""
+        self.directory = Path(cache_dir or get_cache_dir()) / "results"
+        self.max_bytes = max_bytes
+
+    def make_key(
+        self,
+        log_file_path: str,
+        pattern_set_version: str,
+        options: Dict[str, Any],
+    ) -> str:
+        """ログの内容・パターン定義・解析オプションからキーを作成"""
+        fingerprint = {
+            "format": CACHE_FORMAT_VERSION,
+            "analyzer": __version__,
+            "log": self._file_digest(log_file_path),
+            "patterns": pattern_set_version,
+            "options": options,
+        }
+        encoded = json.dumps(fingerprint, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        """キャッシュされた解析結果を取得（ない場合は None）"""
+        path = self._entry_path(key)
+        try:
+            result = AnalysisResult.model_validate_json(path.read_bytes())
+        except (OSError, ValueError):
+            # キャッシュがない、または壊れている
+            return None
+
+        # LRUの使用時刻を更新
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return result
+
+    def put(self, key: str, result: AnalysisResult) -> None:
+        """解析結果を保存（コンテキストは環境に依存するため保存しない）"""
+        data = result.model_dump_json(exclude=set(CONTEXT_FIELDS))
+        # キャッシュの保存に失敗しても解析結果には影響しない
+        with contextlib.suppress(OSError):
+            self._write_atomic(self._entry_path(key), data.encode("utf-8"))
+            self.evict()
+
+    def evict(self) -> None:
+        """合計サイズが上限を超えている場合、古い結果から削除"""
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            if path.name == _DIGEST_INDEX_FILE:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        """キャッシュをすべて削除"""
+        for path in self.directory.glob("*.json"):
+            with contextlib.suppress(OSError):
+                path.unlink()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _file_digest(self, log_file_path: str) -> str:
+        """ファイル内容のハッシュ
+
+        パス・サイズ・更新時刻が前回と同じであれば、
+        前回求めたハッシュを再利用してファイルの読み込みを省略します。
+        """
+        stat = os.stat(log_file_path)
+        stat_key = "\0".join(
+            [
+                os.path.realpath(log_file_path),
+                str(stat.st_size),
+                str(stat.st_mtime_ns),
+            ]
+        )
+
+        index_path = self.directory / _DIGEST_INDEX_FILE
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            if not isinstance(index, dict):
+                index = {}
+        except (OSError, ValueError):
+            index = {}
+
+        digest = index.get(stat_key)
+        if isinstance(digest, str):
+            return digest
+
+        with open(log_file_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+        # 古いものから削除して件数を抑える
+        index.pop(stat_key, None)
+        index[stat_key] = digest
+        while len(index) > _DIGEST_INDEX_LIMIT:
+            del index[next(iter(index))]
+        with contextlib.suppress(OSError):
+            self._write_atomic(index_path, json.dumps(index).encode("utf-8"))
+        return digest
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        """一時ファイルに書き込んでから置き換える（並行実行に備える）"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
@@ -0,0 +1,133 @@
+"""
+ステップ分割
+
+``##[group]`` / ``##[endgroup]`` のマーカー行をスタックで追跡し、
+ログをステップ（グループ）ごとの行範囲に分割します。
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+from ..types import LogRecord, StepSpan
+from .gh_log import split_gh_prefix
+from .timestamp import split_timestamp
+
+GROUP_MARKER = "##[group]"
+ENDGROUP_MARKER = "##[endgroup]"
+_GROUP_NAME_START = len(GROUP_MARKER)
+
+# ランナーがステップの見出しに付けるグループ名の接頭辞
+# (ステップの出力中に作られたグループと区別するために使う)
+STEP_HEADER_PREFIXES = ("Run ", "Post Run ")
+
+# マーカー行の候補をバイト列のまま探す正規表現（タイムスタンプの後ろも含む）
+STEP_MARKER_BYTES_REGEX = re.compile(rb"##\[(?:end)?group\]")
+
+
+class StepSegmenter:
+    """ログを行番号順に受け取りながらステップの範囲を求めるクラス
+
+    マーカー行を feed() に、それ以外の行のレコードを tag() に
+    行番号順に渡すと、各レコードに属するステップ（グループ）を付与します。
+    前回までの spans を渡すと、その続きから分割を再開します。
+
+    ステップの出力中に作られたグループ（``::group::``）も生ログでは
+    トップレベルに現れるため、ステップの開始後は見出しの形式
+    （STEP_HEADER_PREFIXES）のグループのみを次のステップとし、
+    それ以外は現在のステップの入れ子として扱います。
+    """
+
+    def __init__(self, spans: Optional[Iterable[StepSpan]] = None) -> None:
+        """初期化"""
+        self.spans: List[StepSpan] = list(spans or [])
+        # 閉じていないグループ（外側から順）
+        self._stack: List[StepSpan] = sorted(
+            (span for span in self.spans if span.group_end_line is None),
+            key=lambda span: span.depth,
+        )
+        # 現在のステップ（グループの終了後も次のステップまで続く）
+        self._step: Optional[StepSpan] = None
+        for span in self.spans:
+            if span.depth == 0 and span.end_line is None:
+                self._step = span
+
+    @property
+    def current(self) -> Optional[StepSpan]:
+        """現在の行が属する最も内側のグループ"""
+        if self._stack:
+            return self._stack[-1]
+        return self._step
+
+    def feed(self, line_number: int, line: str) -> bool:
+        """マーカー行であればスタックを更新して True を返す"""
+        if "\t" in line:
+            gh_prefix = split_gh_prefix(line)
+            if gh_prefix is not None:
+                line = gh_prefix[2]
+        _, body = split_timestamp(line)
+        body = body.lstrip()
+        if body.startswith(GROUP_MARKER):
+            self._open(line_number, body[_GROUP_NAME_START:].strip())
+            return True
+        if body.startswith(ENDGROUP_MARKER):
+            self._close(line_number)
+            return True
+        return False
+
+    def tag(self, record: LogRecord) -> None:
+        """レコードに属するグループのIDとステップ名を付与
+
+        グループから求めたステップ名は、行の内容から推測した名前より優先します。
+        """
+        span = self.current
+        if span is None:
+            return
+        record.step_id = span.step_id
+        if self._step is not None:
+            record.step_name = self._step.name
+
+    def finish(self, last_line: int) -> List[StepSpan]:
+        """終了していない範囲を last_line までとした、全範囲のコピーを返す
+
+        分割の状態は変更しないため、続きの行を追加で渡すことができます。
+        """
+        return [
+            (
+                span
+                if span.end_line is not None
+                else span.model_copy(update={"end_line": last_line})
+            )
+            for span in self.spans
+        ]
+
+    def _open(self, line_number: int, name: str) -> None:
+        """グループを開始"""
+        parent = self._stack[-1] if self._stack else None
+        if parent is None and self._step is not None:
+            if name.startswith(STEP_HEADER_PREFIXES):
+                # 次のステップの開始で前のステップが終了する
+                self._step.end_line = line_number - 1
+                self._step = None
+            else:
+                parent = self._step
+
+        span = StepSpan(
+            step_id=len(self.spans),
+            name=name,
+            depth=parent.depth + 1 if parent else 0,
+            parent_id=parent.step_id if parent else None,
+            start_line=line_number,
+        )
+        self.spans.append(span)
+        self._stack.append(span)
+        if parent is None:
+            self._step = span
+
+    def _close(self, line_number: int) -> None:
+        """最も内側のグループを終了（対応する開始がなければ無視）"""
+        if not self._stack:
+            return
+        span = self._stack.pop()
+        span.group_end_line = line_number
+        if span.depth > 0:
+            span.end_line = line_number
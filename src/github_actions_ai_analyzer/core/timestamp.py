@@ -0,0 +1,119 @@
+"""
+タイムスタンプ解析
+
+GitHub Actionsのログ行の先頭にある固定幅のタイムスタンプ
+（``2024-01-01T00:00:00.0000000Z``）を、正規表現を使わずに解析します。
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+# 形式に合わない行で行中のタイムスタンプを探す正規表現（小数部は1〜9桁）
+TIMESTAMP_REGEX = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{1,9}Z")
+
+# 秒までの部分（YYYY-MM-DDTHH:MM:SS） -> エポック秒（不正な日時は None）
+# ログは時刻順に並ぶため、同じ秒の行は辞書の参照だけで解析できる
+_second_epochs: Dict[str, Optional[int]] = {}
+_SECOND_CACHE_LIMIT = 4096
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# 秒までの部分の長さ（"YYYY-MM-DDTHH:MM:SS"）
+_SECONDS_LENGTH = 19
+
+# 小数部の桁数 -> マイクロ秒への倍率（7桁以上は6桁に切り捨てる）
+_MICROSECOND_SCALE = (0, 100000, 10000, 1000, 100, 10, 1)
+
+
+def split_timestamp(line: str) -> Tuple[Optional[float], str]:
+    """行頭のタイムスタンプを解析し、(エポック秒, タイムスタンプ以降) を返す
+
+    行頭にタイムスタンプがない場合は行中のタイムスタンプを探し、
+    行はそのまま返します。タイムスタンプがない場合のエポック秒は None です。
+    """
+    epoch, end = parse_timestamp_at(line, 0)
+    if end:
+        return epoch, line[end:].lstrip()
+
+    match = TIMESTAMP_REGEX.search(line)
+    if match:
+        epoch, _ = parse_timestamp_at(line, match.start())
+        return epoch, line
+    return None, line
+
+
+def parse_timestamp_at(line: str, pos: int) -> Tuple[Optional[float], int]:
+    """pos の位置のタイムスタンプを解析し、(エポック秒, 直後の位置) を返す
+
+    解析できない場合は (None, 0) を返します。
+    小数部はマイクロ秒（6桁）までを使用します。
+    """
+    dot = pos + _SECONDS_LENGTH
+    fraction_start = dot + 1
+    if line[dot:fraction_start] != ".":
+        return None, 0
+    zulu = line.find("Z", fraction_start + 1, fraction_start + 10)
+    if zulu == -1:
+        return None, 0
+    fraction = line[fraction_start:zulu]
+    if not (fraction.isdigit() and fraction.isascii()):
+        return None, 0
+    fraction = fraction[:6]
+
+    seconds = _second_epoch(line[pos:dot])
+    if seconds is None:
+        return None, 0
+    microsecond = int(fraction) * _MICROSECOND_SCALE[len(fraction)]
+    return seconds + microsecond / 1_000_000, zulu + 1
+
+
+def to_datetime(epoch: float) -> datetime:
+    """エポック秒をUTCのdatetimeに変換"""
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+def _second_epoch(text: str) -> Optional[int]:
+    """秒までの日時（YYYY-MM-DDTHH:MM:SS）のエポック秒"""
+    try:
+        return _second_epochs[text]
+    except KeyError:
+        pass
+
+    value: Optional[int] = None
+    digits = (
+        text[0:4]
+        + text[5:7]
+        + text[8:10]
+        + text[11:13]
+        + text[14:16]
+        + text[17:19]
+    )
+    if (
+        text[4:5] == "-"
+        and text[7:8] == "-"
+        and text[10:11] == "T"
+        and text[13:14] == ":"
+        and text[16:17] == ":"
+        and len(digits) == 14
+        and digits.isdigit()
+        and digits.isascii()
+    ):
+        try:
+            parsed = datetime(
+                int(text[0:4]),
+                int(text[5:7]),
+                int(text[8:10]),
+                int(text[11:13]),
+                int(text[14:16]),
+                int(text[17:19]),
+                tzinfo=timezone.utc,
+            )
+            value = (parsed - _EPOCH) // timedelta(seconds=1)
+        except ValueError:
+            value = None
+
+    if len(_second_epochs) >= _SECOND_CACHE_LIMIT:
+        _second_epochs.clear()
+    _second_epochs[text] = value
+    return value
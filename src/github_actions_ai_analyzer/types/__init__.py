@@ -4,20 +4,35 @@
 GitHub Actions AI Analyzerで使用する型定義を提供します。
 """
 
-from .analysis_types import AnalysisResult, ErrorAnalysis, SolutionProposal
+from .analysis_types import (
+    AnalysisResult,
+    AnalysisState,
+    ErrorAnalysis,
+    SolutionProposal,
+)
 from .context_types import (
     EnvironmentContext,
     RepositoryContext,
     WorkflowContext,
 )
-from .log_types import LogEntry, LogLevel, LogSource
+from .log_types import (
+    LogEntry,
+    LogLevel,
+    LogRecord,
+    LogSource,
+    StepIndex,
+    StepSpan,
+)
 from .pattern_types import ErrorPattern, PatternCategory, PatternMatch
 
 __all__ = [
     # log_types
     "LogEntry",
     "LogLevel",
+    "LogRecord",
     "LogSource",
+    "StepIndex",
+    "StepSpan",
     # context_types
     "RepositoryContext",
     "WorkflowContext",
@@ -28,6 +43,7 @@ __all__ = [
     "PatternCategory",
     # analysis_types
     "AnalysisResult",
+    "AnalysisState",
     "ErrorAnalysis",
     "SolutionProposal",
 ]
@@ -4,16 +4,17 @@
 解析結果と解決策提案を定義します。
 """
 
-from typing import Any, Dict, List, Optional
+import base64
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 
 from .context_types import (
     EnvironmentContext,
     RepositoryContext,
     WorkflowContext,
 )
-from .log_types import LogEntry
+from .log_types import LogEntry, LogLevel, StepIndex, StepSpan
 from .pattern_types import PatternMatch
 
 
@@ -33,6 +34,9 @@ class ErrorAnalysis(BaseModel):
     related_files: List[str] = Field(
         default_factory=list, description="関連ファイル"
     )
+    job_name: Optional[str] = Field(
+        None, description="ジョブ名（gh run view --log 形式のログのみ）"
+    )
 
 
 class SolutionProposal(BaseModel):
@@ -52,18 +56,99 @@ class SolutionProposal(BaseModel):
     )
 
 
+class AnalysisState(BaseModel):
+    """増分解析の状態
+
+    前回までに解析したログの位置と検出済みのマッチを保持します。
+    analyze_log_file に渡すと、前回の続きのバイト位置から解析します。
+    """
+
+    offset: int = Field(default=0, description="解析済みのバイト位置")
+    line_count: int = Field(
+        default=0, description="解析済みの行数（改行で終わる行）"
+    )
+    partial_line: bytes = Field(
+        default=b"",
+        description="末尾の改行で終わっていない行（次回の先頭に連結）",
+    )
+    head_size: int = Field(
+        default=0, description="ファイル同一性の確認に使う先頭のバイト数"
+    )
+    head_digest: str = Field(
+        default="", description="先頭 head_size バイトのハッシュ"
+    )
+    min_log_level: Optional[LogLevel] = Field(
+        default=None, description="解析時の最小ログレベル"
+    )
+    pattern_matches: Dict[str, List[PatternMatch]] = Field(
+        default_factory=dict, description="パターンIDごとの検出済みマッチ"
+    )
+    match_stats: Dict[str, int] = Field(
+        default_factory=dict, description="累計のマッチ統計"
+    )
+    step_spans: List[StepSpan] = Field(
+        default_factory=list, description="解析済みの部分のステップの範囲"
+    )
+
+    # 書き込み途中の行はUTF-8として不完全な場合があるためbase64で保存する
+    model_config = ConfigDict(ser_json_bytes="base64")
+
+    @field_validator("partial_line", mode="before")
+    @classmethod
+    def _decode_partial_line(cls, value: Any) -> Any:
+        """JSONから復元する場合はbase64をデコード
+
+        ser_json_bytes="base64" はURLセーフな文字（- と _）で出力するため、
+        同じアルファベットでデコードします。
+        """
+        if isinstance(value, str):
+            return base64.urlsafe_b64decode(value)
+        return value
+
+    def reset(self) -> None:
+        """最初から解析し直す状態に戻す"""
+        self.offset = 0
+        self.line_count = 0
+        self.partial_line = b""
+        self.head_size = 0
+        self.head_digest = ""
+        self.pattern_matches = {}
+        self.match_stats = {}
+        self.step_spans = []
+
+    def all_matches(self) -> List[PatternMatch]:
+        """検出済みのマッチをすべて返す"""
+        return [
+            match
+            for matches in self.pattern_matches.values()
+            for match in matches
+        ]
+
+
+# 遅延評価できるコンテキストのフィールド名
+CONTEXT_FIELDS = (
+    "repository_context",
+    "workflow_context",
+    "environment_context",
+)
+
+
 class AnalysisResult(BaseModel):
-    """解析結果"""
+    """解析結果
+
+    コンテキストは defer_context() で登録した関数により、初回アクセス時
+    またはシリアライズ時に収集されます。収集を省略したコンテキストは None です。
+    """
 
     analysis_id: str = Field(..., description="解析ID")
-    repository_context: RepositoryContext = Field(
-        ..., description="リポジトリコンテキスト"
+    repository_context: Optional[RepositoryContext] = Field(
+        default=None, description="リポジトリコンテキスト"
     )
-    workflow_context: WorkflowContext = Field(
-        ..., description="ワークフローコンテキスト"
+    workflow_context: Optional[WorkflowContext] = Field(
+        default=None, description="ワークフローコンテキスト"
     )
-    environment_context: EnvironmentContext = Field(
-        ..., description="環境コンテキスト"
+    environment_context: Optional[EnvironmentContext] = Field(
+        default=None, description="環境コンテキスト"
     )
     error_analyses: List[ErrorAnalysis] = Field(
         ..., description="エラー解析結果"
@@ -75,6 +160,82 @@ class AnalysisResult(BaseModel):
     recommendations: List[str] = Field(
         default_factory=list, description="推奨事項"
     )
+    step_spans: List[StepSpan] = Field(
+        default_factory=list, description="ステップの行範囲"
+    )
+    state: Optional[AnalysisState] = Field(
+        default=None,
+        exclude=True,
+        description="増分解析の状態（次回の analyze_log_file に渡す）",
+    )
     metadata: Dict[str, Any] = Field(
         default_factory=dict, description="追加メタデータ"
     )
+
+    # フィールド名 -> 未収集のコンテキストを収集する関数
+    _context_loaders: Dict[str, Callable[[], Any]] = PrivateAttr(
+        default_factory=dict
+    )
+    _step_index: Optional[StepIndex] = PrivateAttr(None)
+
+    @property
+    def step_index(self) -> StepIndex:
+        """ステップの範囲の区間インデックス
+
+        設定されていない場合（キャッシュから復元した結果など）は、
+        初回アクセス時に step_spans から作成します。
+        """
+        if self._step_index is None:
+            self._step_index = StepIndex(self.step_spans)
+        return self._step_index
+
+    @step_index.setter
+    def step_index(self, value: StepIndex) -> None:
+        self._step_index = value
+
+    def analyses_by_job(self) -> Dict[Optional[str], List[ErrorAnalysis]]:
+        """エラー解析結果をジョブ名ごとにまとめる（出現順）"""
+        by_job: Dict[Optional[str], List[ErrorAnalysis]] = {}
+        for analysis in self.error_analyses:
+            by_job.setdefault(analysis.job_name, []).append(analysis)
+        return by_job
+
+    def defer_context(self, name: str, loader: Callable[[], Any]) -> None:
+        """コンテキストを初回アクセス時に収集するよう登録"""
+        if name not in CONTEXT_FIELDS:
+            raise ValueError(f"遅延評価できないフィールドです: {name}")
+        self._context_loaders[name] = loader
+        # フィールドを未設定にしておき、アクセス時に __getattr__ で収集する
+        self.__dict__.pop(name, None)
+
+    def load_contexts(self) -> None:
+        """未収集のコンテキストをすべて収集"""
+        for name in list(self._context_loaders):
+            getattr(self, name)
+
+    def model_dump(self, **kwargs: Any) -> Dict[str, Any]:
+        """シリアライズ前に未収集のコンテキストを収集"""
+        self._load_contexts_for_dump(kwargs.get("exclude"))
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs: Any) -> str:
+        """シリアライズ前に未収集のコンテキストを収集"""
+        self._load_contexts_for_dump(kwargs.get("exclude"))
+        return super().model_dump_json(**kwargs)
+
+    def _load_contexts_for_dump(self, exclude: Any) -> None:
+        """シリアライズから除外されていないコンテキストを収集"""
+        for name in list(self._context_loaders):
+            if not exclude or name not in exclude:
+                getattr(self, name)
+
+    if not TYPE_CHECKING:
+
+        def __getattr__(self, name: str) -> Any:
+            if name in CONTEXT_FIELDS:
+                loader = self._context_loaders.pop(name, None)
+                if loader is not None:
+                    value = loader()
+                    self.__dict__[name] = value
+                    return value
+            return super().__getattr__(name)
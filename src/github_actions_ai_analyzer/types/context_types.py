@@ -51,6 +51,9 @@ class EnvironmentContext(BaseModel):
     available_tools: List[str] = Field(
         default_factory=list, description="利用可能ツール"
     )
+    tool_versions: Dict[str, str] = Field(
+        default_factory=dict, description="ツールのバージョン"
+    )
     environment_variables: Dict[str, str] = Field(
         default_factory=dict, description="環境変数"
     )
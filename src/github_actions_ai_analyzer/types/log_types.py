@@ -4,9 +4,10 @@
 GitHub Actionsのログエントリとログレベルを定義します。
 """
 
-from datetime import datetime
+from bisect import bisect_right
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -46,3 +47,172 @@ class LogEntry(BaseModel):
 
     class Config:
         use_enum_values = True
+
+
+class StepSpan(BaseModel):
+    """ステップ（またはグループ）の行範囲
+
+    ``##[group]`` と ``##[endgroup]`` の対応から求めます。トップレベルの
+    グループはステップの見出しで、ステップの出力はグループの終了後に
+    続くため、次のトップレベルのグループの直前までをステップとします。
+    入れ子のグループは ``##[endgroup]`` の行までです。
+    """
+
+    step_id: int = Field(..., description="ログ内での通し番号")
+    name: str = Field(..., description="グループ名")
+    depth: int = Field(default=0, description="入れ子の深さ（0はステップ）")
+    parent_id: Optional[int] = Field(
+        default=None, description="外側のグループのID"
+    )
+    start_line: int = Field(..., description="開始行（##[group] の行）")
+    end_line: Optional[int] = Field(
+        default=None, description="終了行（未確定の場合は None）"
+    )
+    group_end_line: Optional[int] = Field(
+        default=None,
+        description="##[endgroup] の行（閉じていない場合は None）",
+    )
+
+
+class StepIndex:
+    """ステップの範囲の区間インデックス
+
+    範囲の開始行の昇順リストを二分探索し、行が属するステップを
+    範囲の数に対して対数時間で求めます。入れ子のグループは
+    開始行の直前の範囲から外側へ親をたどって判定します。
+    """
+
+    def __init__(self, spans: Iterable[StepSpan]) -> None:
+        """初期化（spans は開始行順であればそのまま使用）"""
+        self.spans: List[StepSpan] = sorted(
+            spans, key=lambda span: span.start_line
+        )
+        self._starts = [span.start_line for span in self.spans]
+        self._by_id = {span.step_id: span for span in self.spans}
+
+    def span_at(self, line_number: int) -> Optional[StepSpan]:
+        """行が属する最も内側のグループ（どのステップにも属さない場合は None）"""
+        index = bisect_right(self._starts, line_number) - 1
+        span = self.spans[index] if index >= 0 else None
+        while span is not None:
+            if span.end_line is None or line_number <= span.end_line:
+                return span
+            span = (
+                self._by_id.get(span.parent_id)
+                if span.parent_id is not None
+                else None
+            )
+        return None
+
+    def step_at(self, line_number: int) -> Optional[StepSpan]:
+        """行が属するステップ（トップレベルの範囲）"""
+        return self._step_of(self.span_at(line_number))
+
+    def tag(self, record: "LogRecord") -> None:
+        """レコードに属するグループのIDとステップ名を付与
+
+        gh run view --log 形式の行（ジョブ名を持つレコード）は、
+        行に付いたステップ名をそのまま使用します。
+        """
+        span = self.span_at(record.line_number)
+        step = self._step_of(span)
+        if span is None or step is None:
+            return
+        record.step_id = span.step_id
+        if record.job_name is None:
+            record.step_name = step.name
+
+    def _step_of(self, span: Optional[StepSpan]) -> Optional[StepSpan]:
+        """グループを含むトップレベルの範囲"""
+        while span is not None and span.parent_id is not None:
+            span = self._by_id.get(span.parent_id)
+        return span
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+
+class LogRecord:
+    """処理途中のログエントリの軽量表現
+
+    検証やメタデータ辞書を持たないため、全行を保持する前処理と
+    パターンマッチングの間で使用します。レベルと発生源は列挙型の
+    メンバーを共有し、タイムスタンプはエポック秒で保持します。
+    解析結果に含める行のみ to_log_entry() で LogEntry に変換します。
+    """
+
+    __slots__ = (
+        "line_number",
+        "timestamp",
+        "level",
+        "source",
+        "message",
+        "step_name",
+        "action_name",
+        "step_id",
+        "job_name",
+    )
+
+    def __init__(
+        self,
+        line_number: int,
+        timestamp: Optional[float],
+        level: LogLevel,
+        source: LogSource,
+        message: str,
+        step_name: Optional[str] = None,
+        action_name: Optional[str] = None,
+        step_id: Optional[int] = None,
+        job_name: Optional[str] = None,
+    ) -> None:
+        """初期化"""
+        self.line_number = line_number
+        self.timestamp = timestamp
+        self.level = level
+        self.source = source
+        self.message = message
+        self.step_name = step_name
+        self.action_name = action_name
+        self.step_id = step_id
+        self.job_name = job_name
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """LogEntry.metadata と同じ形式のメタデータ"""
+        metadata: Dict[str, Any] = {"line_number": self.line_number}
+        if self.step_id is not None:
+            metadata["step_id"] = self.step_id
+        if self.job_name is not None:
+            metadata["job_name"] = self.job_name
+        return metadata
+
+    def to_log_entry(self) -> LogEntry:
+        """LogEntry に変換（タイムスタンプがない行は変換時刻を使用）"""
+        timestamp = (
+            datetime.fromtimestamp(self.timestamp, timezone.utc)
+            if self.timestamp is not None
+            else datetime.now()
+        )
+        return LogEntry(
+            timestamp=timestamp,
+            level=self.level,
+            source=self.source,
+            message=self.message,
+            step_name=self.step_name,
+            action_name=self.action_name,
+            metadata=self.metadata,
+        )
+
+    # プロセス間で受け渡す際は属性名を含めずに値だけを送る
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        return (
+            f"LogRecord(line_number={self.line_number}, "
+            f"level={self.level.value}, message={self.message!r})"
+        )
@@ -7,7 +7,9 @@
 from enum import Enum
 from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from .log_types import LogEntry
 
 
 class PatternCategory(str, Enum):
@@ -51,3 +53,19 @@ class PatternMatch(BaseModel):
     context: Dict[str, Any] = Field(
         default_factory=dict, description="マッチングコンテキスト"
     )
+    occurrences: int = Field(default=1, description="同じエラーの発生回数")
+    first_line: Optional[int] = Field(
+        default=None, description="同じエラーが最初に発生した行番号"
+    )
+    last_line: Optional[int] = Field(
+        default=None, description="同じエラーが最後に発生した行番号"
+    )
+
+    @field_validator("context", mode="after")
+    @classmethod
+    def _restore_log_entry(cls, value: Dict[str, Any]) -> Dict[str, Any]:
+        """JSONから復元した場合はログエントリをLogEntryに戻す"""
+        entry = value.get("log_entry")
+        if isinstance(entry, dict):
+            value["log_entry"] = LogEntry.model_validate(entry)
+        return value
@@ -0,0 +1,112 @@
+"""
+圧縮ログの読み込みのユニットテスト
+"""
+
+import gzip
+import lzma
+import sys
+
+import pytest
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.compression import (
+    detect_compression,
+    open_log_binary,
+)
+from github_actions_ai_analyzer.types import AnalysisState, LogLevel
+
+LOG_TEXT = "\n".join(
+    [
+        "2024-01-01T00:00:00.0000000Z ##[group]Run pip install",
+        "2024-01-01T00:00:00.0000000Z ##[endgroup]",
+        "Collecting requests",
+        "::debug::Process completed with exit code 1",
+        "error: ModuleNotFoundError: No module named 'foo'",
+        "Permission denied: '/usr/local/bin'",
+    ]
+)
+
+COMPRESSORS = {
+    "gzip": gzip.compress,
+    "xz": lzma.compress,
+}
+
+
+def _write(tmp_path, name, data):
+    """ファイルを作成してパスを返す"""
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestCompression:
+    """圧縮ログの読み込みのテストクラス"""
+
+    @pytest.mark.parametrize("compression", sorted(COMPRESSORS))
+    def test_detect_and_open(self, tmp_path, compression):
+        """マジックバイトから圧縮形式を判定し、伸長しながら読み込む"""
+        data = COMPRESSORS[compression](LOG_TEXT.encode())
+        path = _write(tmp_path, "run.log.bin", data)
+
+        assert detect_compression(path) == compression
+        with open_log_binary(path) as stream:
+            assert b"".join(stream) == LOG_TEXT.encode()
+
+    def test_plain_log(self, tmp_path):
+        """圧縮されていないログはそのまま読み込む"""
+        path = _write(tmp_path, "run.log", LOG_TEXT.encode())
+
+        assert detect_compression(path) is None
+        with open_log_binary(path) as stream:
+            assert stream.read() == LOG_TEXT.encode()
+
+    @pytest.mark.parametrize("compression", sorted(COMPRESSORS))
+    def test_analysis_matches_plain_log(self, tmp_path, compression):
+        """圧縮されたログの解析結果が圧縮前のログと一致"""
+        plain = _write(tmp_path, "run.log", LOG_TEXT.encode())
+        compressed = _write(
+            tmp_path,
+            f"run.log.{compression}",
+            COMPRESSORS[compression](LOG_TEXT.encode()),
+        )
+        analyzer = GitHubActionsAnalyzer()
+
+        def summarize(path):
+            matches, stats, spans = analyzer._match_log_file(
+                path, LogLevel.WARNING, jobs=1
+            )
+            return (
+                [
+                    (m.pattern.id, m.context["log_entry"].line_number)
+                    for m in matches
+                ],
+                stats,
+                spans,
+            )
+
+        assert summarize(compressed) == summarize(plain)
+        with open_log_binary(compressed) as stream:
+            assert stream.read() == LOG_TEXT.encode()
+
+        with pytest.raises(ValueError):
+            analyzer.analyze_log_file(
+                compressed, contexts=(), state=AnalysisState()
+            )
+
+    def test_zstd(self, tmp_path):
+        """zstd 圧縮のログ（zstandard がある場合）"""
+        zstandard = pytest.importorskip("zstandard")
+        data = zstandard.ZstdCompressor().compress(LOG_TEXT.encode())
+        path = _write(tmp_path, "run.log.zst", data)
+
+        assert detect_compression(path) == "zstd"
+        with open_log_binary(path) as stream:
+            assert stream.read() == LOG_TEXT.encode()
+
+    def test_zstd_without_zstandard(self, tmp_path, monkeypatch):
+        """zstandard がない場合はインストール方法を示す"""
+        monkeypatch.setitem(sys.modules, "zstandard", None)
+        path = _write(tmp_path, "run.log.zst", b"\x28\xb5\x2f\xfd" + b"\0" * 8)
+
+        with pytest.raises(ImportError, match="zstandard"):
+            open_log_binary(path)
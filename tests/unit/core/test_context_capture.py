@@ -0,0 +1,186 @@
+"""
+前後の行の取得のユニットテスト
+"""
+
+import gzip
+
+import pytest
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.context_capture import (
+    CONTEXT_AFTER_KEY,
+    CONTEXT_BEFORE_KEY,
+    ContextCapture,
+)
+from github_actions_ai_analyzer.core.parallel import match_log_file_parallel
+from github_actions_ai_analyzer.types import AnalysisState, LogLevel
+
+LINES = [
+    "Collecting requests",
+    "::debug::resolving",
+    "error: ModuleNotFoundError: No module named 'foo'",
+    "info: retrying",
+    "##[command]pip install foo",
+    "Collecting bar",
+]
+
+
+def _write_log(tmp_path, lines, name="run.log"):
+    """ログファイルを作成してパスを返す"""
+    log_file = tmp_path / name
+    log_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(log_file)
+
+
+def _contexts(matches):
+    """(行番号, 前の行, 後の行) の一覧"""
+    return [
+        (
+            m.context["log_entry"].metadata["line_number"],
+            m.context[CONTEXT_BEFORE_KEY],
+            m.context[CONTEXT_AFTER_KEY],
+        )
+        for m in matches
+    ]
+
+
+class TestContextCapture:
+    """ContextCaptureのテストクラス"""
+
+    def test_windows_include_skipped_lines(self, tmp_path):
+        """ノイズ行や最小レベル未満の行も前後の行に含める"""
+        analyzer = GitHubActionsAnalyzer(context_lines=(2, 2))
+
+        matches, _, _ = analyzer._match_log_file(
+            _write_log(tmp_path, LINES), LogLevel.WARNING, jobs=1
+        )
+
+        assert _contexts(matches) == [
+            (3, LINES[0:2], LINES[3:5]),
+        ]
+
+    def test_windows_at_file_edges(self, tmp_path):
+        """ファイルの先頭・末尾では取得できる行のみを付与する"""
+        lines = [
+            "error: ModuleNotFoundError: No module named 'first'",
+            "middle",
+            "error: ModuleNotFoundError: No module named 'last'",
+        ]
+        analyzer = GitHubActionsAnalyzer(context_lines=(3, 3))
+
+        matches, _, _ = analyzer._match_log_file(
+            _write_log(tmp_path, lines), LogLevel.WARNING, jobs=1
+        )
+
+        assert _contexts(matches) == [
+            (1, [], lines[1:]),
+            (3, lines[:2], []),
+        ]
+
+    def test_overlapping_windows(self):
+        """近接するマッチの前後の行が重なる場合も、それぞれに付与する"""
+        capture = ContextCapture(before=1, after=2)
+        first: dict = {}
+        second: dict = {}
+
+        class _Match:
+            def __init__(self, context):
+                self.context = context
+
+        capture.push(1, b"a")
+        capture.push(2, b"err1")
+        capture.capture(2, [_Match(first)])
+        capture.push(3, b"err2")
+        capture.capture(3, [_Match(second)])
+        capture.push(4, b"b")
+        capture.push(5, b"c")
+
+        assert (first[CONTEXT_BEFORE_KEY], first[CONTEXT_AFTER_KEY]) == (
+            ["a"],
+            ["err2", "b"],
+        )
+        assert (second[CONTEXT_BEFORE_KEY], second[CONTEXT_AFTER_KEY]) == (
+            ["err1"],
+            ["b", "c"],
+        )
+        assert not capture.pending
+
+    def test_disabled_by_default(self, tmp_path):
+        """既定では前後の行を付与しない"""
+        analyzer = GitHubActionsAnalyzer()
+
+        matches, _, _ = analyzer._match_log_file(
+            _write_log(tmp_path, LINES), LogLevel.WARNING, jobs=1
+        )
+
+        assert matches
+        assert all(CONTEXT_BEFORE_KEY not in m.context for m in matches)
+
+    def test_parallel_matches_serial(self, tmp_path):
+        """範囲の境界をまたぐ前後の行も逐次処理と一致"""
+        lines = []
+        for i in range(300):
+            lines.append(f"Collecting package-{i}")
+            if i % 9 == 0:
+                lines.append(
+                    f"error: ModuleNotFoundError: No module named 'm{i}'"
+                )
+            if i % 13 == 0:
+                lines.append("::debug::Process completed with exit code 1")
+        log_file_path = _write_log(tmp_path, lines)
+        analyzer = GitHubActionsAnalyzer(context_lines=(3, 4))
+
+        expected, _, _ = analyzer._match_log_file(
+            log_file_path, LogLevel.WARNING, jobs=1
+        )
+        actual, _, _ = match_log_file_parallel(
+            analyzer.log_processor,
+            analyzer.pattern_matcher,
+            log_file_path,
+            LogLevel.WARNING,
+            jobs=4,
+        )
+
+        assert _contexts(actual) == _contexts(expected)
+        assert all(
+            len(before) == 3 and len(after) == 4
+            for _, before, after in _contexts(expected)[1:-1]
+        )
+
+    def test_compressed_log(self, tmp_path):
+        """圧縮されたログでも同じ前後の行を付与する"""
+        plain = _write_log(tmp_path, LINES)
+        compressed = tmp_path / "run.log.gz"
+        with open(plain, "rb") as f:
+            compressed.write_bytes(gzip.compress(f.read()))
+        analyzer = GitHubActionsAnalyzer(context_lines=(2, 2))
+
+        def contexts(path):
+            matches, _, _ = analyzer._match_log_file(
+                path, LogLevel.WARNING, jobs=1
+            )
+            return _contexts(matches)
+
+        assert contexts(str(compressed)) == contexts(plain)
+
+    @pytest.mark.parametrize("partial", [False, True])
+    def test_incremental_uses_previous_lines(self, tmp_path, partial):
+        """追記部分の解析でも前回までの行を前の行として付与する"""
+        log_file = tmp_path / "run.log"
+        head = "\n".join(LINES[:2]) + "\n"
+        error_line = LINES[2] + "\n"
+        split = 10 if partial else 0
+        log_file.write_text(head + error_line[:split], encoding="utf-8")
+        analyzer = GitHubActionsAnalyzer(context_lines=(2, 1))
+
+        state = analyzer.analyze_log_file(
+            str(log_file), contexts=(), state=AnalysisState()
+        ).state
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(error_line[split:] + LINES[3] + "\n")
+        result = analyzer.analyze_log_file(
+            str(log_file), contexts=(), state=state
+        )
+
+        matches = [m for a in result.error_analyses for m in a.pattern_matches]
+        assert _contexts(matches) == [(3, LINES[0:2], LINES[3:4])]
@@ -442,3 +442,67 @@ pytest==7.0.0
 
         result = self.collector._is_tool_available("nonexistent_tool")
         assert result is False
+
+    def test_detect_available_tools_uses_path_lookup(self):
+        """ツール検出はPATH探索のみでサブプロセスを起動しない"""
+        which = (
+            "github_actions_ai_analyzer.core.context_collector.shutil.which"
+        )
+        with (
+            patch(
+                which,
+                side_effect=lambda tool: (
+                    f"/usr/bin/{tool}" if tool in ("git", "python") else None
+                ),
+            ),
+            patch("subprocess.run") as mock_run,
+        ):
+            tools = self.collector._detect_available_tools()
+
+        assert tools == ["git", "python"]
+        mock_run.assert_not_called()
+
+    def test_collect_environment_context_without_probe(self):
+        """既定ではバージョンを取得しない"""
+        with patch("subprocess.run") as mock_run:
+            context = self.collector.collect_environment_context()
+
+        mock_run.assert_not_called()
+        assert context.tool_versions == {}
+
+    @patch("subprocess.run")
+    def test_probe_tool_versions_cached_on_disk(self, mock_run, tmp_path):
+        """バージョン取得結果はディスクにキャッシュされる"""
+        mock_run.return_value = Mock(
+            returncode=0, stdout="tool 1.2.3\nextra", stderr=""
+        )
+        collector = ContextCollector(
+            probe_versions=True, cache_dir=str(tmp_path)
+        )
+
+        with patch.object(
+            collector, "_tool_cache_key", return_value="same-key"
+        ):
+            first = collector._probe_tool_versions(["git", "python"])
+            assert mock_run.call_count == 2
+
+            # 別インスタンスでも同じキーならサブプロセスを起動しない
+            other = ContextCollector(
+                probe_versions=True, cache_dir=str(tmp_path)
+            )
+            with patch.object(
+                other, "_tool_cache_key", return_value="same-key"
+            ):
+                second = other._probe_tool_versions(["git", "python"])
+
+        assert mock_run.call_count == 2
+        assert first == second == {"git": "tool 1.2.3", "python": "tool 1.2.3"}
+
+    def test_tool_cache_key_changes_with_path(self):
+        """PATHが変わるとキャッシュキーも変わる"""
+        with patch.dict(os.environ, {"PATH": "/usr/bin"}):
+            key1 = self.collector._tool_cache_key([])
+        with patch.dict(os.environ, {"PATH": "/opt/bin:/usr/bin"}):
+            key2 = self.collector._tool_cache_key([])
+
+        assert key1 != key2
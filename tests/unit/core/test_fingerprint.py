@@ -0,0 +1,129 @@
+"""
+エラーメッセージのフィンガープリントのユニットテスト
+"""
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.fingerprint import (
+    collapse_duplicates,
+    message_fingerprint,
+)
+from github_actions_ai_analyzer.types import AnalysisState, LogLevel
+
+
+def _write_log(tmp_path, repeat=50):
+    """同じエラーを繰り返すログファイルを作成"""
+    lines = []
+    for i in range(repeat):
+        lines.append(f"Run attempt {i}")
+        lines.append(
+            f"2024-01-01T00:00:{i % 60:02d}.0000000Z "
+            "error: ModuleNotFoundError: "
+            f"No module named 'foo' (attempt {i})"
+        )
+    lines.append("error: ModuleNotFoundError: No module named 'bar'")
+    log_file = tmp_path / "run.log"
+    log_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(log_file)
+
+
+class TestMessageFingerprint:
+    """message_fingerprintのテストクラス"""
+
+    def test_normalizes_variable_parts(self):
+        """タイムスタンプ・ID・パス・数値の違いは同じフィンガープリント"""
+        first = message_fingerprint(
+            "2024-01-01T00:00:01.123Z AssertionError"
+            " at /home/runner/work/a.py:12 (run 3f2a9c81e, 0x1f)"
+        )
+        second = message_fingerprint(
+            "2024-02-03T10:20:30.456Z AssertionError at /tmp/build/b.py:345"
+            " (run 9d00beef1, 0xffff)"
+        )
+
+        assert first == second
+        assert first == (
+            "<timestamp> AssertionError at <path>:<number> (run <hex>, <hex>)"
+        )
+
+    def test_keeps_distinct_messages(self):
+        """可変部分以外が異なるメッセージは区別する"""
+        assert message_fingerprint(
+            "No module named 'foo'"
+        ) != message_fingerprint("No module named 'bar'")
+        assert message_fingerprint("added 12 packages") == (
+            "added <number> packages"
+        )
+
+
+class TestCollapseDuplicates:
+    """collapse_duplicatesのテストクラス"""
+
+    def test_collapses_repeated_errors(self, tmp_path):
+        """繰り返し発生したエラーを発生回数と最初・最後の行を持つマッチにまとめる"""
+        analyzer = GitHubActionsAnalyzer()
+
+        result = analyzer.analyze_log_file(
+            _write_log(tmp_path), min_log_level=LogLevel.WARNING, contexts=()
+        )
+
+        matches = [m for a in result.error_analyses for m in a.pattern_matches]
+        assert [
+            (m.matched_text, m.occurrences, m.first_line, m.last_line)
+            for m in matches
+        ] == [
+            ("ModuleNotFoundError: No module named 'foo'", 50, 2, 100),
+            ("ModuleNotFoundError: No module named 'bar'", 1, 101, 101),
+        ]
+        assert len(result.solution_proposals) == 2
+        assert "dependency: 51個" in result.summary
+
+    def test_disabled(self, tmp_path):
+        """collapse_repeated=False ではすべてのマッチを残す"""
+        analyzer = GitHubActionsAnalyzer(collapse_repeated=False)
+
+        result = analyzer.analyze_log_file(
+            _write_log(tmp_path), min_log_level=LogLevel.WARNING, contexts=()
+        )
+
+        matches = [m for a in result.error_analyses for m in a.pattern_matches]
+        assert len(matches) == 51
+        assert all(m.occurrences == 1 for m in matches)
+        assert "dependency: 51個" in result.summary
+
+    def test_recollapse_adds_occurrences(self, tmp_path):
+        """まとめ済みのマッチを再度まとめても発生回数を重複して数えない"""
+        analyzer = GitHubActionsAnalyzer()
+        matches, _, _ = analyzer._match_log_file(
+            _write_log(tmp_path, repeat=4), LogLevel.WARNING, jobs=1
+        )
+
+        collapsed = collapse_duplicates(matches)
+        again = collapse_duplicates(collapsed[:1] + matches[:2])
+
+        assert [m.occurrences for m in collapsed] == [4, 1]
+        assert (again[0].occurrences, again[0].first_line) == (6, 2)
+        # 元のマッチは変更しない
+        assert all(m.occurrences == 1 for m in matches)
+        assert all(m.first_line is None for m in matches)
+
+    def test_incremental_state_round_trip(self, tmp_path):
+        """まとめられたマッチを含む状態もシリアライズして復元できる"""
+        analyzer = GitHubActionsAnalyzer()
+        log_file_path = _write_log(tmp_path, repeat=5)
+
+        result = analyzer.analyze_log_file(
+            log_file_path, contexts=(), state=AnalysisState()
+        )
+        restored = AnalysisState.model_validate_json(
+            result.state.model_dump_json()
+        )
+
+        assert len(restored.all_matches()) == 6
+        resumed = analyzer.analyze_log_file(
+            log_file_path, contexts=(), state=restored
+        )
+        assert [
+            m.occurrences
+            for a in resumed.error_analyses
+            for m in a.pattern_matches
+        ] == [5, 1]
@@ -0,0 +1,201 @@
+"""
+gh run view --log 形式のユニットテスト
+"""
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.gh_log import job_ranges, split_gh_prefix
+from github_actions_ai_analyzer.core.log_processor import LogProcessor
+from github_actions_ai_analyzer.core.parallel import match_log_file_parallel
+from github_actions_ai_analyzer.types import LogLevel
+
+TS = "2024-01-01T00:00:00.0000000Z "
+
+
+def _gh_lines(job, step, bodies):
+    """gh run view --log 形式の行を作成（ステップの先頭行にはBOMが付く）"""
+    return [
+        f"{job}\t{step}\t{'﻿' if i == 0 else ''}{TS}{body}"
+        for i, body in enumerate(bodies)
+    ]
+
+
+def _write_gh_log(tmp_path):
+    """2つのジョブを含むログファイルを作成（gh_log_collectorのヘッダー付き）"""
+    lines = ["# GitHub Actions Log", "# Run ID: 1", ""]
+    lines += _gh_lines(
+        "build",
+        "Set up job",
+        ["##[group]Run actions/checkout@v4", "##[endgroup]", "ok"],
+    )
+    lines += _gh_lines(
+        "build",
+        "Install",
+        [
+            "##[group]Run pip install -r requirements.txt",
+            "##[endgroup]",
+            "error: ModuleNotFoundError: No module named 'foo'",
+        ],
+    )
+    lines += _gh_lines(
+        "test (3.12)",
+        "Run pytest",
+        [
+            "##[group]Run pytest",
+            "##[endgroup]",
+            "error: ModuleNotFoundError: No module named 'bar'",
+            "Process completed with exit code 1",
+        ],
+    )
+    log_file = tmp_path / "run.log"
+    log_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(log_file)
+
+
+class TestSplitGhPrefix:
+    """split_gh_prefixのテストクラス"""
+
+    def test_prefix_is_split(self):
+        """ジョブ名・ステップ名を分離し、BOMを除去"""
+        line = f"test (3.12)\tRun pytest\t﻿{TS}error: boom"
+
+        assert split_gh_prefix(line) == (
+            "test (3.12)",
+            "Run pytest",
+            f"{TS}error: boom",
+        )
+
+    def test_non_gh_lines(self):
+        """タイムスタンプが続かない行は gh run view --log 形式ではない"""
+        assert split_gh_prefix(f"{TS}error: boom") is None
+        assert split_gh_prefix("a\tb\tc") is None
+        assert split_gh_prefix("key\tvalue") is None
+
+
+class TestGhLog:
+    """gh run view --log 形式のログ処理のテストクラス"""
+
+    def test_job_ranges(self, tmp_path):
+        """ヘッダーを除き、ジョブごとのバイト範囲に分割"""
+        log_file_path = _write_gh_log(tmp_path)
+        with open(log_file_path, "rb") as f:
+            data = f.read()
+
+        ranges = job_ranges(log_file_path)
+
+        assert [job.name for job in ranges] == ["build", "test (3.12)"]
+        assert data[: ranges[0].start].startswith(b"# GitHub")
+        assert ranges[0].end == ranges[1].start
+        assert ranges[1].end == len(data)
+        start, end = ranges[1].start, ranges[1].end
+        assert data[start:end].count(b"\n") == 4
+
+    def test_plain_log_has_no_job_ranges(self, tmp_path):
+        """通常のログはジョブに分割しない"""
+        log_file = tmp_path / "plain.log"
+        log_file.write_text(f"{TS}error: boom\n", encoding="utf-8")
+
+        assert job_ranges(str(log_file)) == []
+
+    def test_records_are_tagged_with_job_and_step(self):
+        """レコードに行のジョブ名・ステップ名を付与し、メッセージから除去"""
+        processor = LogProcessor()
+        lines = _gh_lines(
+            "build",
+            "Install",
+            [
+                "##[group]Run pip install",
+                "##[endgroup]",
+                "error: ModuleNotFoundError: No module named 'foo'",
+            ],
+        )
+
+        entries = processor.process_log_file("\n".join(lines))
+
+        assert len(entries) == 1
+        assert entries[0].message == (
+            "error: ModuleNotFoundError: No module named 'foo'"
+        )
+        assert entries[0].step_name == "Install"
+        assert entries[0].metadata["job_name"] == "build"
+        assert entries[0].metadata["step_id"] == 0
+
+    def test_analyses_are_grouped_by_job(self, tmp_path):
+        """同じパターンでもジョブごとにエラー解析結果を分ける"""
+        log_file_path = _write_gh_log(tmp_path)
+        analyzer = GitHubActionsAnalyzer()
+
+        result = analyzer.analyze_log_file(log_file_path, contexts=())
+
+        by_job = result.analyses_by_job()
+        assert list(by_job) == ["build", "test (3.12)"]
+        assert by_job["build"][0].affected_steps == ["Install"]
+        assert by_job["test (3.12)"][0].affected_steps == ["Run pytest"]
+        assert "build" in by_job["build"][0].error_id
+
+    def test_parallel_fans_out_by_job(self, tmp_path):
+        """ジョブごとの並列処理の結果が逐次処理と一致"""
+        log_file_path = _write_gh_log(tmp_path)
+        analyzer = GitHubActionsAnalyzer()
+
+        def summarize(matches):
+            return [
+                (
+                    m.pattern.id,
+                    m.context["log_entry"].line_number,
+                    m.context["log_entry"].job_name,
+                    m.context["log_entry"].step_name,
+                    m.context["log_entry"].step_id,
+                )
+                for m in matches
+            ]
+
+        expected = analyzer._match_log_file(
+            log_file_path, LogLevel.WARNING, jobs=1
+        )
+        actual = match_log_file_parallel(
+            analyzer.log_processor,
+            analyzer.pattern_matcher,
+            log_file_path,
+            LogLevel.WARNING,
+            jobs=2,
+        )
+
+        assert summarize(actual[0]) == summarize(expected[0])
+        assert actual[1:] == expected[1:]
+        assert [s.name for s in actual[2]] == [
+            "Run actions/checkout@v4",
+            "Run pip install -r requirements.txt",
+            "Run pytest",
+        ]
+
+    def test_multi_pattern_lines_in_several_jobs(self, tmp_path):
+        """複数のパターンがマッチした行も、ジョブ数によらず同じ行番号"""
+        lines = []
+        for job in ("lint", "build", "test"):
+            lines += _gh_lines(
+                job,
+                "Run checks",
+                [
+                    "##[group]Run checks",
+                    "##[endgroup]",
+                    "Collecting requests",
+                    "coverage run failed",
+                    "done",
+                ],
+            )
+        log_file = tmp_path / "run.log"
+        log_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        analyzer = GitHubActionsAnalyzer()
+
+        def line_numbers(jobs):
+            matches, _, _ = analyzer._match_log_file(
+                str(log_file), LogLevel.WARNING, jobs=jobs
+            )
+            return sorted(
+                (m.context["log_entry"].line_number, m.pattern.id)
+                for m in matches
+            )
+
+        expected = line_numbers(1)
+        assert line_numbers(3) == expected
+        assert sorted({line for line, _ in expected}) == [4, 9, 14]
@@ -0,0 +1,150 @@
+"""
+増分解析のユニットテスト
+"""
+
+import pytest
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.incremental import advance_state
+from github_actions_ai_analyzer.types import AnalysisState, LogEntry, LogLevel
+
+ERROR_LINE = "error: ModuleNotFoundError: No module named '{}'\n"
+
+
+def _line_numbers(result):
+    """解析結果に含まれるマッチの (パターンID, 行番号) の一覧"""
+    return sorted(
+        (m.pattern.id, m.context["log_entry"].metadata["line_number"])
+        for a in result.error_analyses
+        for m in a.pattern_matches
+    )
+
+
+class TestIncrementalAnalysis:
+    """AnalysisStateを使った増分解析のテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.analyzer = GitHubActionsAnalyzer()
+
+    def _analyze(self, log_file, state):
+        return self.analyzer.analyze_log_file(
+            str(log_file), contexts=(), state=state
+        )
+
+    def test_resume_matches_full_analysis(self, tmp_path):
+        """追記部分だけを解析した結果が全体の解析と一致"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(
+            "setup\n" + ERROR_LINE.format("a"), encoding="utf-8"
+        )
+
+        first = self._analyze(log_file, AnalysisState())
+        assert first.state.offset == log_file.stat().st_size
+        assert first.state.line_count == 2
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("::debug::noise\n" + ERROR_LINE.format("b"))
+        resumed = self._analyze(log_file, first.state)
+
+        full = self.analyzer.analyze_log_file(str(log_file), contexts=())
+        assert _line_numbers(resumed) == _line_numbers(full)
+        assert _line_numbers(full) == [
+            ("dep_missing_package", 2),
+            ("dep_missing_package", 4),
+        ]
+        # 2回目は追記された2行のうちノイズ以外の1行のみを処理する
+        assert resumed.state.match_stats["lines"] == 2
+
+    def test_partial_line_is_joined(self, tmp_path):
+        """書き込み途中の行は次回に追記部分と連結して解析"""
+        log_file = tmp_path / "run.log"
+        line = ERROR_LINE.format("a")
+        log_file.write_text("setup\n" + line[:15], encoding="utf-8")
+
+        state = self._analyze(log_file, AnalysisState()).state
+        assert state.partial_line == line[:15].encode()
+        assert state.line_count == 1
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(line[15:] + "done\n")
+        result = self._analyze(log_file, state)
+
+        assert _line_numbers(result) == [("dep_missing_package", 2)]
+        assert result.state.partial_line == b""
+        assert result.state.line_count == 3
+
+    def test_replaced_file_restarts(self, tmp_path):
+        """先頭の内容が変わったファイルは最初から解析し直す"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(
+            "first run\n" + ERROR_LINE.format("a"), encoding="utf-8"
+        )
+        state = self._analyze(log_file, AnalysisState()).state
+
+        log_file.write_text(
+            "other run\n" + ERROR_LINE.format("b") + "more output\n",
+            encoding="utf-8",
+        )
+        result = self._analyze(log_file, state)
+
+        messages = [
+            m.matched_text
+            for a in result.error_analyses
+            for m in a.pattern_matches
+        ]
+        assert messages == ["ModuleNotFoundError: No module named 'b'"]
+
+    def test_min_level_change_restarts(self, tmp_path):
+        """最小ログレベルが変わった場合は最初から解析し直す"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(ERROR_LINE.format("a"), encoding="utf-8")
+        processor = self.analyzer.log_processor
+        matcher = self.analyzer.pattern_matcher
+
+        state = AnalysisState()
+        advance_state(processor, matcher, str(log_file), LogLevel.FATAL, state)
+        assert state.min_log_level == LogLevel.FATAL
+
+        matches = advance_state(
+            processor, matcher, str(log_file), LogLevel.WARNING, state
+        )
+        assert [m.pattern.id for m in matches] == ["dep_missing_package"]
+
+    @pytest.mark.parametrize(
+        "partial",
+        [
+            "partial é".encode("utf-8"),
+            # base64の標準とURLセーフで表現が異なるバイト列
+            b"2024-01-01 Running tests??? ",
+            b"Running <tests>>> ",
+            # 上位ビットのバイトと途中で切れたマルチバイト文字
+            b"\xfb\xff\xfe partial \xe3\x81",
+        ],
+    )
+    def test_state_json_round_trip(self, tmp_path, partial):
+        """状態をJSONで保存して再開できる"""
+        log_file = tmp_path / "run.log"
+        line = ERROR_LINE.format("a")
+        log_file.write_bytes(line.encode("utf-8") + partial)
+
+        state = self._analyze(log_file, AnalysisState()).state
+        # 結果をシリアライズしても状態は含まれない
+        assert "state" not in self._analyze(log_file, state).model_dump()
+
+        assert state.partial_line == partial
+        restored = AnalysisState.model_validate_json(state.model_dump_json())
+        assert restored.partial_line == partial
+        entry = restored.pattern_matches["dep_missing_package"][0].context[
+            "log_entry"
+        ]
+        assert isinstance(entry, LogEntry)
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("\n" + ERROR_LINE.format("b"))
+        result = self._analyze(log_file, restored)
+
+        assert _line_numbers(result) == [
+            ("dep_missing_package", 1),
+            ("dep_missing_package", 3),
+        ]
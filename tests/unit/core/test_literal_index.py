@@ -0,0 +1,88 @@
+"""
+LiteralIndexのユニットテスト
+"""
+
+from github_actions_ai_analyzer.core.literal_index import (
+    LiteralIndex,
+    extract_required_literals,
+)
+from github_actions_ai_analyzer.types import ErrorPattern, PatternCategory
+
+
+def _pattern(pattern_id: str, regex_pattern: str) -> ErrorPattern:
+    """テスト用のパターンを作成"""
+    return ErrorPattern(
+        id=pattern_id,
+        name=pattern_id,
+        category=PatternCategory.ENVIRONMENT,
+        regex_pattern=regex_pattern,
+        description="test",
+        severity="error",
+    )
+
+
+class TestExtractRequiredLiterals:
+    """extract_required_literalsのテストクラス"""
+
+    def test_plain_literal(self):
+        """単純なリテラル"""
+        assert extract_required_literals(r"QApplication creation failed") == [
+            "qapplication creation failed"
+        ]
+
+    def test_alternation(self):
+        """トップレベルの選択肢ごとにリテラルを抽出"""
+        assert extract_required_literals(
+            r"Connection refused|ECONNREFUSED"
+        ) == ["connection refused", "econnrefused"]
+
+    def test_groups_and_classes_split_literals(self):
+        """グループや文字クラスはリテラルの区切りになる"""
+        assert extract_required_literals(
+            r"ModuleNotFoundError: No module named '([^']+)'"
+        ) == ["modulenotfounderror: no module named '"]
+        assert extract_required_literals(r"(ab|cd){2,3}xyz") == ["xyz"]
+
+    def test_quantified_characters_excluded(self):
+        """任意化された文字はリテラルに含めない"""
+        assert extract_required_literals(r"colou?r error") == ["r error"]
+        assert extract_required_literals(r"\d+ failed\.") == [" failed."]
+
+    def test_no_literal(self):
+        """リテラルを抽出できない場合はNone"""
+        assert extract_required_literals(r"\d+\s+\w+") is None
+        assert extract_required_literals(r"foo.*|ab") is None
+        assert extract_required_literals(r"(?x) foo bar") is None
+
+    def test_multi_character_escapes(self):
+        """後続の文字まで続くエスケープを含む選択肢はリテラルを抽出しない"""
+        assert extract_required_literals(r"\x41BCDEF") is None
+        assert extract_required_literals(r"\101rror code") is None
+        assert extract_required_literals(r"\N{DIGIT ONE} failed") is None
+        assert extract_required_literals(r"timeout|\u0041BCDEF") is None
+        assert extract_required_literals(r"\n\tfailed") == ["failed"]
+
+
+class TestLiteralIndex:
+    """LiteralIndexのテストクラス"""
+
+    def test_candidates(self):
+        """行に含まれるリテラルからパターンを絞り込む"""
+        index = LiteralIndex(
+            [
+                _pattern("npm", r"npm ERR!.*install"),
+                _pattern("refused", r"Connection refused|ECONNREFUSED"),
+                _pattern("digits", r"\d+"),
+            ]
+        )
+
+        assert index.candidates("connect ECONNREFUSED 127.0.0.1") == {
+            "refused",
+            "digits",
+        }
+        assert index.candidates("all good") == {"digits"}
+
+    def test_non_ascii_line_runs_all_patterns(self):
+        """非ASCIIの行は絞り込まない"""
+        index = LiteralIndex([_pattern("npm", r"npm ERR!")])
+        assert index.candidates("ビルド失敗 npm ERR!") is None
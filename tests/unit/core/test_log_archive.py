@@ -0,0 +1,144 @@
+"""
+ログアーカイブのユニットテスト
+"""
+
+import zipfile
+
+import pytest
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.log_archive import (
+    archive_members,
+    is_log_archive,
+)
+from github_actions_ai_analyzer.core.parallel import match_archive
+from github_actions_ai_analyzer.types import AnalysisState, LogLevel
+
+TS = "2024-01-01T00:00:00.0000000Z "
+
+BUILD_SETUP = [TS + "Current runner version: '2.317.0'"]
+BUILD_INSTALL = [
+    TS + "##[group]Run pip install -r requirements.txt",
+    TS + "##[endgroup]",
+    TS + "error: ModuleNotFoundError: No module named 'foo'",
+]
+TEST_JOB = [
+    TS + "##[group]Run pytest",
+    TS + "##[endgroup]",
+    TS + "error: ModuleNotFoundError: No module named 'bar'",
+]
+
+
+def _write_archive(tmp_path):
+    """GitHubのログアーカイブと同じ構成のZIPを作成"""
+    archive_path = tmp_path / "logs.zip"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        # ジョブ全体のログ（ステップごとのログがある build では使わない）
+        archive.writestr(
+            "0_build.txt", "\n".join(BUILD_SETUP + BUILD_INSTALL) + "\n"
+        )
+        archive.writestr("1_test.txt", "\n".join(TEST_JOB))
+        archive.writestr(
+            "build/2_Install dependencies.txt", "\n".join(BUILD_INSTALL) + "\n"
+        )
+        archive.writestr("build/1_Set up job.txt", "\n".join(BUILD_SETUP))
+    return str(archive_path)
+
+
+class TestLogArchive:
+    """ログアーカイブのテストクラス"""
+
+    def test_members_follow_layout(self, tmp_path):
+        """ディレクトリ構成からジョブ名・ステップ名を求め、実行順に並べる"""
+        archive_path = _write_archive(tmp_path)
+
+        members = archive_members(archive_path)
+
+        assert [(m.job_name, m.step_name) for m in members] == [
+            ("build", "Set up job"),
+            ("build", "Install dependencies"),
+            ("test", None),
+        ]
+        assert is_log_archive(archive_path)
+
+    def test_plain_log_is_not_archive(self, tmp_path):
+        """通常のログファイルはアーカイブではない"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(TS + "error: boom\n", encoding="utf-8")
+
+        assert not is_log_archive(str(log_file))
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_matches_concatenated_log(self, tmp_path, jobs):
+        """メンバーを連結したログと同じ行番号・ステップの範囲でマッチ"""
+        archive_path = _write_archive(tmp_path)
+        log_file = tmp_path / "run.log"
+        log_file.write_text(
+            "\n".join(BUILD_SETUP + BUILD_INSTALL + TEST_JOB),
+            encoding="utf-8",
+        )
+        analyzer = GitHubActionsAnalyzer()
+
+        matches, stats, spans = match_archive(
+            analyzer.log_processor,
+            analyzer.pattern_matcher,
+            archive_path,
+            LogLevel.WARNING,
+            jobs,
+        )
+        expected = analyzer._match_log_file(
+            str(log_file), LogLevel.WARNING, jobs=1
+        )
+
+        def line_numbers(found):
+            return [m.context["log_entry"].line_number for m in found]
+
+        assert line_numbers(matches) == line_numbers(expected[0]) == [4, 7]
+        assert stats == expected[1]
+        assert spans == expected[2]
+        assert [
+            (m.context["log_entry"].job_name, m.context["log_entry"].step_name)
+            for m in matches
+        ] == [("build", "Install dependencies"), ("test", "Run pytest")]
+
+    def test_analyze_archive(self, tmp_path):
+        """アーカイブを直接解析し、ジョブごとにエラー解析結果をまとめる"""
+        archive_path = _write_archive(tmp_path)
+        analyzer = GitHubActionsAnalyzer()
+
+        result = analyzer.analyze_log_file(archive_path, contexts=())
+
+        by_job = result.analyses_by_job()
+        assert list(by_job) == ["build", "test"]
+        assert by_job["build"][0].affected_steps == ["Install dependencies"]
+
+        with pytest.raises(ValueError):
+            analyzer.analyze_log_file(
+                archive_path, contexts=(), state=AnalysisState()
+            )
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_multi_pattern_lines_in_later_members(self, tmp_path, jobs):
+        """複数のパターンがマッチした行も連結したログと同じ行番号"""
+        member = [TS + "Collecting requests", TS + "coverage run failed"]
+        archive_path = tmp_path / "logs.zip"
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for number, job in enumerate(["lint", "build", "test", "docs"]):
+                archive.writestr(f"{number}_{job}.txt", "\n".join(member))
+        analyzer = GitHubActionsAnalyzer()
+
+        matches, _, _ = match_archive(
+            analyzer.log_processor,
+            analyzer.pattern_matcher,
+            str(archive_path),
+            LogLevel.WARNING,
+            jobs,
+        )
+
+        assert sorted(
+            (m.context["log_entry"].line_number, m.pattern.id) for m in matches
+        ) == [
+            (line, pattern_id)
+            for line in (2, 4, 6, 8)
+            for pattern_id in ("coverage_failure", "test_failure")
+        ]
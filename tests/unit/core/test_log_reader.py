@@ -0,0 +1,94 @@
+"""
+ログリーダーのユニットテスト
+"""
+
+import re
+
+from github_actions_ai_analyzer.core.log_reader import (
+    count_lines,
+    iter_mmap_lines,
+    line_aligned_ranges,
+)
+
+
+class TestIterMmapLines:
+    """iter_mmap_linesのテストクラス"""
+
+    def test_empty_file(self, tmp_path):
+        """空のファイル"""
+        log_file = tmp_path / "empty.log"
+        log_file.write_bytes(b"")
+
+        assert list(iter_mmap_lines(str(log_file))) == []
+
+    def test_lines_with_line_numbers(self, tmp_path):
+        """行番号付きで全行を返す"""
+        log_file = tmp_path / "run.log"
+        log_file.write_bytes(b"first\r\nsecond\n\nlast")
+
+        assert list(iter_mmap_lines(str(log_file))) == [
+            (1, "first"),
+            (2, "second"),
+            (3, ""),
+            (4, "last"),
+        ]
+
+    def test_skip_and_require_regex(self, tmp_path):
+        """条件に合わない行はデコードせずに読み飛ばす"""
+        log_file = tmp_path / "run.log"
+        log_file.write_bytes(
+            "  ::debug::error: hidden\n"
+            "info: 準備中\n"
+            "error: ビルド失敗\n".encode()
+        )
+
+        lines = list(
+            iter_mmap_lines(
+                str(log_file),
+                skip_regex=re.compile(rb"[ \t]*::debug::"),
+                require_regex=re.compile(rb"error:"),
+            )
+        )
+
+        assert lines == [(3, "error: ビルド失敗")]
+
+
+class TestLineAlignedRanges:
+    """line_aligned_rangesとcount_linesのテストクラス"""
+
+    def test_ranges_start_at_line_boundaries(self, tmp_path):
+        """分割位置は行頭に揃い、範囲を合わせるとファイル全体になる"""
+        content = b"".join(f"line {i}\n".encode() for i in range(100))
+        log_file = tmp_path / "run.log"
+        log_file.write_bytes(content)
+
+        ranges = line_aligned_ranges(str(log_file), 4)
+
+        assert len(ranges) == 4
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == len(content)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert content[start - 1] == ord("\n")
+
+    def test_range_line_numbers(self, tmp_path):
+        """範囲ごとの行数と行番号の合計が全体と一致"""
+        log_file = tmp_path / "run.log"
+        log_file.write_bytes(b"a\nb\nc\nd\ne")
+
+        ranges = line_aligned_ranges(str(log_file), 3)
+        counts = [count_lines(str(log_file), s, e) for s, e in ranges]
+        lines = [
+            list(iter_mmap_lines(str(log_file), start=s, end=e))
+            for s, e in ranges
+        ]
+
+        assert sum(counts) == 5
+        assert [len(chunk) for chunk in lines] == counts
+        assert [line for chunk in lines for _, line in chunk] == [
+            "a",
+            "b",
+            "c",
+            "d",
+            "e",
+        ]
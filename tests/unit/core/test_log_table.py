@@ -0,0 +1,111 @@
+"""
+LogTableのユニットテスト
+"""
+
+from datetime import datetime, timezone
+
+from github_actions_ai_analyzer.core.log_processor import LogProcessor
+from github_actions_ai_analyzer.core.log_table import LogTable
+from github_actions_ai_analyzer.types import LogLevel
+
+LOG_CONTENT = (
+    "2024-01-01T12:00:00.000Z Step 1: Install dependencies\n"
+    "2024-01-01T12:00:01.000Z error: ModuleNotFoundError\n"
+    "2024-01-01T12:00:02.000Z warning: Deprecated feature used\n"
+    "2024-01-01T12:00:03.000Z Step 2: Run tests\n"
+    "2024-01-01T12:00:04.000Z error: ModuleNotFoundError\n"
+    "plain output line\n"
+)
+
+
+def _ns(second):
+    """テスト用のタイムスタンプ（エポックナノ秒）"""
+    moment = datetime(2024, 1, 1, 12, 0, second, tzinfo=timezone.utc)
+    return int(moment.timestamp()) * 1_000_000_000
+
+
+class TestLogTable:
+    """LogTableのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.processor = LogProcessor()
+        records = self.processor.process_numbered_records(
+            enumerate(LOG_CONTENT.split("\n"), 1)
+        )
+        self.table = LogTable.from_records(records)
+
+    def test_from_records(self):
+        """列と文字列プールに格納"""
+        assert len(self.table) == 6
+        assert list(self.table.line_numbers) == [1, 2, 3, 4, 5, 6]
+        # 同じメッセージは1つだけ保持する
+        assert self.table.messages.count("error: ModuleNotFoundError") == 1
+        assert self.table.steps == ["Install dependencies", "Run tests"]
+
+    def test_filter_by_level_matches_processor(self):
+        """レベルによる絞り込みがLogProcessorと一致"""
+        expected = self.processor.filter_by_level(
+            self.processor.process_log_file(LOG_CONTENT), LogLevel.WARNING
+        )
+        actual = self.table.filter_by_level(LogLevel.WARNING).to_log_entries()
+
+        assert actual == expected
+
+    def test_count_by_level(self):
+        """レベルごとの行数"""
+        counts = self.table.count_by_level()
+        assert counts[LogLevel.ERROR] == 2
+        assert counts[LogLevel.WARNING] == 1
+        assert counts[LogLevel.INFO] == 3
+        assert counts[LogLevel.FATAL] == 0
+
+    def test_group_by_step(self):
+        """ステップ名ごとの行位置がLogProcessorと一致"""
+        entries = self.processor.process_log_file(LOG_CONTENT)
+        expected = {
+            step: [e.metadata["line_number"] for e in step_entries]
+            for step, step_entries in self.processor.group_by_step(
+                entries
+            ).items()
+        }
+        actual = {
+            step: [self.table.line_numbers[row] for row in rows]
+            for step, rows in self.table.group_by_step().items()
+        }
+
+        assert actual == expected
+
+    def test_slice_time(self):
+        """タイムスタンプの範囲で切り出し（タイムスタンプのない行は除外）"""
+        sliced = self.table.slice_time(_ns(1), _ns(4))
+        assert list(sliced.line_numbers) == [2, 3, 4]
+
+        assert len(self.table.slice_time(_ns(10), _ns(20))) == 0
+
+    def test_slice_time_unsorted(self):
+        """タイムスタンプが昇順でない場合も正しく切り出す"""
+        records = list(self.table.iter_records())
+        shuffled = LogTable.from_records(reversed(records))
+
+        sliced = shuffled.slice_time(_ns(1), _ns(4))
+        assert sorted(sliced.line_numbers) == [2, 3, 4]
+
+    def test_row_at_line(self):
+        """行番号から行位置を取得"""
+        errors = self.table.filter_by_level(LogLevel.ERROR)
+        assert errors.row_at_line(5) == 1
+        assert errors.row_at_line(3) is None
+
+    def test_build_log_table(self, tmp_path):
+        """ログファイルからテーブルを作成"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(LOG_CONTENT, encoding="utf-8")
+
+        table = self.processor.build_log_table(str(log_file), LogLevel.ERROR)
+
+        assert list(table.line_numbers) == [2, 5]
+        assert [r.message for r in table.iter_records()] == [
+            "error: ModuleNotFoundError",
+            "error: ModuleNotFoundError",
+        ]
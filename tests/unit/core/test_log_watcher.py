@@ -0,0 +1,131 @@
+"""
+LogWatcherのユニットテスト
+"""
+
+import sys
+
+import pytest
+
+from github_actions_ai_analyzer.core.log_processor import LogProcessor
+from github_actions_ai_analyzer.core.log_watcher import (
+    LogWatcher,
+    _create_notifier,
+)
+from github_actions_ai_analyzer.core.pattern_matcher import PatternMatcher
+
+ERROR_LINE = "error: ModuleNotFoundError: No module named 'requests'\n"
+
+
+def _summarize(results):
+    """(ファイル名, 行番号, パターンID) の一覧に変換"""
+    return [
+        (
+            path.rsplit("/", 1)[-1],
+            m.context["log_entry"].line_number,
+            m.pattern.id,
+        )
+        for path, matches in results
+        for m in matches
+    ]
+
+
+class TestLogWatcher:
+    """LogWatcherのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.processor = LogProcessor()
+        self.matcher = PatternMatcher()
+
+    def _watcher(self, directory):
+        return LogWatcher(self.processor, self.matcher, str(directory))
+
+    def test_poll_only_appended_lines(self, tmp_path):
+        """追記された行のみを解析し、行番号はファイル全体で数える"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text("setup\n" + ERROR_LINE, encoding="utf-8")
+        watcher = self._watcher(tmp_path)
+
+        assert _summarize(watcher.poll()) == [
+            ("run.log", 2, "dep_missing_package")
+        ]
+        assert watcher.poll() == []
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("still running\n" + ERROR_LINE)
+
+        assert _summarize(watcher.poll()) == [
+            ("run.log", 4, "dep_missing_package")
+        ]
+
+    def test_partial_line_waits_for_newline(self, tmp_path):
+        """書き込み途中の行は改行が書かれてから解析"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text("", encoding="utf-8")
+        watcher = self._watcher(tmp_path)
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(ERROR_LINE[:20])
+        assert watcher.poll() == []
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(ERROR_LINE[20:])
+        assert _summarize(watcher.poll()) == [
+            ("run.log", 1, "dep_missing_package")
+        ]
+
+    def test_truncated_file_is_read_again(self, tmp_path):
+        """ファイルが短くなった場合は先頭から読み直す"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text("a\nb\nc\n" + ERROR_LINE, encoding="utf-8")
+        watcher = self._watcher(tmp_path)
+        watcher.poll()
+
+        log_file.write_text(ERROR_LINE, encoding="utf-8")
+
+        assert _summarize(watcher.poll()) == [
+            ("run.log", 1, "dep_missing_package")
+        ]
+
+    def test_skip_existing(self, tmp_path):
+        """既存の内容を読み飛ばし、新しいファイルは先頭から解析"""
+        (tmp_path / "old.log").write_text(ERROR_LINE, encoding="utf-8")
+        watcher = self._watcher(tmp_path)
+        watcher.skip_existing()
+
+        assert watcher.poll() == []
+
+        (tmp_path / "new.log").write_text(ERROR_LINE, encoding="utf-8")
+        assert _summarize(watcher.poll()) == [
+            ("new.log", 1, "dep_missing_package")
+        ]
+
+    def test_watch_stops(self, tmp_path):
+        """停止条件を満たすまで監視を続ける"""
+        (tmp_path / "run.log").write_text(ERROR_LINE, encoding="utf-8")
+        watcher = self._watcher(tmp_path)
+        polls = []
+
+        def should_stop():
+            polls.append(None)
+            return len(polls) > 2
+
+        results = list(watcher.watch(0.01, should_stop))
+
+        assert _summarize(results) == [("run.log", 1, "dep_missing_package")]
+        assert len(polls) == 3
+
+    @pytest.mark.skipif(
+        not sys.platform.startswith("linux"), reason="inotifyはLinuxのみ"
+    )
+    def test_notifier_detects_write(self, tmp_path):
+        """inotifyでファイルの変更を検知"""
+        notifier = _create_notifier(str(tmp_path))
+        if notifier is None:
+            pytest.skip("inotifyを利用できない環境")
+        try:
+            assert notifier.wait(0) is False
+            (tmp_path / "run.log").write_text("x\n", encoding="utf-8")
+            assert notifier.wait(1) is True
+        finally:
+            notifier.close()
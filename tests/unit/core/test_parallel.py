@@ -0,0 +1,121 @@
+"""
+並列処理のユニットテスト
+"""
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.parallel import match_log_file_parallel
+from github_actions_ai_analyzer.types import LogLevel
+
+
+def _write_log(tmp_path):
+    """テスト用のログファイルを作成"""
+    lines = []
+    for i in range(200):
+        if i % 40 == 0:
+            lines.append(f"2024-01-01T00:00:00.0000000Z ##[group]Run step-{i}")
+            lines.append("##[endgroup]")
+        if i % 40 == 20:
+            lines.append("##[group]Nested")
+        if i % 40 == 25:
+            lines.append("##[endgroup]")
+        lines.append(f"Collecting package-{i}")
+        if i % 7 == 0:
+            lines.append(
+                f"error: ModuleNotFoundError: No module named 'mod{i}'"
+            )
+        if i % 11 == 0:
+            lines.append("::debug::Process completed with exit code 1")
+    log_file = tmp_path / "run.log"
+    log_file.write_text("\n".join(lines), encoding="utf-8")
+    return str(log_file)
+
+
+class TestMatchLogFileParallel:
+    """match_log_file_parallelのテストクラス"""
+
+    def test_matches_serial_processing(self, tmp_path):
+        """並列処理の結果が逐次処理と一致"""
+        log_file_path = _write_log(tmp_path)
+        analyzer = GitHubActionsAnalyzer()
+
+        expected, expected_stats, expected_spans = analyzer._match_log_file(
+            log_file_path, LogLevel.WARNING, jobs=1
+        )
+        actual, actual_stats, actual_spans = match_log_file_parallel(
+            analyzer.log_processor,
+            analyzer.pattern_matcher,
+            log_file_path,
+            LogLevel.WARNING,
+            jobs=2,
+        )
+
+        def summarize(matches):
+            return [
+                (
+                    m.pattern.id,
+                    m.matched_text,
+                    m.context["log_entry"].metadata["line_number"],
+                    m.context["log_entry"].step_id,
+                    m.context["log_entry"].step_name,
+                )
+                for m in matches
+            ]
+
+        assert summarize(actual) == summarize(expected)
+        assert actual_stats == expected_stats
+        assert actual_spans == expected_spans
+        assert len(expected_spans) == 10
+        assert all(m.context["log_entry"].step_name for m in expected)
+
+    def test_line_matched_by_several_patterns(self, tmp_path):
+        """複数のパターンがマッチした行も元の行番号のまま返す"""
+        lines = []
+        for i in range(120):
+            lines.append(f"Collecting package-{i}")
+            if i % 10 == 5:
+                lines.append(f"coverage run failed for module-{i}")
+        log_file = tmp_path / "run.log"
+        log_file.write_text("\n".join(lines), encoding="utf-8")
+        analyzer = GitHubActionsAnalyzer()
+
+        expected, _, _ = analyzer._match_log_file(
+            str(log_file), LogLevel.WARNING, jobs=1
+        )
+        actual, _, _ = match_log_file_parallel(
+            analyzer.log_processor,
+            analyzer.pattern_matcher,
+            str(log_file),
+            LogLevel.WARNING,
+            jobs=4,
+        )
+
+        def summarize(matches):
+            return sorted(
+                (m.pattern.id, m.context["log_entry"].line_number)
+                for m in matches
+            )
+
+        assert summarize(actual) == summarize(expected)
+        assert {pattern_id for pattern_id, _ in summarize(expected)} == {
+            "test_failure",
+            "coverage_failure",
+        }
+        assert summarize(expected)[0][1] == 7
+
+    def test_empty_file(self, tmp_path):
+        """空のファイル"""
+        log_file = tmp_path / "empty.log"
+        log_file.write_text("", encoding="utf-8")
+        analyzer = GitHubActionsAnalyzer()
+
+        matches, stats, step_spans = match_log_file_parallel(
+            analyzer.log_processor,
+            analyzer.pattern_matcher,
+            str(log_file),
+            LogLevel.WARNING,
+            jobs=2,
+        )
+
+        assert matches == []
+        assert stats == {}
+        assert step_spans == []
@@ -3,13 +3,17 @@ PatternMatcherのユニットテスト
 """
 
 from datetime import datetime
-from unittest.mock import Mock
+from unittest.mock import Mock, PropertyMock, patch
 
+import pytest
+
+from github_actions_ai_analyzer.core.context_capture import ContextCapture
 from github_actions_ai_analyzer.core.pattern_matcher import PatternMatcher
 from github_actions_ai_analyzer.types import (
     ErrorPattern,
     LogEntry,
     LogLevel,
+    LogRecord,
     LogSource,
     PatternCategory,
 )
@@ -294,6 +298,29 @@ class TestPatternMatcher:
             for p in permission_patterns
         )
 
+    def test_log_record_metadata_is_not_built(self):
+        """LogRecordのマッチングではメタデータの辞書を作らない"""
+        records = [
+            LogRecord(
+                line_number,
+                None,
+                LogLevel.ERROR,
+                LogSource.USER,
+                "error: ModuleNotFoundError: No module named 'foo'",
+            )
+            for line_number in (3, 7)
+        ]
+
+        with patch.object(
+            LogRecord, "metadata", new_callable=PropertyMock
+        ) as mock_metadata:
+            matches = self.matcher.match_patterns(
+                records, ContextCapture(before=1, after=0)
+            )
+
+        assert matches
+        mock_metadata.assert_not_called()
+
     def test_get_patterns_by_language(self):
         """言語別パターン取得"""
         python_patterns = self.matcher.get_patterns_by_language("python")
@@ -376,3 +403,193 @@ class TestPatternMatcher:
             m for m in matches if m.pattern.id == "low_confidence"
         ]
         assert len(low_confidence_matches) == 0
+
+    def test_patterns_compiled_once(self):
+        """パターンは登録時に一度だけコンパイルされる"""
+        assert set(self.matcher._compiled_patterns) == {
+            p.id for p in self.matcher.patterns
+        }
+
+        entry = LogEntry(
+            timestamp=datetime.now(),
+            level=LogLevel.ERROR,
+            source=LogSource.SYSTEM,
+            message="ModuleNotFoundError: No module named 'requests'",
+        )
+
+        with patch(
+            "github_actions_ai_analyzer.core.pattern_matcher.re.compile"
+        ) as mock_compile:
+            matches = self.matcher.match_patterns([entry] * 10)
+
+        mock_compile.assert_not_called()
+        assert len(matches) >= 10
+
+    def test_add_and_remove_pattern_updates_compiled_cache(self):
+        """パターンの追加・削除でコンパイル済みキャッシュが更新される"""
+        custom_pattern = ErrorPattern(
+            id="custom_cached",
+            name="Custom Cached",
+            category=PatternCategory.DEPENDENCY,
+            regex_pattern=r"custom cached error",
+            description="Custom cached pattern",
+            severity="error",
+        )
+
+        self.matcher.add_pattern(custom_pattern)
+        assert "custom_cached" in self.matcher._compiled_patterns
+
+        self.matcher.remove_pattern("custom_cached")
+        assert "custom_cached" not in self.matcher._compiled_patterns
+
+    def test_combined_engine_matches_compiled_engine(self):
+        """統合正規表現エンジンが既存エンジンと同一の結果を返す"""
+        messages = [
+            "ModuleNotFoundError: No module named 'requests'",
+            "Permission denied: executable not allowed",
+            "Collecting requests>=2.28.0",
+            "Process completed with exit code 1",
+            "npm ERR! code ERESOLVE while resolving install",
+            "Everything is fine",
+        ]
+        entries = [
+            LogEntry(
+                timestamp=datetime.now(),
+                level=LogLevel.ERROR,
+                source=LogSource.USER,
+                message=message,
+            )
+            for message in messages
+        ]
+
+        combined = PatternMatcher(engine="combined")
+        expected = self.matcher.match_patterns(entries)
+        actual = combined.match_patterns(entries)
+
+        assert [m.model_dump() for m in actual] == [
+            m.model_dump() for m in expected
+        ]
+
+    def test_combined_engine_reflects_added_pattern(self):
+        """統合正規表現エンジンで追加パターンが反映される"""
+        combined = PatternMatcher(engine="combined")
+        entry = LogEntry(
+            timestamp=datetime.now(),
+            level=LogLevel.ERROR,
+            source=LogSource.USER,
+            message="custom fused failure",
+        )
+        assert combined.match_patterns([entry]) == []
+
+        combined.add_pattern(
+            ErrorPattern(
+                id="custom_fused",
+                name="Custom Fused",
+                category=PatternCategory.ENVIRONMENT,
+                regex_pattern=r"custom fused failure",
+                description="Custom fused pattern",
+                severity="error",
+            )
+        )
+
+        matches = combined.match_patterns([entry])
+        assert [m.pattern.id for m in matches] == ["custom_fused"]
+
+    def test_invalid_engine(self):
+        """未対応のエンジン指定はエラー"""
+        with pytest.raises(ValueError):
+            PatternMatcher(engine="unknown")
+
+    def test_prefilter_matches_unfiltered_results(self):
+        """リテラル絞り込みの有無で結果が変わらない"""
+        messages = [
+            "ModuleNotFoundError: No module named 'requests'",
+            "connect ECONNREFUSED 127.0.0.1:5432",
+            "yaml parse error in config",
+            "Downloading https://example.com/pkg.whl",
+            "テストが失敗しました: AssertionError",
+        ]
+        entries = [
+            LogEntry(
+                timestamp=datetime.now(),
+                level=LogLevel.ERROR,
+                source=LogSource.USER,
+                message=message,
+            )
+            for message in messages
+        ]
+
+        unfiltered = PatternMatcher(use_prefilter=False)
+        expected = unfiltered.match_patterns(entries)
+        actual = self.matcher.match_patterns(entries)
+
+        assert [m.model_dump() for m in actual] == [
+            m.model_dump() for m in expected
+        ]
+
+    @pytest.mark.parametrize(
+        "regex_pattern",
+        [
+            r"\x41BCDEF",
+            r"\u0041BCDEF",
+            r"\U00000041BCDEF",
+            r"\N{LATIN CAPITAL LETTER A}BCDEF",
+            r"\101BCDEF",
+            r"(x)(b)(c)(d)(e)(f)(g)(h)(i)(j)-\10 failed",
+        ],
+    )
+    def test_prefilter_keeps_escaped_patterns(self, regex_pattern):
+        """エスケープを含むパターンも絞り込みの有無で結果が変わらない"""
+        pattern = ErrorPattern(
+            id="custom_escaped",
+            name="Custom Escaped",
+            category=PatternCategory.ENVIRONMENT,
+            regex_pattern=regex_pattern,
+            description="Custom escaped pattern",
+            severity="error",
+        )
+        entries = [
+            LogEntry(
+                timestamp=datetime.now(),
+                level=LogLevel.ERROR,
+                source=LogSource.USER,
+                message=message,
+            )
+            for message in [
+                "error: ABCDEF here",
+                "error: xbcdefghij-j failed",
+            ]
+        ]
+
+        def pattern_ids(use_prefilter):
+            matcher = PatternMatcher(use_prefilter=use_prefilter)
+            matcher.add_pattern(pattern)
+            return [
+                m.pattern.id
+                for m in matcher.match_patterns(entries)
+                if m.pattern.id == "custom_escaped"
+            ]
+
+        assert pattern_ids(True) == pattern_ids(False) == ["custom_escaped"]
+
+    def test_prefilter_match_stats(self):
+        """絞り込みでスキップした行数が統計に記録される"""
+        entries = [
+            LogEntry(
+                timestamp=datetime.now(),
+                level=LogLevel.INFO,
+                source=LogSource.USER,
+                message=message,
+            )
+            for message in [
+                "Downloading https://example.com/pkg.whl",
+                "Process completed with exit code 1",
+            ]
+        ]
+
+        self.matcher.match_patterns(entries)
+
+        assert self.matcher.match_stats == {
+            "lines": 2,
+            "lines_skipped_by_prefilter": 1,
+        }
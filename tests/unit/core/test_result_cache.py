@@ -0,0 +1,168 @@
+"""
+ResultCacheのユニットテスト
+"""
+
+import os
+from unittest.mock import patch
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.result_cache import ResultCache
+from github_actions_ai_analyzer.types import ErrorPattern, LogEntry, LogLevel
+from github_actions_ai_analyzer.types.pattern_types import PatternCategory
+
+ERROR_LOG = "error: ModuleNotFoundError: No module named 'requests'\n"
+
+
+class TestResultCache:
+    """ResultCacheのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.analyzer = GitHubActionsAnalyzer()
+
+    def _cached_analyzer(self, cache_dir):
+        return GitHubActionsAnalyzer(result_cache=ResultCache(cache_dir))
+
+    def test_repeat_analysis_uses_cache(self, tmp_path):
+        """同じログの2回目の解析はキャッシュから返す"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(ERROR_LOG, encoding="utf-8")
+        analyzer = self._cached_analyzer(tmp_path / "cache")
+
+        first = analyzer.analyze_log_file(str(log_file), contexts=())
+        with patch.object(analyzer, "_match_log_file") as mock_match:
+            second = analyzer.analyze_log_file(str(log_file), contexts=())
+
+        mock_match.assert_not_called()
+        assert second.metadata["cache_hit"] is True
+        assert second.analysis_id != first.analysis_id
+        assert second.summary == first.summary
+        entry = (
+            second.error_analyses[0].pattern_matches[0].context["log_entry"]
+        )
+        assert isinstance(entry, LogEntry)
+        assert entry == first.error_analyses[0].log_entries[0]
+
+    def test_cache_key_changes(self, tmp_path):
+        """ログの内容・パターン定義・オプションが変わるとキーが変わる"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(ERROR_LOG, encoding="utf-8")
+        cache = ResultCache(tmp_path / "cache")
+        matcher = self.analyzer.pattern_matcher
+        options = {"min_log_level": "warning"}
+
+        key = cache.make_key(
+            str(log_file), matcher.pattern_set_version(), options
+        )
+        assert key == cache.make_key(
+            str(log_file), matcher.pattern_set_version(), options
+        )
+        assert key != cache.make_key(
+            str(log_file),
+            matcher.pattern_set_version(),
+            {"min_log_level": "error"},
+        )
+
+        matcher.add_pattern(
+            ErrorPattern(
+                id="custom",
+                name="Custom",
+                category=PatternCategory.ENVIRONMENT,
+                regex_pattern=r"custom failure",
+                description="テスト用パターン",
+                severity="error",
+            )
+        )
+        pattern_key = cache.make_key(
+            str(log_file), matcher.pattern_set_version(), options
+        )
+        assert pattern_key != key
+
+        log_file.write_text(ERROR_LOG + "more\n", encoding="utf-8")
+        assert (
+            cache.make_key(
+                str(log_file), matcher.pattern_set_version(), options
+            )
+            != pattern_key
+        )
+
+    def test_contexts_are_not_cached(self, tmp_path):
+        """コンテキストは保存せず、キャッシュから返す際に遅延評価で付け直す"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(ERROR_LOG, encoding="utf-8")
+        analyzer = self._cached_analyzer(tmp_path / "cache")
+        analyzer.analyze_log_file(str(log_file))
+
+        with patch.object(
+            analyzer.context_collector,
+            "collect_environment_context",
+            wraps=analyzer.context_collector.collect_environment_context,
+        ) as mock_env:
+            cached = analyzer.analyze_log_file(str(log_file))
+            assert cached.metadata["cache_hit"] is True
+            mock_env.assert_not_called()
+            assert cached.environment_context is not None
+            mock_env.assert_called_once()
+
+    def test_lru_eviction(self, tmp_path):
+        """上限サイズを超えると最後の使用が古い結果から削除"""
+        log_files = []
+        for i in range(3):
+            log_file = tmp_path / f"run{i}.log"
+            log_file.write_text(ERROR_LOG + f"line {i}\n", encoding="utf-8")
+            log_files.append(str(log_file))
+
+        cache = ResultCache(tmp_path / "cache", max_bytes=10**9)
+        analyzer = GitHubActionsAnalyzer(result_cache=cache)
+        keys = []
+        for i, log_file in enumerate(log_files):
+            analyzer.analyze_log_file(log_file, contexts=())
+            key = analyzer._cache_key(log_file, LogLevel.WARNING)
+            keys.append(key)
+            # 使用時刻の順序を確定させる
+            os.utime(cache._entry_path(key), ns=(i, i))
+
+        # 最初の結果を使用すると、最も古いのは2番目になる
+        assert cache.get(keys[0]) is not None
+        entry_size = cache._entry_path(keys[2]).stat().st_size
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+        cache.evict()
+
+        assert cache._entry_path(keys[0]).exists()
+        assert not cache._entry_path(keys[1]).exists()
+        assert cache._entry_path(keys[2]).exists()
+
+    def test_corrupted_entry_is_ignored(self, tmp_path):
+        """壊れたキャッシュは無視して解析し直す"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(ERROR_LOG, encoding="utf-8")
+        analyzer = self._cached_analyzer(tmp_path / "cache")
+        analyzer.analyze_log_file(str(log_file), contexts=())
+
+        key = analyzer._cache_key(str(log_file), LogLevel.WARNING)
+        analyzer.result_cache._entry_path(key).write_text(
+            "{", encoding="utf-8"
+        )
+
+        result = analyzer.analyze_log_file(str(log_file), contexts=())
+        assert "cache_hit" not in result.metadata
+        assert len(result.error_analyses) == 1
+
+    def test_analyze_many_uses_cache(self, tmp_path):
+        """複数ファイルの解析でもキャッシュ済みのファイルは処理しない"""
+        cached_log = tmp_path / "cached.log"
+        cached_log.write_text(ERROR_LOG, encoding="utf-8")
+        new_log = tmp_path / "new.log"
+        new_log.write_text("all good\n", encoding="utf-8")
+        analyzer = self._cached_analyzer(tmp_path / "cache")
+        analyzer.analyze_log_file(str(cached_log), contexts=())
+
+        outcomes = dict(
+            analyzer.analyze_many(
+                [str(cached_log), str(new_log)], jobs=1, contexts=()
+            )
+        )
+
+        assert outcomes[str(cached_log)].metadata["cache_hit"] is True
+        assert "cache_hit" not in outcomes[str(new_log)].metadata
+        assert outcomes[str(cached_log)].error_analyses[0].pattern_matches
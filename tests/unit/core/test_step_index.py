@@ -0,0 +1,121 @@
+"""
+StepIndexのユニットテスト
+"""
+
+import random
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.result_cache import ResultCache
+from github_actions_ai_analyzer.core.step_segmenter import StepSegmenter
+from github_actions_ai_analyzer.types import (
+    LogLevel,
+    LogRecord,
+    LogSource,
+    StepIndex,
+    StepSpan,
+)
+
+
+def _linear_span_at(spans, line_number):
+    """全範囲を走査して最も内側のグループを求める（比較用）"""
+    found = None
+    for span in spans:
+        end = span.end_line if span.end_line is not None else line_number
+        if span.start_line <= line_number <= end:
+            if found is None or span.depth > found.depth:
+                found = span
+    return found
+
+
+class TestStepIndex:
+    """StepIndexのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.spans = [
+            StepSpan(step_id=0, name="Build", start_line=3, end_line=20),
+            StepSpan(
+                step_id=1,
+                name="Inner",
+                depth=1,
+                parent_id=0,
+                start_line=5,
+                end_line=8,
+            ),
+            StepSpan(step_id=2, name="Test", start_line=21),
+        ]
+        self.index = StepIndex(self.spans)
+
+    def test_span_at(self):
+        """行が属する最も内側のグループを返す"""
+        assert self.index.span_at(1) is None
+        assert self.index.span_at(3).name == "Build"
+        assert self.index.span_at(6).name == "Inner"
+        # 入れ子のグループの終了後は外側のステップ
+        assert self.index.span_at(9).name == "Build"
+        # 終了行が未確定の範囲は以降のすべての行を含む
+        assert self.index.span_at(10_000).name == "Test"
+
+    def test_step_at(self):
+        """入れ子のグループ内の行もトップレベルのステップを返す"""
+        assert self.index.step_at(6).name == "Build"
+        assert self.index.step_at(2) is None
+
+    def test_tag(self):
+        """レコードにグループのIDとステップ名を付与"""
+        record = LogRecord(
+            line_number=7,
+            timestamp=None,
+            level=LogLevel.ERROR,
+            source=LogSource.USER,
+            message="error: boom",
+            step_name="Step 1",
+        )
+        self.index.tag(record)
+
+        assert record.step_id == 1
+        assert record.step_name == "Build"
+
+    def test_matches_linear_scan(self):
+        """ランダムな入れ子の範囲でも全走査と同じ結果"""
+        rng = random.Random(0)
+        segmenter = StepSegmenter()
+        depth = 0
+        for line_number in range(1, 2000):
+            roll = rng.random()
+            if roll < 0.02:
+                segmenter.feed(line_number, f"##[group]Run step {line_number}")
+                depth += 1
+            elif roll < 0.04:
+                segmenter.feed(line_number, f"##[group]group {line_number}")
+                depth += 1
+            elif roll < 0.07 and depth:
+                segmenter.feed(line_number, "##[endgroup]")
+                depth -= 1
+        spans = segmenter.finish(2000)
+        index = StepIndex(spans)
+
+        for line_number in range(1, 2001):
+            assert index.span_at(line_number) == _linear_span_at(
+                spans, line_number
+            )
+
+    def test_index_from_cached_result(self, tmp_path):
+        """キャッシュから復元した結果でも保存された範囲から索引を作成"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(
+            "##[group]Run pytest\n"
+            "##[endgroup]\n"
+            "error: ModuleNotFoundError: No module named 'foo'\n",
+            encoding="utf-8",
+        )
+        analyzer = GitHubActionsAnalyzer(
+            result_cache=ResultCache(tmp_path / "cache")
+        )
+        analyzer.analyze_log_file(str(log_file), contexts=())
+
+        cached = analyzer.analyze_log_file(str(log_file), contexts=())
+
+        assert cached.metadata["cache_hit"] is True
+        assert cached.step_index.step_at(3).name == "Run pytest"
+        assert cached.error_analyses[0].affected_steps == ["Run pytest"]
@@ -0,0 +1,145 @@
+"""
+StepSegmenterのユニットテスト
+"""
+
+from github_actions_ai_analyzer.core.analyzer import GitHubActionsAnalyzer
+from github_actions_ai_analyzer.core.log_processor import LogProcessor
+from github_actions_ai_analyzer.core.step_segmenter import StepSegmenter
+from github_actions_ai_analyzer.types import AnalysisState
+
+TS = "2024-01-01T00:00:00.0000000Z "
+
+# GitHub Actionsと同様に、ステップの見出しだけをグループで囲んだログ
+STEP_LOG = "\n".join(
+    [
+        TS + "##[group]Run actions/checkout@v4",  # 1
+        TS + "with:",  # 2
+        TS + "##[endgroup]",  # 3
+        TS + "Syncing repository",  # 4
+        TS + "##[group]Run pip install -r requirements.txt",  # 5
+        TS + "##[endgroup]",  # 6
+        TS + "Collecting requests",  # 7
+        TS + "##[group]Resolving",  # 8
+        TS + "error: ModuleNotFoundError: No module named 'foo'",  # 9
+        TS + "##[endgroup]",  # 10
+        TS + "Process completed with exit code 1",  # 11
+    ]
+)
+
+
+class TestStepSegmenter:
+    """StepSegmenterのテストクラス"""
+
+    def setup_method(self):
+        """テスト前のセットアップ"""
+        self.processor = LogProcessor()
+
+    def test_entries_are_tagged_with_step(self):
+        """各エントリにステップ名と最も内側のグループIDを付与"""
+        entries = self.processor.process_log_file(STEP_LOG)
+
+        tags = [
+            (
+                entry.metadata["line_number"],
+                entry.step_name,
+                entry.metadata.get("step_id"),
+            )
+            for entry in entries
+        ]
+        checkout = "Run actions/checkout@v4"
+        pip = "Run pip install -r requirements.txt"
+        assert tags == [
+            (2, checkout, 0),
+            (4, checkout, 0),
+            (7, pip, 1),
+            (9, pip, 2),
+            (11, pip, 1),
+        ]
+
+    def test_spans(self):
+        """ステップは次のステップの直前まで、入れ子のグループは終了行まで"""
+        segmenter = StepSegmenter()
+        list(
+            self.processor.process_numbered_records(
+                enumerate(STEP_LOG.split("\n"), 1), segmenter
+            )
+        )
+        spans = segmenter.finish(11)
+
+        assert [
+            (s.name, s.depth, s.parent_id, s.start_line, s.end_line)
+            for s in spans
+        ] == [
+            ("Run actions/checkout@v4", 0, None, 1, 4),
+            ("Run pip install -r requirements.txt", 0, None, 5, 11),
+            ("Resolving", 1, 1, 8, 10),
+        ]
+        # finish() は状態を変更しない
+        assert segmenter.spans[1].end_line is None
+
+    def test_unbalanced_markers(self):
+        """対応する開始のない終了は無視し、閉じていないグループは末尾まで"""
+        segmenter = StepSegmenter()
+        assert segmenter.feed(1, "##[endgroup]")
+        assert segmenter.feed(2, "  ##[group]Build")
+        assert segmenter.feed(3, "##[group]Inner")
+        assert not segmenter.feed(4, "echo ##[group] in text")
+
+        spans = segmenter.finish(4)
+        assert [(s.start_line, s.end_line) for s in spans] == [(2, 4), (3, 4)]
+        assert segmenter.current.name == "Inner"
+
+    def test_resume_from_spans(self):
+        """途中までの範囲から再開しても一度に処理した場合と一致"""
+        lines = STEP_LOG.split("\n")
+        whole = StepSegmenter()
+        for line_number, line in enumerate(lines, 1):
+            whole.feed(line_number, line)
+
+        first = StepSegmenter()
+        for line_number, line in enumerate(lines[:8], 1):
+            first.feed(line_number, line)
+        state = AnalysisState(step_spans=first.spans)
+        restored = AnalysisState.model_validate_json(state.model_dump_json())
+        second = StepSegmenter(restored.step_spans)
+        for line_number, line in enumerate(lines[8:], 9):
+            second.feed(line_number, line)
+
+        assert second.finish(11) == whole.finish(11)
+
+    def test_analysis_reports_affected_steps(self, tmp_path):
+        """解析結果に影響を受けたステップとステップの範囲を含める"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text(STEP_LOG, encoding="utf-8")
+        analyzer = GitHubActionsAnalyzer()
+
+        result = analyzer.analyze_log_file(str(log_file), contexts=())
+
+        assert result.error_analyses[0].affected_steps == [
+            "Run pip install -r requirements.txt"
+        ]
+        assert [span.start_line for span in result.step_spans] == [1, 5, 8]
+
+    def test_incremental_analysis_tracks_steps(self, tmp_path):
+        """増分解析でも追記前に開始したステップを引き継ぐ"""
+        lines = STEP_LOG.split("\n")
+        log_file = tmp_path / "run.log"
+        log_file.write_text("\n".join(lines[:7]) + "\n", encoding="utf-8")
+        analyzer = GitHubActionsAnalyzer()
+
+        state = analyzer.analyze_log_file(
+            str(log_file), contexts=(), state=AnalysisState()
+        ).state
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines[7:]) + "\n")
+        result = analyzer.analyze_log_file(
+            str(log_file), contexts=(), state=state
+        )
+
+        entry = result.error_analyses[0].log_entries[0]
+        assert entry.step_name == "Run pip install -r requirements.txt"
+        assert entry.metadata["line_number"] == 9
+        assert (
+            result.step_spans
+            == analyzer.analyze_log_file(str(log_file), contexts=()).step_spans
+        )
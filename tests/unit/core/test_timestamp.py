@@ -0,0 +1,90 @@
+"""
+タイムスタンプ解析のユニットテスト
+"""
+
+from datetime import datetime
+
+import pytest
+
+from github_actions_ai_analyzer.core.log_processor import LogProcessor
+from github_actions_ai_analyzer.core.timestamp import (
+    parse_timestamp_at,
+    split_timestamp,
+    to_datetime,
+)
+
+
+def _expected_epoch(text):
+    """datetime.fromisoformat による期待値"""
+    return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+
+
+class TestSplitTimestamp:
+    """split_timestampのテストクラス"""
+
+    @pytest.mark.parametrize(
+        "timestamp",
+        [
+            "2024-01-01T12:00:00.000Z",
+            "2024-02-29T23:59:59.1234567Z",
+            "1999-12-31T00:00:01.5Z",
+            "2024-06-15T08:30:45.123456Z",
+        ],
+    )
+    def test_prefix_is_parsed_and_stripped(self, timestamp):
+        """行頭のタイムスタンプを解析して除去（小数部は1〜9桁）"""
+        epoch, body = split_timestamp(f"{timestamp}   Run tests")
+
+        assert epoch == pytest.approx(_expected_epoch(timestamp), abs=1e-6)
+        assert body == "Run tests"
+
+    def test_seven_digit_fraction_is_truncated_to_microseconds(self):
+        """7桁の小数部はマイクロ秒までを使用"""
+        epoch, _ = split_timestamp("2024-01-01T00:00:00.1234567Z x")
+        assert to_datetime(epoch).microsecond == 123456
+
+    def test_timestamp_in_middle_of_line(self):
+        """行中のタイムスタンプは解析するが行は変更しない"""
+        line = "[runner] 2024-01-01T12:00:00.0000000Z started"
+        epoch, body = split_timestamp(line)
+
+        assert epoch == _expected_epoch("2024-01-01T12:00:00.000Z")
+        assert body == line
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            "no timestamp here",
+            "2024-13-01T00:00:00.000Z invalid month",
+            "2024-02-30T00:00:00.000Z invalid day",
+            "2024-01-01T24:00:00.000Z invalid hour",
+            "2024-01-01T00:00:00Z missing fraction",
+            "2024-01-01T00:00:00.123456xyZ non-digit fraction",
+            "2024-01-01 00:00:00.000Z space separator",
+            "",
+        ],
+    )
+    def test_non_conforming_lines(self, line):
+        """形式に合わない行はタイムスタンプなし"""
+        assert split_timestamp(line) == (None, line)
+
+    def test_parse_at_position(self):
+        """指定位置のタイムスタンプを解析し、直後の位置を返す"""
+        line = "xx2024-01-01T00:00:00.000Zyy"
+        epoch, end = parse_timestamp_at(line, 2)
+
+        assert epoch == _expected_epoch("2024-01-01T00:00:00.000Z")
+        assert line[end:] == "yy"
+        assert parse_timestamp_at(line, 0) == (None, 0)
+
+    def test_log_processor_strips_seven_digit_prefix(self):
+        """GitHub Actionsの7桁形式もメッセージから除去"""
+        processor = LogProcessor()
+        entry = processor.process_log_file(
+            "2024-01-01T12:00:00.1234567Z ::error::Build failed"
+        )[0]
+
+        assert entry.message == "Build failed"
+        assert entry.timestamp == datetime.fromisoformat(
+            "2024-01-01T12:00:00.123456+00:00"
+        )
@@ -2,10 +2,17 @@
 LogProcessorのユニットテスト
 """
 
+import pickle
 from datetime import datetime
 
 from github_actions_ai_analyzer.core.log_processor import LogProcessor
-from github_actions_ai_analyzer.types import LogLevel, LogSource
+from github_actions_ai_analyzer.core.step_segmenter import StepSegmenter
+from github_actions_ai_analyzer.types import (
+    LogEntry,
+    LogLevel,
+    LogRecord,
+    LogSource,
+)
 
 
 class TestLogProcessor:
@@ -33,6 +40,63 @@ class TestLogProcessor:
         result = self.processor.process_log_file(log_content)
         assert result == []
 
+    def test_noise_stats_by_rule(self, tmp_path):
+        """規則ごとに除去した行数を、文字列とバイト列の判定で同じように数える"""
+        log_content = (
+            "::debug::a\n"
+            "  ::debug::b\n"
+            "##[command]git fetch\n"
+            "error: ::debug:: in message\n"
+        )
+        log_file = tmp_path / "run.log"
+        log_file.write_text(log_content, encoding="utf-8")
+
+        entries = self.processor.process_log_file(log_content)
+        by_text = dict(self.processor.noise_stats)
+        self.processor.reset_noise_stats()
+        records = list(self.processor.iter_mapped_records(str(log_file)))
+
+        assert len(entries) == len(records) == 1
+        assert by_text == self.processor.noise_stats
+        assert by_text["debug"] == 2
+        assert by_text["command"] == 1
+        assert by_text["notice"] == 0
+
+    def test_noise_stats_count_step_markers(self, tmp_path):
+        """ステップの追跡で消費したマーカー行もノイズとして数える"""
+        log_content = (
+            "##[group]Run pytest\n"
+            "::debug::resolving\n"
+            "##[endgroup]\n"
+            "error: tests failed\n"
+        )
+        log_file = tmp_path / "run.log"
+        log_file.write_text(log_content, encoding="utf-8")
+
+        self.processor.process_log_file(log_content)
+        by_text = dict(self.processor.noise_stats)
+        self.processor.reset_noise_stats()
+        records = list(
+            self.processor.iter_mapped_records(
+                str(log_file), segmenter=StepSegmenter()
+            )
+        )
+
+        assert [r.step_name for r in records] == ["Run pytest"]
+        assert self.processor.noise_stats == by_text
+        assert by_text["group"] == by_text["endgroup"] == 1
+
+    def test_noise_filter_disabled(self, tmp_path):
+        """filter_noise=False ではノイズ行も処理する"""
+        processor = LogProcessor(filter_noise=False)
+        log_file = tmp_path / "run.log"
+        log_file.write_text("::debug::a\n##[command]ls\n", encoding="utf-8")
+
+        records = list(processor.iter_mapped_records(str(log_file)))
+
+        assert [r.message for r in records] == ["a", "##[command]ls"]
+        assert not any(processor.noise_stats.values())
+
     def test_process_log_file_with_errors(self):
         """エラーを含むログファイルを処理"""
         log_content = """
@@ -62,6 +126,100 @@ class TestLogProcessor:
             assert len(error_messages) >= 0
             assert len(warning_messages) >= 0
 
+    def test_process_log_stream(self):
+        """行のイテラブルを逐次処理"""
+        lines = iter(
+            [
+                "error: first failure\n",
+                "\n",
+                "::debug::noise\n",
+                "warning: second\n",
+            ]
+        )
+        stream = self.processor.process_log_stream(lines)
+
+        # ジェネレータとして1件ずつ返される
+        first = next(stream)
+        assert first.message == "error: first failure"
+        assert first.metadata["line_number"] == 1
+
+        rest = list(stream)
+        assert len(rest) == 1
+        assert rest[0].metadata["line_number"] == 4
+
+    def test_process_log_stream_matches_process_log_file(self):
+        """逐次処理と一括処理の結果が一致"""
+        log_content = "error: a\n\nwarning: b\ninfo: c"
+        streamed = self.processor.process_log_stream(
+            log_content.splitlines(keepends=True)
+        )
+        batched = self.processor.process_log_file(log_content)
+        assert [e.message for e in streamed] == [e.message for e in batched]
+
+    def test_iter_log_file(self, tmp_path):
+        """ログファイルを1行ずつ読み込んで処理"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text("error: boom\nok\n", encoding="utf-8")
+
+        entries = list(self.processor.iter_log_file(str(log_file)))
+        assert [e.message for e in entries] == ["error: boom", "ok"]
+        assert entries[0].level == LogLevel.ERROR
+
+    def test_iter_mapped_file(self, tmp_path):
+        """メモリマップ読み込みの結果が一括処理と一致"""
+        log_content = (
+            "2024-01-01T12:00:00.000Z Step 1: Install dependencies\n"
+            "::debug::error: debug noise\n"
+            "2024-01-01T12:00:01.000Z error: ModuleNotFoundError\n"
+            "warning: Deprecated feature used\n"
+            "info: done\n"
+        )
+        log_file = tmp_path / "run.log"
+        log_file.write_text(log_content, encoding="utf-8")
+
+        expected = self.processor.filter_by_level(
+            self.processor.process_log_file(log_content), LogLevel.WARNING
+        )
+        actual = list(
+            self.processor.iter_mapped_file(str(log_file), LogLevel.WARNING)
+        )
+
+        assert [(e.message, e.metadata) for e in actual] == [
+            (e.message, e.metadata) for e in expected
+        ]
+
+    def test_iter_mapped_records(self, tmp_path):
+        """軽量なログレコードからLogEntryと同じ内容を復元できる"""
+        log_content = (
+            "2024-01-01T12:00:01.250Z error: ModuleNotFoundError\n"
+            "warning: Deprecated feature used\n"
+        )
+        log_file = tmp_path / "run.log"
+        log_file.write_text(log_content, encoding="utf-8")
+
+        records = list(self.processor.iter_mapped_records(str(log_file)))
+        assert all(isinstance(r, LogRecord) for r in records)
+        assert [r.line_number for r in records] == [1, 2]
+        assert records[1].timestamp is None
+
+        entry = records[0].to_log_entry()
+        expected = self.processor.process_log_file(log_content)[0]
+        assert isinstance(entry, LogEntry)
+        assert entry == expected
+
+        restored = pickle.loads(pickle.dumps(records[0]))
+        assert restored.to_log_entry() == expected
+
+    def test_iter_mapped_file_fatal_level(self, tmp_path):
+        """判定キーワードのないレベルが閾値の場合は全行を除外"""
+        log_file = tmp_path / "run.log"
+        log_file.write_text("error: boom\n", encoding="utf-8")
+
+        records = self.processor.iter_mapped_file(
+            str(log_file), LogLevel.FATAL
+        )
+        assert list(records) == []
+
     def test_determine_log_level(self):
         """ログレベルの判定をテスト"""
         assert (
@@ -111,6 +269,67 @@ class TestLogProcessor:
         action_name = self.processor._extract_action_name(line)
         assert action_name == "actions/checkout@v3"
 
+    def test_classify_line_single_pass(self):
+        """1回の走査で複数のトークンを優先度どおりに判定"""
+        level, source, step_name, action_name = self.processor._classify_line(
+            "Warning: Step 2: uses: actions/setup-node failed in workflow"
+        )
+        assert level == LogLevel.ERROR
+        assert source == LogSource.ACTION
+        assert step_name == "uses: actions/setup-node failed in workflow"
+        assert action_name == "actions/setup-node failed in workflow"
+
+    def test_classify_line_overlapping_commands(self):
+        """隣接するワークフローコマンドも検出"""
+        assert (
+            self.processor._determine_source("::command::debug:: run")
+            == LogSource.SYSTEM
+        )
+        assert (
+            self.processor._determine_source("::command:: run")
+            == LogSource.STEP
+        )
+        assert (
+            self.processor._determine_source("Starting WORKFLOW")
+            == LogSource.WORKFLOW
+        )
+        assert self.processor._classify_line("plain text") == (
+            LogLevel.INFO,
+            LogSource.USER,
+            None,
+            None,
+        )
+
+    def test_min_level_pushdown_matches_filter(self):
+        """最小レベルを渡した処理が、処理後の絞り込みと同じ結果"""
+        lines = [
+            "2024-01-01T00:00:00.000Z error: Failed to build",
+            "WARNING: deprecated option",
+            "info: done",
+            "Collecting requests",
+            "Exception in thread main",
+            "build\tRun make\t2024-01-01T00:00:00.000Z warning: slow",
+            "##[group]Run pytest",
+            "##[endgroup]",
+            "pytest FAILED tests/test_app.py",
+        ]
+        numbered = list(enumerate(lines, 1))
+
+        for level in LogLevel:
+            expected = self.processor.iter_by_level(
+                self.processor.process_numbered_records(numbered), level
+            )
+            actual = self.processor.process_numbered_records(
+                numbered, min_level=level
+            )
+            assert [
+                (r.line_number, r.level, r.message, r.step_name)
+                for r in actual
+            ] == [
+                (r.line_number, r.level, r.message, r.step_name)
+                for r in expected
+            ], level
+
     def test_filter_by_level(self):
         """ログレベルによるフィルタリングをテスト"""
         # テスト用のログエントリを作成